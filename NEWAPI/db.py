@@ -0,0 +1,21 @@
+import os
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+# The Supabase client is synchronous: each execute() is a blocking PostgREST round-trip.
+# Queries run on this many threads so the event loop keeps serving other requests.
+DB_MAX_WORKERS = int(os.environ.get("NEWAPI_DB_MAX_WORKERS", 16))
+
+_executor = ThreadPoolExecutor(max_workers=DB_MAX_WORKERS, thread_name_prefix="newapi-db")
+
+
+async def execute(query):
+    """Await a built Supabase query without blocking the event loop
+
+    Building the query (select, eq, order...) is local, so routers build it
+    as before and hand it here instead of calling .execute() themselves.
+    Returns whatever .execute() returns. At most DB_MAX_WORKERS queries are
+    in flight; the rest wait in the pool's queue.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, query.execute)
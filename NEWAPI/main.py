@@ -1,6 +1,6 @@
 import os
 from fastapi import FastAPI, Request, APIRouter
-from fastapi.responses import JSONResponse, FileResponse, HTMLResponse
+from fastapi.responses import JSONResponse, FileResponse, HTMLResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from dotenv import load_dotenv
@@ -13,6 +13,7 @@ from NEWAPI.routers import (
     generate_research
 )
 from NEWAPI import config
+from static_assets import StaticAssets
 
 # Load environment variables
 load_dotenv()
@@ -63,9 +64,12 @@ async def get_scoring_criteria():
         'scoring_prompt': 'Scoring criteria details here.'
     }
 
+# index.html from memory, precompressed hashed assets, ETag/304 (see static_assets.py)
+static_assets = StaticAssets(dist_folder)
+
 @app.get("/{full_path:path}")
-async def serve_react_app(full_path: str):
-    index_path = os.path.join(dist_folder, 'index.html')
-    if os.path.exists(index_path):
-        return HTMLResponse(content=open(index_path).read())
-    return HTMLResponse(content="Error: index.html not found", status_code=404)
+async def serve_react_app(full_path: str, request: Request):
+    asset = static_assets.respond(full_path, request.headers)
+    if asset.path:
+        return FileResponse(asset.path, status_code=asset.status, headers=asset.headers)
+    return Response(content=asset.body, status_code=asset.status, headers=asset.headers)
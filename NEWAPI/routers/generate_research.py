@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Path, Body
 from fastapi.responses import JSONResponse
-from NEWAPI import config
+from NEWAPI import config, db
 import traceback
 
 router = APIRouter(prefix="/api/generate-research", tags=["Generate Research"])
@@ -34,7 +34,7 @@ async def get_company_research(partner: str = Path(...)):
         supabase = config.supabase
         if not supabase:
             return JSONResponse(status_code=500, content={"success": False, "message": "Database connection not available", "research": None})
-        data, count = supabase.table('company_research').select('*').eq('partner', partner).execute()
+        data, count = await db.execute(supabase.table('company_research').select('*').eq('partner', partner))
         research = data[1][0] if data and len(data) > 1 and len(data[1]) > 0 else None
         if research:
             return {"success": True, "research": research}
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Path, Body
 from fastapi.responses import JSONResponse
-from NEWAPI import config
+from NEWAPI import config, db
 import traceback
 
 router = APIRouter(prefix="/api/partner-research", tags=["Partner Research"])
@@ -12,7 +12,7 @@ async def get_partner_research(partner_id: str = Path(...)):
         supabase = config.supabase
         if not supabase:
             return JSONResponse(status_code=500, content={"success": False, "message": "Database connection not available", "research": None})
-        data, count = supabase.table('partner_research').select('*').eq('partner_id', partner_id).execute()
+        data, count = await db.execute(supabase.table('partner_research').select('*').eq('partner_id', partner_id))
         research = data[1][0] if data and len(data) > 1 and len(data[1]) > 0 else None
         if research:
             return {"success": True, "research": research}
@@ -34,7 +34,7 @@ async def save_partner_research(data: dict = Body(...)):
         research_data = data.get('research_data')
         if not partner_id or not research_data:
             return JSONResponse(status_code=400, content={"success": False, "message": "Missing required fields: partner_id and research_data are required"})
-        resp, count = supabase.table('partner_research').upsert({"partner_id": partner_id, "research_data": research_data}).execute()
+        resp, count = await db.execute(supabase.table('partner_research').upsert({"partner_id": partner_id, "research_data": research_data}))
         if resp:
             return {"success": True, "message": f"Research data for partner {partner_id} saved successfully"}
         else:
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Query
 from fastapi.responses import JSONResponse
-from NEWAPI import config
+from NEWAPI import config, db
 import traceback
 
 router = APIRouter(prefix="/api/potential-partners", tags=["Potential Partners"])
@@ -33,7 +33,7 @@ async def get_partners(
             query = query.lte('created_at', date_to)
         if sort_by:
             query = query.order(sort_by, desc=(sort_order == 'desc'))
-        data, count = query.execute()
+        data, count = await db.execute(query)
         partners = []
         if data and len(data) > 1:
             partners = data[1]
@@ -57,7 +57,7 @@ async def add_partner(partner: dict):
         supabase = config.supabase
         if not supabase:
             return JSONResponse(status_code=500, content={"status": "error", "message": "Supabase client not available."})
-        data, count = supabase.table('potential_partners').insert(partner).execute()
+        data, count = await db.execute(supabase.table('potential_partners').insert(partner))
         if data:
             return {"status": "success", "message": "Partner added successfully."}
         else:
@@ -74,7 +74,7 @@ async def clear_partners():
         supabase = config.supabase
         if not supabase:
             return JSONResponse(status_code=500, content={"status": "error", "message": "Supabase client not available."})
-        supabase.table('potential_partners').delete().execute()
+        await db.execute(supabase.table('potential_partners').delete())
         return {"status": "success", "message": "Potential partners cleared successfully."}
     except Exception as e:
         print(f"Error clearing potential partners: {str(e)}")
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Query
 from fastapi.responses import JSONResponse
-from NEWAPI import config
+from NEWAPI import config, db
 import traceback
 
 router = APIRouter(prefix="/api/top-partners", tags=["Top Partners"])
@@ -14,7 +14,7 @@ async def get_top_partners(limit: int = Query(10)):
         supabase = config.supabase
         if not supabase:
             return JSONResponse(status_code=500, content={"success": False, "message": "Database connection not available", "partners": []})
-        data, count = supabase.table('potential_partners').select('*').order('partnership_score', desc=True).limit(limit).execute()
+        data, count = await db.execute(supabase.table('potential_partners').select('*').order('partnership_score', desc=True).limit(limit))
         partners = data[1] if data and len(data) > 1 else []
         if partners:
             return {"success": True, "message": "Top partners retrieved successfully", "partners": partners}
@@ -0,0 +1,10 @@
+import os
+import sys
+
+# Add parent directory to path so we can import the app package
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Only the research blueprint is imported, not app.py; Vercel serves the WSGI `app`
+from app.serverless import create_research_app
+
+app = create_research_app()
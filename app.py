@@ -1,49 +1,31 @@
 import os
 import requests
 import json
-from flask import Flask, render_template, request, jsonify, send_from_directory, send_file
-from openai import OpenAI
+from flask import Flask, render_template, request, jsonify, send_file, Response, stream_with_context
+from werkzeug.wsgi import wrap_file
 from dotenv import load_dotenv
 from datetime import datetime
 import base64
 import re
 import argparse
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import OrderedDict
+from itertools import chain
 import random
 import traceback
-from threading import Thread
+from threading import Thread, Lock
 import time  # Added for sleep function
 # import sqlite3 # Removed SQLite
-from supabase import create_client, Client # Added Supabase
 from flask_cors import CORS
 import io
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle, PageBreak
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib import colors
-from reportlab.lib.units import inch
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
+import contextvars
 
 # Load environment variables
 load_dotenv()
 
 # --- Supabase Setup ---
-# Use Project URL and Anon Key from environment variables
-supabase_url = os.environ.get("SUPABASE_URL")
-supabase_key = os.environ.get("SUPABASE_ANON_KEY")
-
-# Initialize client only if URL and Key are present
-if supabase_url and supabase_key:
-    try:
-        supabase: Client = create_client(supabase_url, supabase_key)
-        print("Supabase client initialized successfully.")
-    except Exception as e:
-        print(f"Error initializing Supabase client: {e}")
-        supabase = None # Set client to None on error
-else:
-    print("Warning: SUPABASE_URL or SUPABASE_ANON_KEY environment variables not set. Supabase client not initialized.")
-    supabase = None
+# One client shared with the blueprints, created on first use (SUPABASE_URL / SUPABASE_ANON_KEY)
+from app.models.database import supabase_client as supabase
 # --- End Supabase Setup ---
 
 # Set up static folder for React build
@@ -62,11 +44,46 @@ from app.routes.partner_research import partner_research_bp
 from app.routes.seed_data import seed_data_bp
 from app.routes.top_partners import top_partners_bp
 from app.routes.generate_research import generate_research_bp
+from app.routes.logos import logos_bp
+from app.services.research_pdf import generate_research_pdf, iter_research_pdfs
+from app.services.logo_service import get_logo_url, get_source_logo_url, cached_logo_url, resolve_logo_domain, get_logo
+from app.services.pipeline import Pipeline, StopPipeline
+from app.services.checkpoint_store import CheckpointStore, new_search_id
+from app.services.openai_provider import get_openai_client, OPENAI_HTTP2
+from app.services.upstream_governor import upstream_governor, UPSTREAM_UNAVAILABLE
+from app.services.deadline import install_request_deadline, degraded
+from app.services.scoring_engine import ScoringEngine, scoring_inputs
+from app.services.chunk_planner import estimate_tokens, rate_limits, run_adaptive_batches
+from app.services.exa_provider import search_with_contents
+from app.services.context_budget import build_search_context, CONTEXT_TOKEN_BUDGET
+from app.services.name_extractor import extract_names_locally, NAME_EXTRACTION_MODE, VERIFY_CONTEXT_BUDGET
+from app.services.competition_prescreen import CompetitionPrescreen, describe_from_results, PRESCREEN_ENABLED
+from app.services.verdict_store import VerdictStore
+from app.services.model_cascade import (
+    ANALYSIS_MODE, TRIAGE_MODEL, FULL_MODEL, TRIAGE_THRESHOLD, TRIAGE_MAX_CHUNK_SIZE,
+    TRIAGE_OUTPUT_TOKENS_PER_COMPANY, TierMetrics
+)
+from app.utils.zip_stream import stream_zip
+from app.utils.lazy import LazyClient
+from static_assets import StaticAssets
+from app.utils.json_stream import ArrayItemStream
+from app.utils.json_response import json_response
 app.register_blueprint(potential_partners_bp)
 app.register_blueprint(partner_research_bp)
 app.register_blueprint(seed_data_bp)
 app.register_blueprint(top_partners_bp)
 app.register_blueprint(generate_research_bp)
+app.register_blueprint(logos_bp)
+
+# RapidAPI (LinkedIn Data API) calls give up after this many seconds, or sooner if the request deadline is closer
+RAPIDAPI_TIMEOUT = float(os.environ.get("RAPIDAPI_TIMEOUT", 20))
+
+@app.before_request
+def warm_up_on_first_request():
+    start_warm_up()
+
+# Every upstream call made for a request shares one deadline; the synchronous search gets a longer one
+install_request_deadline(app, long_endpoints=('search', 'proxy_search'))
 
 # Add a debug route to test partner research
 @app.route('/api/debug/partner-research/<partner_id>', methods=['GET'])
@@ -111,7 +128,9 @@ def test_linkedin_data(company_name):
 
         # Make the request
         print(f"Making direct API request to: {url} for company: {company_name}")
-        response = requests.get(url, headers=headers, params=querystring)
+        with upstream_governor.slot("rapidapi") as call:
+            response = requests.get(url, headers=headers, params=querystring, timeout=call.timeout(RAPIDAPI_TIMEOUT))
+            call.observe(response)
 
         # Check response
         if response.status_code == 200:
@@ -154,7 +173,10 @@ def format_linkedin_data(data):
             "industry": ", ".join(company_data.get("industries", [])) if company_data.get("industries") else "",
             "founded": company_data.get("founded", ""),
             "company_type": company_data.get("type", ""),
-            "description": company_data.get("description", "")
+            "description": company_data.get("description", ""),
+            "employee_count": company_data.get("staffCount"),
+            "follower_count": company_data.get("followerCount"),
+            "funding_rounds": (company_data.get("fundingData") or {}).get("numFundingRounds")
         },
         "leadership": {
             "executives": []
@@ -321,6 +343,8 @@ def save_potential_partner(company, industry):
         market_analysis = {}
         if 'market_analysis' in company and isinstance(company['market_analysis'], dict):
             market_analysis = company['market_analysis']
+        # Keep the enrichment values the scoring engine reads, for bulk rescoring (rescore_partners.py)
+        market_analysis = dict(market_analysis, scoring_inputs=scoring_inputs(company))
 
         # Partnership Potential
         partnership_potential = {}
@@ -481,7 +505,7 @@ def get_potential_partners():
                      'headquarters': row.get('hq_location'), # Map back
                      'website': row.get('website'),
                      'company_size': row.get('size_range'), # Map back
-                     'logo_url': row.get('logo'), # Map back
+                     'logo_url': cached_logo_url(row.get('logo')), # Map back, served from the logo cache
                      'created_at': row.get('created_at'),
                      'last_updated': row.get('updated_at') # Map back
                  }
@@ -601,9 +625,29 @@ def load_search_history():
     search_history = get_search_history_from_db()
     print(f"Loaded {len(search_history)} recent searches from database")
 
-# Load recent search history for current session
-search_history = get_search_history_from_db()
-print(f"Loaded {len(search_history)} recent searches from database")
+# Startup data is loaded by warm_up() in the background, not at import (see start_warm_up)
+_warm_up_started = False
+_warm_up_lock = Lock()
+
+def warm_up():
+    """Create the API clients and load startup data ahead of the requests that need them"""
+    started = time.time()
+    try:
+        supabase.get()
+        openai.get()
+        load_search_history()
+    except Exception as e:
+        print(f"Error warming up: {str(e)}")
+    print(f"Warm-up finished in {time.time() - started:.2f}s")
+
+def start_warm_up():
+    """Run warm_up() once per process on a daemon thread"""
+    global _warm_up_started
+    with _warm_up_lock:
+        if _warm_up_started:
+            return
+        _warm_up_started = True
+    Thread(target=warm_up, name="warm-up", daemon=True).start()
 
 # Global variable to track search progress and previously considered companies
 search_status = {
@@ -614,30 +658,20 @@ search_status = {
     "error": None
 }
 
-# Initialize OpenAI client with proper error handling and configuration
-try:
-    api_key = os.getenv('OPENAI_API_KEY')
-    if not api_key:
-        raise ValueError("OpenAI API key not found in environment variables")
-
-    # Import httpx for custom client
-    import httpx
-
-    # Create custom HTTP client without proxy settings
-    http_client = httpx.Client(
-        timeout=60.0,
-        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
-    )
+def create_openai_client():
+    try:
+        client = get_openai_client()
+        if not client:
+            raise ValueError("OpenAI API key not found in environment variables")
+        print("OpenAI client initialized successfully (HTTP/2)" if OPENAI_HTTP2 else "OpenAI client initialized successfully")
+        return client
+    except Exception as e:
+        print(f"Error initializing OpenAI client: {str(e)}")
+        return None
 
-    # Initialize OpenAI with custom client
-    openai = OpenAI(
-        api_key=api_key,
-        http_client=http_client
-    )
-    print("OpenAI client initialized successfully with API key:", api_key[:10] + "..." + api_key[-5:])
-except Exception as e:
-    print(f"Error initializing OpenAI client: {str(e)}")
-    openai = None
+# Shared OpenAI client: pooled keep-alive connections and one retry policy for every call.
+# Created on first use so cold starts don't import the SDK until a request needs it.
+openai = LazyClient(create_openai_client, "OpenAI client")
 
 # Exa API key
 EXA_API_KEY = os.getenv('EXA_API_KEY')
@@ -776,121 +810,85 @@ CURRENT_PARTNERS = [
     {"name": "Expedia", "category": "Travel services", "description": "Online travel booking for flights, hotels, cars, cruises, and packages", "inclusions": ["Travel booking", "Vacation planning"], "exclusions": ["Other travel booking platforms"]}
 ]
 
-# Scoring criteria for partnership evaluation
-SCORING_CRITERIA = {
-    "location": {
-        "name": "Location-Based Presence",
-        "max_points": 2,
-        "criteria": [
-            {"points": 2, "description": "Headquartered in Toronto"},
-            {"points": 1.5, "description": "Based in Ontario (outside Toronto)"},
-            {"points": 1, "description": "Based in Canada (outside Ontario)"},
-            {"points": 0.5, "description": "Based in North America (outside Canada)"},
-            {"points": 0.2, "description": "International location"}
-        ]
-    },
-    "employee_size": {
-        "name": "Employee Size & Organizational Scale",
-        "max_points": 1,
-        "criteria": [
-            {"points": 0.2, "description": "100+ employees"},
-            {"points": 0.5, "description": "500+ employees"},
-            {"points": 1, "description": "1,000+ employees"}
-        ]
-    },
-    "revenue": {
-        "name": "Annual Revenue",
-        "max_points": 1,
-        "criteria": [
-            {"points": 0.3, "description": "Revenue > $1M/year"},
-            {"points": 0.6, "description": "Revenue > $10M/year"},
-            {"points": 1, "description": "Revenue > $50M/year"}
-        ]
-    },
-    "funding": {
-        "name": "Funding & Capital Activity",
-        "max_points": 1,
-        "criteria": [
-            {"points": 0.3, "description": "Multiple funding rounds (2+)"},
-            {"points": 0.6, "description": "5+ funding rounds"},
-            {"points": 1, "description": "Total funding exceeds $50M+"}
-        ]
-    },
-    "talent": {
-        "name": "Talent Acquisition & Hiring Trends",
-        "max_points": 1,
-        "criteria": [
-            {"points": 0.4, "description": "Actively hiring for Marketing/Brand roles"},
-            {"points": 0.3, "description": "3 or more active job listings"},
-            {"points": 0.3, "description": "10+ total open positions"}
-        ]
-    },
-    "industry": {
-        "name": "Industry Relevance & Vertical Fit",
-        "max_points": 1.2,
-        "criteria": [
-            {"points": 0.4, "description": "Operates in Sports, Entertainment, or Events"},
-            {"points": 0.4, "description": "Operates in Hospitality, Food & Beverage"},
-            {"points": 0.4, "description": "Operates in Technology, Fintech, or AI"}
-        ]
-    },
-    "brand": {
-        "name": "Brand Visibility & Market Influence",
-        "max_points": 1.2,
-        "criteria": [
-            {"points": 0.4, "description": "10,000+ LinkedIn followers"},
-            {"points": 0.4, "description": "50,000+ total social media followers"},
-            {"points": 0.4, "description": "Featured in prominent media outlets (e.g., Forbes, Bloomberg, TechCrunch)"}
-        ]
-    },
-    "sponsorship": {
-        "name": "Sponsorship & Activation History",
-        "max_points": 0.8,
-        "criteria": [
-            {"points": 0.4, "description": "Proven history of sponsorships with sports, venues, or events"},
-            {"points": 0.4, "description": "Has an active sponsorship/partnership program"}
-        ]
-    },
-    "b2b": {
-        "name": "B2B Synergy & Relationship Fit",
-        "max_points": 0.7,
-        "criteria": [
-            {"points": 0.3, "description": "Existing relationship with Scotiabank Arena tenants (Raptors, Maple Leafs, etc.)"},
-            {"points": 0.4, "description": "Past or current collaborations with Scotiabank or affiliated brands"}
-        ]
-    },
-    "csr": {
-        "name": "Corporate Social Responsibility & Impact",
-        "max_points": 0.7,
-        "criteria": [
-            {"points": 0.3, "description": "Active in community programs or philanthropic initiatives"},
-            {"points": 0.4, "description": "Dedicated CSR program or foundation"}
-        ]
-    }
-}
+# Partner vectors for the local competition pre-screen, built once
+competition_prescreen = CompetitionPrescreen(CURRENT_PARTNERS)
 
-# Calculate max total score
-MAX_TOTAL_SCORE = sum(category["max_points"] for category in SCORING_CRITERIA.values())
+# Scoring criteria for partnership evaluation (shared with the FastAPI routers and scoring jobs)
+from scoring_criteria import SCORING_CRITERIA, MAX_TOTAL_SCORE
 
-# Function to generate a logo using logo.dev API
-def generate_logo(company_name):
-    try:
-        # Clean the company name to create a domain-like string
-        # Remove special characters and spaces, convert to lowercase
-        domain_name = re.sub(r'[^a-zA-Z0-9]', '', company_name.lower())
+# Stored competition verdicts and scores, valid for this partner set and these criteria
+verdict_store = VerdictStore(CURRENT_PARTNERS, SCORING_CRITERIA, prescreen=competition_prescreen)
 
-        # Add .com to make it look like a domain
-        if not domain_name.endswith('.com'):
-            domain_name = f"{domain_name}.com"
+# Stage outputs of unfinished searches, so a failed search resumes where it stopped
+checkpoint_store = CheckpointStore()
 
-        # Use logo.dev API to generate a logo
-        logo_url = f"https://img.logo.dev/{domain_name}?token=pk_TCK5i8rzR92YmS65BY2fgQ&retina=true"
+# Function to generate a logo URL using logo.dev API
+def generate_logo(company_name, website=None):
+    """Return the logo.dev URL for a company, the form saved to the database
 
-        return logo_url
+    Responses point it at the local logo cache instead (see with_local_logos
+    and app/services/logo_service.py).
+    """
+    try:
+        return get_source_logo_url(company_name, website)
     except Exception as e:
         print(f"Error generating logo: {e}")
         # Return a default logo if there's an error
-        return "https://img.logo.dev/default.com?token=pk_TCK5i8rzR92YmS65BY2fgQ&retina=true"
+        return get_source_logo_url("default")
+
+def with_local_logos(analysis):
+    """An analysis whose company logos load from the local logo cache"""
+    if not isinstance(analysis, dict) or not analysis.get('companies'):
+        return analysis
+    companies = [
+        dict(company, logo=cached_logo_url(company['logo'])) if isinstance(company, dict) and company.get('logo') else company
+        for company in analysis['companies']
+    ]
+    return dict(analysis, companies=companies)
+
+# Names of stored potential partners, refreshed at most every 10 minutes
+_partner_names_cache = {"names": [], "loaded_at": 0}
+
+# PostgREST caps a select at 1000 rows, so the names are read in pages of this size
+GAZETTEER_PAGE_SIZE = 1000
+
+def get_name_gazetteer():
+    """Company names we already know about, used by the local name extractor"""
+    if supabase and time.time() - _partner_names_cache["loaded_at"] > 600:
+        try:
+            names = []
+            last_id = 0
+            while True:
+                response = supabase.table('potential_partners').select('id, name') \
+                    .gt('id', last_id).order('id').limit(GAZETTEER_PAGE_SIZE).execute()
+                rows = response.data or []
+                names.extend(row['name'] for row in rows if row.get('name'))
+                if len(rows) < GAZETTEER_PAGE_SIZE:
+                    break
+                last_id = rows[-1]['id']
+            _partner_names_cache["names"] = names
+        except Exception as e:
+            print(f"Error loading partner names for the gazetteer: {str(e)}")
+        _partner_names_cache["loaded_at"] = time.time()
+
+    names = set(previously_considered_companies or [])
+    names.update(p['name'] for p in CURRENT_PARTNERS)
+    names.update(_partner_names_cache["names"])
+    return names
+
+def record_search_results(industry, search_results):
+    """Save raw search results to SEARCH_RECORDINGS_DIR (when set) for offline benchmarks"""
+    recordings_dir = os.environ.get("SEARCH_RECORDINGS_DIR")
+    if not recordings_dir or not search_results:
+        return
+    try:
+        os.makedirs(recordings_dir, exist_ok=True)
+        slug = re.sub(r'[^a-z0-9]+', '-', industry.lower()).strip('-')[:60] or 'search'
+        path = os.path.join(recordings_dir, f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{slug}.json")
+        with open(path, 'w') as f:
+            json.dump({"industry": industry, "recorded_at": datetime.now().isoformat(), "results": search_results}, f)
+    except Exception as e:
+        print(f"Error recording search results: {str(e)}")
 
 # Function to search for companies in an industry
 def search_companies_in_industry(industry, api_key):
@@ -905,103 +903,19 @@ def search_companies_in_industry(industry, api_key):
 
         print(f"Searching for companies related to: {industry}")
 
-        # Use requests to directly call the Exa API to find companies
-        search_url = "https://api.exa.ai/search"
-        headers = {
-            "x-api-key": api_key,
-            "Content-Type": "application/json"
-        }
-
-        search_payload = {
-            "query": f"top companies in {industry} industry",
-            "num_results": 40,  # Increased from 20 to 40
-            "use_autoprompt": True
-        }
-
-        # Make the search request with timeout
+        # One Exa round-trip returns results with capped page text and highlights
         try:
-            print(f"Sending request to Exa API: {search_url}")
-            search_response = requests.post(
-                search_url,
-                headers=headers,
-                json=search_payload,
-                timeout=15  # Add timeout to prevent request hanging
-            )
-            print(f"Received response with status code: {search_response.status_code}")
-        except requests.exceptions.RequestException as e:
-            print(f"Request error in search: {str(e)}")
-            return []
-
-        if search_response.status_code != 200:
-            print(f"Error from Exa API: {search_response.status_code}")
-            print(f"Response text: {search_response.text}")
-            return []
-
-        try:
-            search_data = search_response.json()
-        except json.JSONDecodeError as e:
-            print(f"Failed to parse search response as JSON: {str(e)}")
+            search_results = search_with_contents(f"top companies in {industry} industry", api_key)
+        except Exception as e:
+            print(f"Error from Exa API: {str(e)}")
             return []
 
-        # Extract and process results
-        search_results = []
-        results = search_data.get('results', [])
-
-        if not results:
+        if not search_results:
             print("No results found in search response")
             return []
 
-        for result in results:
-            try:
-                # Get content for each result - using base URL properly
-                content_url = "https://api.exa.ai/content" # Updated URL
-                content_payload = {
-                    "url": result.get('url'),
-                    "include_text": True
-                }
-
-                try:
-                    content_response = requests.post(
-                        content_url,
-                        headers=headers,
-                        json=content_payload,
-                        timeout=10  # Add timeout to prevent hanging requests
-                    )
-
-                    if content_response.status_code == 200:
-                        try:
-                            content_data = content_response.json()
-                            text_content = content_data.get('text', result.get('snippet', ''))
-                        except json.JSONDecodeError:
-                            text_content = result.get('snippet', '')
-                    else:
-                        # Gracefully handle error - just use the snippet instead
-                        text_content = result.get('snippet', '')
-                        if content_response.status_code != 404:  # Only log non-404 errors
-                            print(f"Error fetching content (status {content_response.status_code})")
-                except requests.exceptions.RequestException as re:
-                    # Handle request exceptions (timeouts, connection errors)
-                    text_content = result.get('snippet', '')
-                    print(f"Request error fetching content: {str(re)}")
-
-                search_results.append({
-                    "title": result.get('title', ''),
-                    "url": result.get('url', ''),
-                    "text": text_content,
-                    "snippet": result.get('snippet', '')
-                })
-
-            except Exception as e:
-                print(f"Error processing result {result.get('url', 'unknown')}: {str(e)}")
-                # Still add the result with whatever data we have
-                search_results.append({
-                    "title": result.get('title', ''),
-                    "url": result.get('url', ''),
-                    "text": result.get('snippet', ''),
-                    "snippet": result.get('snippet', '')
-                })
-
         print(f"Successfully processed {len(search_results)} search results")
+        record_search_results(industry, search_results)
         return search_results
     except Exception as e:
         print(f"Unexpected error in search_companies_in_industry: {str(e)}")
@@ -1016,24 +930,52 @@ def extract_company_names(search_results, industry):
             print("Warning: Empty or invalid search results")
             return []
 
-        # Format the results for OpenAI
-        formatted_results = "\n\n".join([
-            f"Title: {r.get('title', 'No Title')}\nURL: {r.get('url', 'No URL')}\nContent: {r.get('text', r.get('snippet', 'No Content'))}"
-            for r in search_results
-        ])
+        # Try the local extractor first; GPT only verifies or completes its list when it is unsure
+        local_extraction = None
+        if NAME_EXTRACTION_MODE != 'gpt':
+            started = time.time()
+            local_extraction = extract_names_locally(search_results, industry, gazetteer=get_name_gazetteer())
+            print(f"Local name extraction: {len(local_extraction['companies'])} companies, "
+                  f"confidence {local_extraction['confidence']} in {(time.time() - started) * 1000:.1f}ms")
+            if NAME_EXTRACTION_MODE == 'local' or not local_extraction['needs_verification']:
+                return local_extraction['companies'][:40]
+
+        # Format the results for OpenAI, keeping only the densest passages within the token budget
+        verifying = bool(local_extraction and local_extraction['companies'])
+        formatted_results, context_stats = build_search_context(
+            search_results, industry, token_budget=VERIFY_CONTEXT_BUDGET if verifying else CONTEXT_TOKEN_BUDGET
+        )
+        print(f"Search context for '{industry}': {context_stats['tokens_after']} tokens "
+              f"(was {context_stats['tokens_before']}, saved {context_stats['tokens_saved']}); "
+              f"kept {context_stats['pages_kept']}/{context_stats['pages_in']} pages, "
+              f"{context_stats['passages_kept']}/{context_stats['passages_considered']} passages")
 
         # Make sure we have some content to analyze
         if not formatted_results.strip():
             print("Warning: No content to analyze in search results")
             return []
 
-        prompt = f"""
-        Based on the search results about the {industry} industry, identify the top 40 companies in this industry.
-        Return ONLY a JSON array of company names, nothing else.
+        if verifying:
+            prompt = f"""
+            Based on the search results about the {industry} industry, identify the top 40 companies in this industry.
+            An automatic extractor proposed the candidates below. Some may not be companies in this industry and
+            some companies from the search results may be missing. Remove the wrong ones and add the missing ones.
+            Return ONLY a JSON array of company names, nothing else.
 
-        SEARCH RESULTS:
-        {formatted_results}
-        """
+            CANDIDATES:
+            {json.dumps(local_extraction['companies'][:60])}
+
+            SEARCH RESULTS:
+            {formatted_results}
+            """
+        else:
+            prompt = f"""
+            Based on the search results about the {industry} industry, identify the top 40 companies in this industry.
+            Return ONLY a JSON array of company names, nothing else.
+
+            SEARCH RESULTS:
+            {formatted_results}
+            """
 
         response = openai.chat.completions.create(
             model="gpt-4o",  # Upgraded from gpt-4o-mini to full gpt-4o
@@ -1575,18 +1517,13 @@ def fetch_coresignal_data(company_name):
 
     return enriched_data
 
-# Split companies into chunks for parallel analysis
-def split_into_chunks(companies, chunk_size=4):
-    """Split a list of companies into chunks for parallel processing"""
-    return [companies[i:i + chunk_size] for i in range(0, len(companies), chunk_size)]
-
-# Process a chunk of companies for analysis
-def process_company_chunk(companies_chunk, industry, formatted_partners, formatted_scoring):
-    """Analyze a chunk of companies in parallel"""
+# Build the analysis prompt for a chunk of companies
+def build_chunk_prompt(companies_chunk, industry, formatted_partners, formatted_scoring):
+    """Everything except the company list is identical across chunks (the shared prefix)"""
     formatted_companies = ", ".join(companies_chunk)
 
     # Enhanced prompt with more explicit instructions for competitor detection
-    prompt = f"""
+    return f"""
     I need you to analyze the following companies in the {industry} industry:
     {formatted_companies}
 
@@ -1641,85 +1578,300 @@ def process_company_chunk(companies_chunk, industry, formatted_partners, formatt
     }}
     """
 
+# Build the cheap first-pass prompt used to triage candidates in large batches
+def build_triage_prompt(companies_chunk, industry, partner_summary):
+    """Competition check and a rough 0-10 fit score only, so answers stay a few tokens per company"""
+    formatted_companies = ", ".join(companies_chunk)
+
+    return f"""
+    Quickly triage the following companies in the {industry} industry as potential sports and entertainment partners:
+    {formatted_companies}
+
+    For each company decide:
+    - Whether it competes with any of our current partners (same products/services as a partner, or named in a partner's exclusions).
+      Be conservative - if there's any significant overlap, mark it as competing.
+    - A rough partnership fit score from 0 (poor fit) to 10 (excellent fit).
+
+    Our current partners (name, category, exclusions) are:
+    {partner_summary}
+
+    Return a JSON object with the following structure:
+    {{
+        "companies": [
+            {{
+                "name": "Company Name",
+                "description": "One sentence about the company",
+                "competes_with_partners": true/false,
+                "competing_partners": ["Partner1"],
+                "rough_score": X
+            }}
+        ]
+    }}
+    """
+
+def _normalize_company_name(name):
+    return re.sub(r'[^a-z0-9]', '', str(name or '').lower())
+
+def _analysis_placeholder(company):
+    return {"name": company, "description": f"Analysis could not be completed for {company}", "competes_with_partners": False, "scores": {}, "total_score": 0}
+
+def _validate_company_analysis(company_data, companies_chunk, position):
+    """Fill in missing fields of one company's analysis and zero the score of competitors"""
+    # Ensure company has a name
+    if not company_data.get("name"):
+        company_data["name"] = companies_chunk[position] if position < len(companies_chunk) else "Unknown Company"
+
+    # Ensure company has required fields
+    if not company_data.get("description"):
+        company_data["description"] = f"No description available for {company_data['name']}"
+
+    if not isinstance(company_data.get("competes_with_partners"), bool):
+        company_data["competes_with_partners"] = False
+
+    if not company_data.get("scores"):
+        company_data["scores"] = {}
+
+    if not isinstance(company_data.get("total_score"), (int, float)):
+        company_data["total_score"] = 0
+
+    # If the company competes with partners, set total_score to 0
+    if company_data.get("competes_with_partners") == True:
+        original_score = company_data.get("total_score", 0)
+        company_data["total_score"] = 0
+        print(f"Initial processing: Setting score to 0 for {company_data['name']} due to competition (original: {original_score})")
+
+    return company_data
+
+# Process a chunk of companies for analysis
+def process_company_chunk(companies_chunk, industry, formatted_partners, formatted_scoring, model=FULL_MODEL, on_company=None, metrics=None):
+    """Analyze a chunk of companies
+
+    The completion is streamed and each company is validated (and handed
+    to on_company) as soon as its JSON object closes, so callers can start
+    enriching it while the model is still writing the rest. A truncated
+    response keeps every company that was complete.
+
+    Returns:
+        tuple: (validated company analyses, names the model left out or failed on)
+    """
+    formatted_companies = ", ".join(companies_chunk)
+    prompt = build_chunk_prompt(companies_chunk, industry, formatted_partners, formatted_scoring)
+
+    validated_companies = []
+
+    def handle_company(company_data):
+        if not isinstance(company_data, dict):
+            return
+        validated_companies.append(
+            _validate_company_analysis(company_data, companies_chunk, len(validated_companies))
+        )
+        if on_company:
+            try:
+                on_company(company_data)
+            except Exception as e:
+                print(f"Error in on_company callback for {company_data.get('name')}: {str(e)}")
+
+    parser = ArrayItemStream("companies", handle_company)
+    content_parts = []
+
     try:
-        response = openai.chat.completions.create(
-            model="gpt-4o",
+        # Raw response so the batcher can see OpenAI's rate-limit headers
+        started = time.time()
+        raw_response = openai.chat.completions.with_raw_response.create(
+            model=model,
             messages=[
                 {"role": "system", "content": "You are a professional business analyst specializing in partnership and competitive analysis. Your primary task is to thoroughly evaluate potential competition between companies and existing partners."},
                 {"role": "user", "content": prompt}
             ],
-            response_format={"type": "json_object"}
+            response_format={"type": "json_object"},
+            stream=True
         )
+        rate_limits.update(raw_response.headers)
 
-        # Check if response content exists and is valid
-        if not response or not response.choices or not response.choices[0].message or not response.choices[0].message.content:
-            print(f"Error: Empty or invalid response from OpenAI for chunk: {formatted_companies}")
-            return [{"name": company, "description": f"Analysis failed for {company}", "competes_with_partners": False, "scores": {}, "total_score": 0} for company in companies_chunk]
+        finish_reason = None
+        try:
+            for event in raw_response.parse():
+                if not event.choices:
+                    continue
+                choice = event.choices[0]
+                delta = choice.delta.content if choice.delta else None
+                if delta:
+                    content_parts.append(delta)
+                    parser.feed(delta)
+                if choice.finish_reason:
+                    finish_reason = choice.finish_reason
+        except Exception as e:
+            print(f"Stream for chunk {formatted_companies} broke off after {len(validated_companies)} companies: {str(e)}")
+
+        content = "".join(content_parts)
+        # Streams don't report usage on this client version, so estimate it
+        if metrics is not None:
+            metrics.record(
+                "full", len(companies_chunk), time.time() - started,
+                prompt_tokens=estimate_tokens(prompt), completion_tokens=estimate_tokens(content)
+            )
 
-        content = response.choices[0].message.content.strip()
-        if not content:
+        if not content.strip():
             print(f"Error: Empty content from OpenAI for chunk: {formatted_companies}")
-            return [{"name": company, "description": f"Analysis failed for {company}", "competes_with_partners": False, "scores": {}, "total_score": 0} for company in companies_chunk]
+            return [], list(companies_chunk)
+        if finish_reason == "length":
+            print(f"Response for chunk {formatted_companies} was truncated, keeping {len(validated_companies)} complete companies")
+        if parser.errors:
+            print(f"Skipped {parser.errors} malformed company objects in chunk {formatted_companies}")
+            print(f"Raw content: {content[:500]}...")
+
+        # Report companies the model skipped so only those get re-analyzed
+        returned_names = {_normalize_company_name(c.get("name")) for c in validated_companies}
+        missing_companies = [company for company in companies_chunk if _normalize_company_name(company) not in returned_names]
+        if missing_companies:
+            print(f"Analysis for chunk {formatted_companies} is missing: {', '.join(missing_companies)}")
 
+        return validated_companies, missing_companies
+
+    except Exception as e:
+        print(f"Error analyzing chunk {formatted_companies}: {str(e)}")
+        # Keep whatever streamed in before the failure
+        returned_names = {_normalize_company_name(c.get("name")) for c in validated_companies}
+        return validated_companies, [company for company in companies_chunk if _normalize_company_name(company) not in returned_names]
+
+# Triage a chunk of companies with the cheap model
+def process_triage_chunk(companies_chunk, industry, partner_summary, metrics=None):
+    """Returns (triage results keyed by the requested name, names the model left out)"""
+    started = time.time()
+    raw_response = openai.chat.completions.with_raw_response.create(
+        model=TRIAGE_MODEL,
+        messages=[
+            {"role": "system", "content": "You are a business analyst screening companies for partnership potential and competition with existing partners."},
+            {"role": "user", "content": build_triage_prompt(companies_chunk, industry, partner_summary)}
+        ],
+        response_format={"type": "json_object"}
+    )
+    rate_limits.update(raw_response.headers)
+    response = raw_response.parse()
+    if metrics is not None:
+        metrics.record("triage", len(companies_chunk), time.time() - started, getattr(response, 'usage', None))
+
+    content = response.choices[0].message.content if response and response.choices else None
+    requested = {_normalize_company_name(company): company for company in companies_chunk}
+    triaged = []
+    for item in json.loads(content or "{}").get("companies", []):
+        if not isinstance(item, dict):
+            continue
+        company = requested.get(_normalize_company_name(item.get("name")))
+        if not company:
+            continue
         try:
-            chunk_analysis = json.loads(content)
-            # Extract just the companies from the chunk result
-            companies_data = chunk_analysis.get("companies", [])
-
-            # Validate each company has required fields
-            validated_companies = []
-            for company_data in companies_data:
-                # Ensure company has a name
-                if not company_data.get("name"):
-                    company_data["name"] = companies_chunk[len(validated_companies)] if len(validated_companies) < len(companies_chunk) else "Unknown Company"
-
-                # Ensure company has required fields
-                if not company_data.get("description"):
-                    company_data["description"] = f"No description available for {company_data['name']}"
-
-                if not isinstance(company_data.get("competes_with_partners"), bool):
-                    company_data["competes_with_partners"] = False
-
-                if not company_data.get("scores"):
-                    company_data["scores"] = {}
-
-                if not isinstance(company_data.get("total_score"), (int, float)):
-                    company_data["total_score"] = 0
-
-                # If the company competes with partners, set total_score to 0
-                if company_data.get("competes_with_partners") == True:
-                    original_score = company_data.get("total_score", 0)
-                    company_data["total_score"] = 0
-                    print(f"Initial processing: Setting score to 0 for {company_data['name']} due to competition (original: {original_score})")
-
-                validated_companies.append(company_data)
-
-            # If no valid companies were found or count doesn't match, create default entries
-            if not validated_companies or len(validated_companies) != len(companies_chunk):
-                missing_companies = [company for company in companies_chunk if company not in [c.get("name") for c in validated_companies]]
-                for missing_company in missing_companies:
-                    validated_companies.append({
-                        "name": missing_company,
-                        "description": f"Analysis could not be completed for {missing_company}",
-                        "competes_with_partners": False,
-                        "scores": {},
-                        "total_score": 0
-                    })
+            rough_score = float(item.get("rough_score", 0))
+        except (TypeError, ValueError):
+            rough_score = 0.0
+        triaged.append(dict(item, name=company, rough_score=rough_score))
 
-            return validated_companies
+    returned = {_normalize_company_name(item["name"]) for item in triaged}
+    return triaged, [company for company in companies_chunk if _normalize_company_name(company) not in returned]
 
-        except json.JSONDecodeError as e:
-            print(f"JSON parsing error for chunk {formatted_companies}: {str(e)}")
-            print(f"Raw content: {content[:500]}...")
-            return [{"name": company, "description": f"Analysis failed for {company} - JSON parsing error", "competes_with_partners": False, "scores": {}, "total_score": 0} for company in companies_chunk]
+def triage_companies(to_check, industry, per_company_tokens, metrics=None):
+    """Cheap first pass over candidates before the full analysis
+
+    Returns:
+        tuple: to_check narrowed to promising candidates, and analyses
+        for the ones triage settled (competing or below threshold)
+    """
+    partner_summary = "\n".join(
+        f"{p['name']} ({p['category']})" + (f" - excludes: {', '.join(p['exclusions'])}" if p.get('exclusions') else "")
+        for p in CURRENT_PARTNERS
+    )
+    triaged, failed = run_adaptive_batches(
+        to_check,
+        lambda chunk: process_triage_chunk(chunk, industry, partner_summary, metrics),
+        estimate_tokens(build_triage_prompt([], industry, partner_summary)),
+        per_company_tokens,
+        output_tokens_per_item=TRIAGE_OUTPUT_TOKENS_PER_COMPANY,
+        max_chunk_size=TRIAGE_MAX_CHUNK_SIZE
+    )
+    if failed:
+        print(f"Triage failed for {len(failed)} companies, sending them to the full analysis")
+
+    settled, promising = [], set(failed)
+    for item in triaged:
+        base = {
+            "name": item["name"],
+            "description": item.get("description") or f"No description available for {item['name']}",
+            "scores": {},
+            "total_score": 0,
+            "triage_score": item["rough_score"],
+            "analysis_tier": "triage"
+        }
+        if item.get("competes_with_partners") is True:
+            settled.append(dict(
+                base,
+                competes_with_partners=True,
+                competing_partners=item.get("competing_partners") or [],
+                competition_reasons="Flagged as competing during triage"
+            ))
+        elif item["rough_score"] < TRIAGE_THRESHOLD:
+            settled.append(dict(base, competes_with_partners=False))
+        else:
+            promising.add(item["name"])
+
+    print(f"Triage ({TRIAGE_MODEL}): {len(promising)} of {len(to_check)} companies "
+          f"go to the full analysis (threshold {TRIAGE_THRESHOLD})")
+    return [c for c in to_check if c in promising], settled
+
+# Function to generate the industry overview shown above the analysis
+def generate_industry_overview(industry):
+    """Short overview of an industry from the fast model, with a generic fallback"""
+    print(f"Getting industry overview for: {industry}")
+    industry_overview = f"The {industry} industry offers various partnership opportunities."
 
+    try:
+        industry_prompt = f"""
+        Provide a brief overview of the {industry} industry, focusing on its relevance to sports and entertainment partnerships.
+        Return only a JSON object with the structure: {{"industry_overview": "Your overview text here"}}
+        """
+
+        industry_response = openai.chat.completions.create(
+            model="gpt-3.5-turbo",  # Use faster model for overview
+            messages=[
+                {"role": "system", "content": "You are a professional business analyst specializing in partnership and competitive analysis."},
+                {"role": "user", "content": industry_prompt}
+            ],
+            response_format={"type": "json_object"}
+        )
+
+        # Safely extract the overview, handling potential errors
+        if industry_response and industry_response.choices and industry_response.choices[0].message and industry_response.choices[0].message.content:
+            try:
+                industry_data = json.loads(industry_response.choices[0].message.content)
+                if isinstance(industry_data, dict) and "industry_overview" in industry_data:
+                    industry_overview = industry_data["industry_overview"]
+            except json.JSONDecodeError as e:
+                print(f"Error parsing industry overview: {e}")
+                # Keep default overview
     except Exception as e:
-        print(f"Error analyzing chunk {formatted_companies}: {str(e)}")
-        # Return a basic structure if parsing fails
-        return [{"name": company, "description": f"Analysis failed for {company}", "competes_with_partners": False, "scores": {}, "total_score": 0} for company in companies_chunk]
+        print(f"Error getting industry overview: {e}")
+        # Industry overview already has default value
+
+    return industry_overview
 
 # Function to generate company analysis
-def generate_company_analysis(companies, industry):
+def generate_company_analysis(companies, industry, search_results=None, on_company=None, with_overview=True):
+    """Analyze and score companies, checking each for competition with current partners
+
+    Companies with a stored verdict for the current partners are not sent
+    to GPT again. When search_results are given, the rest are pre-screened locally
+    against the partners: companies named in a partner's exclusions are
+    resolved without GPT and the rest get the full competition check.
+
+    on_company, when given, is called with each company's analysis as soon
+    as it is final (full analyses while the model is still streaming).
+    """
+    def emit(company_data):
+        if on_company:
+            try:
+                on_company(company_data)
+            except Exception as e:
+                print(f"Error in on_company callback for {company_data.get('name')}: {str(e)}")
+
     try:
         # Check input parameters
         if not companies or not isinstance(companies, list) or not all(isinstance(c, str) for c in companies):
@@ -1749,72 +1901,88 @@ def generate_company_analysis(companies, industry):
         # Format the companies list for the industry overview
         formatted_companies_all = ", ".join(companies)
 
-        # First, get industry overview separately
-        print(f"Getting industry overview for: {industry}")
-        industry_overview = f"The {industry} industry offers various partnership opportunities."
-
-        try:
-            industry_prompt = f"""
-            Provide a brief overview of the {industry} industry, focusing on its relevance to sports and entertainment partnerships.
-            Return only a JSON object with the structure: {{"industry_overview": "Your overview text here"}}
-            """
-
-            industry_response = openai.chat.completions.create(
-                model="gpt-3.5-turbo",  # Use faster model for overview
-                messages=[
-                    {"role": "system", "content": "You are a professional business analyst specializing in partnership and competitive analysis."},
-                    {"role": "user", "content": industry_prompt}
-                ],
-                response_format={"type": "json_object"}
-            )
-
-            # Safely extract the overview, handling potential errors
-            if industry_response and industry_response.choices and industry_response.choices[0].message and industry_response.choices[0].message.content:
-                try:
-                    industry_data = json.loads(industry_response.choices[0].message.content)
-                    if isinstance(industry_data, dict) and "industry_overview" in industry_data:
-                        industry_overview = industry_data["industry_overview"]
-                except json.JSONDecodeError as e:
-                    print(f"Error parsing industry overview: {e}")
-                    # Keep default overview
-        except Exception as e:
-            print(f"Error getting industry overview: {e}")
-            # Industry overview already has default value
+        # Callers that run the overview in parallel (the search pipeline) pass with_overview=False
+        industry_overview = generate_industry_overview(industry) if with_overview else None
 
         print(f"Processing analysis for companies: {formatted_companies_all}")
 
-        # Process the companies in parallel - split into smaller chunks for better performance
-        company_chunks = split_into_chunks(companies)
-        all_companies = []
+        # Reuse stored verdicts; only companies without one are analyzed
+        stored = verdict_store.get_many(companies, include_triage=ANALYSIS_MODE == 'cascade')
+        all_companies = list(stored.values())
+        for company_data in all_companies:
+            emit(company_data)
+        remaining = [company for company in companies if company not in stored]
+        if stored:
+            print(f"Verdict store: reusing {len(stored)} verdicts, {len(remaining)} companies left to analyze")
+
+        # Companies named in a partner's exclusions are settled locally; everything else gets the GPT check
+        to_check = list(remaining)
+        if PRESCREEN_ENABLED and remaining:
+            excluded = {company: competition_prescreen.exclusion_hit(company) for company in remaining}
+            excluded = {company: partner for company, partner in excluded.items() if partner}
+            if excluded:
+                descriptions = describe_from_results(list(excluded), search_results)
+                for company, partner in excluded.items():
+                    reason = f"{company} is named in {partner}'s exclusions"
+                    print(f"Pre-screen: {reason}, skipping analysis")
+                    all_companies.append({
+                        "name": company,
+                        "description": descriptions.get(company) or f"No description available for {company}",
+                        "competes_with_partners": True,
+                        "competing_partners": [partner],
+                        "competition_reasons": reason,
+                        "scores": {},
+                        "total_score": 0
+                    })
+                    emit(all_companies[-1])
+                to_check = [company for company in remaining if company not in excluded]
+                print(f"Pre-screen: {len(excluded)} excluded, {len(to_check)} need the full competition check")
+
+        # Size chunks from the token cost of the shared prompt prefix vs. each company,
+        # with concurrency following OpenAI's rate-limit headers
+        per_company_tokens = max(1, estimate_tokens(formatted_companies_all) // len(companies))
+        # Counted per call of this function, so concurrent searches don't mix their numbers
+        metrics = TierMetrics()
+
+        # A cheap model settles the obvious cases; only promising candidates get the full pass
+        if ANALYSIS_MODE == 'cascade' and to_check:
+            try:
+                to_check, settled = triage_companies(to_check, industry, per_company_tokens, metrics)
+                all_companies.extend(settled)
+                verdict_store.put_many(settled)
+                for company_data in settled:
+                    emit(company_data)
+            except Exception as e:
+                print(f"Error during triage, analyzing every company with {FULL_MODEL}: {e}")
+
+        shared_prefix_tokens = estimate_tokens(build_chunk_prompt([], industry, formatted_partners, formatted_scoring))
 
         try:
-            # Process chunks in parallel
-            with ThreadPoolExecutor(max_workers=min(5, len(company_chunks))) as executor:
-                # Submit all chunks for processing
-                futures = []
-                for chunk in company_chunks:
-                    future = executor.submit(
-                        process_company_chunk,
-                        chunk,
-                        industry,
-                        formatted_partners,
-                        formatted_scoring
-                    )
-                    futures.append(future)
-
-                # Collect results as they complete
-                for future in as_completed(futures):
-                    try:
-                        chunk_companies = future.result()
-                        if chunk_companies and isinstance(chunk_companies, list):
-                            all_companies.extend(chunk_companies)
-                    except Exception as e:
-                        print(f"Error getting results from future: {e}")
+            failed = []
+            if to_check:
+                analyzed, failed = run_adaptive_batches(
+                    to_check,
+                    lambda chunk: process_company_chunk(
+                        chunk, industry, formatted_partners, formatted_scoring, on_company=emit, metrics=metrics
+                    ),
+                    shared_prefix_tokens,
+                    per_company_tokens
+                )
+                all_companies.extend(analyzed)
+                verdict_store.put_many(analyzed)
+            if failed:
+                print(f"Giving up on analysis for: {', '.join(failed)}")
+                all_companies.extend(_analysis_placeholder(company) for company in failed)
         except Exception as e:
             print(f"Error in parallel processing: {e}")
             # Fallback to basic data if parallel processing fails
             all_companies = [{"name": company, "description": "No description available", "competes_with_partners": False, "scores": {}, "total_score": 0} for company in companies]
 
+        for tier, stats in metrics.summary().items():
+            print(f"Analysis tier {tier}: {stats['companies']} companies in {stats['calls']} calls, "
+                  f"{stats['prompt_tokens']} prompt + {stats['completion_tokens']} completion tokens, "
+                  f"{stats['seconds']}s total ({stats['avg_seconds']}s per call)")
+
         # Identify suitable partners (companies that don't compete with current partners)
         suitable_partners = [company["name"] for company in all_companies if not company.get("competes_with_partners", True)]
 
@@ -1836,66 +2004,13 @@ def generate_company_analysis(companies, industry):
         }
 
 # Process a single company for parallel processing
-def process_company(company):
-    """Process a single company in parallel - enrich all companies regardless of score or competition status"""
-    try:
-        if not company or not isinstance(company, dict):
-            print(f"Error: Invalid company data structure")
-            return {
-                "name": "Unknown Company",
-                "description": "Invalid company data received",
-                "competes_with_partners": False,
-                "total_score": 0.0,
-                "partnership_score": 0.0,
-                "enriched": False
-            }
+def company_website(company):
+    """The website enrichment found for a company, else the one from the analysis"""
+    website = ""
+    if isinstance(company.get('coresignal_data'), dict):
+        website = company['coresignal_data'].get('company_details', {}).get('website', "")
+    return website or company.get('website')
 
-        # Ensure company has a name
-        company_name = company.get('name', 'Unknown Company')
-        if not company_name or not isinstance(company_name, str):
-            company_name = 'Unknown Company'
-            company['name'] = company_name
-
-        # Calculate scaled score (1-10)
-        max_total_score = sum(criteria['max_points'] for criteria in SCORING_CRITERIA.values())
-
-        try:
-            total_score = float(company.get('total_score', 0))
-        except (ValueError, TypeError):
-            total_score = 0.0
-
-        scaled_score = (total_score / max_total_score) * 10
-
-        # Enrich the company data
-        enriched_data = fetch_coresignal_data(company_name)
-
-        # Calculate partnership score
-        partnership_score = scaled_score * 0.7 + random.uniform(0, 3)
-
-        # Create the enriched company data structure
-        enriched_company = {
-            "name": company_name,
-            "description": enriched_data["company_details"]["mission"],
-            "competes_with_partners": company.get("competes_with_partners", False),
-            "total_score": total_score,
-            "partnership_score": partnership_score,
-            "enriched": True
-        }
-
-        return enriched_company
-
-    except Exception as e:
-        print(f"Error processing company: {str(e)}")
-        return {
-            "name": company_name,
-            "description": f"Error processing {company_name}",
-            "competes_with_partners": False,
-            "total_score": 0.0,
-            "partnership_score": 0.0,
-            "enriched": False
-        }
-
-# Process a single company for parallel processing
 def process_company(company):
     """Process a single company in parallel - enrich all companies regardless of score or competition status"""
     try:
@@ -1968,13 +2083,6 @@ def process_company(company):
             # For non-competing companies, perform more extensive enrichment
             print(f"  - Conducting deep research on {company_name} as a promising partner candidate")
 
-        # Generate company logo
-        try:
-            company['logo'] = generate_logo(company_name)
-        except Exception as e:
-            print(f"  - Error generating logo: {str(e)}")
-            company['logo'] = "https://img.logo.dev/default.com?token=pk_TCK5i8rzR92YmS65BY2fgQ&retina=true"
-
         # Fetch Coresignal data for ALL companies (but do more with non-competing ones)
         try:
             coresignal_data = fetch_coresignal_data(company_name)
@@ -2068,6 +2176,13 @@ def process_company(company):
             company['enriched'] = False
             print(f"  - Error fetching external data: {str(e)}")
 
+        # Generate company logo once enrichment has had a chance to find the real website
+        try:
+            company['logo'] = generate_logo(company_name, company_website(company))
+        except Exception as e:
+            print(f"  - Error generating logo: {str(e)}")
+            company['logo'] = generate_logo("default")
+
         return company
 
     except Exception as e:
@@ -2081,6 +2196,80 @@ def process_company(company):
             "enriched": False
         }
 
+class EarlyEnrichment:
+    """Enriches companies one at a time, starting as soon as their analysis arrives
+
+    Pass an instance as generate_company_analysis(on_company=...): companies
+    with a positive score are queued for process_company while the rest of
+    the analysis is still streaming in. enrich() then waits for a queued
+    company, or enriches one that was never queued.
+
+    Each company is enriched as a copy, so the analysis being checkpointed
+    never changes while it is serialized; merge_enrichment puts the enriched
+    copies back.
+    """
+
+    def __init__(self):
+        self.pool = ThreadPoolExecutor(max_workers=1)
+        self.futures = {}
+
+    @staticmethod
+    def _enrich(company):
+        result = process_company(dict(company))
+        # Add a small delay between API calls to avoid rate limiting
+        time.sleep(1)
+        return result
+
+    def _submit(self, company):
+        # In the caller's context, so enrichment shares the request deadline
+        return self.pool.submit(contextvars.copy_context().run, self._enrich, company)
+
+    def __call__(self, company):
+        if float(company.get('total_score', 0) or 0) > 0 and id(company) not in self.futures:
+            self.futures[id(company)] = self._submit(company)
+
+    def enrich(self, company):
+        future = self.futures.get(id(company)) or self._submit(company)
+        return future.result()
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+def apply_local_scores(companies):
+    """Score enriched companies against SCORING_CRITERIA in one vectorized pass
+
+    GPT's total_score is kept as ai_total_score. Companies that compete with a
+    partner stay at 0, and companies we could not enrich keep the GPT score
+    since there is no data to evaluate the rules against.
+    """
+    candidates = [
+        company for company in companies
+        if isinstance(company, dict)
+        and not company.get('competes_with_partners', False)
+        and isinstance(company.get('coresignal_data'), dict)
+        and 'error' not in company['coresignal_data']
+    ]
+    if not candidates:
+        return companies
+
+    try:
+        results = ScoringEngine(SCORING_CRITERIA).score(candidates)
+    except Exception as e:
+        print(f"Error computing local scores, keeping AI scores: {str(e)}")
+        traceback.print_exc()
+        return companies
+
+    for company, result in zip(candidates, results):
+        company['ai_total_score'] = company.get('total_score', 0)
+        company['total_score'] = result['total_score']
+        company['partnership_score'] = result['partnership_score']
+        company['score_breakdown'] = result['score_breakdown']
+        company['score_source'] = 'local'
+        print(f"Local score for {company.get('name')}: {result['partnership_score']}/10 (AI total was {company['ai_total_score']})")
+
+    return companies
+
 @app.route('/api/')
 def api_index():
     return jsonify({"status": "API is running"})
@@ -2131,7 +2320,7 @@ def get_search_status():
         "message": search_status.get("message", "Ready to search"),
         "progress": search_status.get("progress", 0),
         "completed": search_status.get("status") == "completed" or search_status.get("completed", False),
-        "results": search_status.get("results"),
+        "results": with_local_logos(search_status.get("results")),
         "error": search_status.get("error")
     }
     return jsonify(formatted_status)
@@ -2142,14 +2331,256 @@ def proxy_search_status():
     """Proxy for the search status endpoint without the /api prefix"""
     return get_search_status()
 
-@app.route('/api/search', methods=['POST'])
-def search():
-    try:
-        global search_status
-        global previously_considered_companies
+@app.route('/api/upstream-stats', methods=['GET'])
+def get_upstream_stats():
+    """Current concurrency limit, in-flight calls and queue depth for each upstream API"""
+    return jsonify(upstream_governor.stats())
+
+# Search pipeline stages. Each reads the outputs named in its signature, see app/services/pipeline.py
+def stage_search_results(query, api_key):
+    search_status.update({
+        "status": "searching",
+        "message": f"Searching for companies related to: {query}",
+        "progress": 10
+    })
+    search_results = search_companies_in_industry(query, api_key)
+    if not search_results or not isinstance(search_results, list):
+        raise StopPipeline(f"Failed to get search results for {query}")
+    print(f"Found {len(search_results)} search results")
+    return search_results
+
+def stage_industry_overview(query):
+    return generate_industry_overview(query)
+
+def stage_company_names(search_results, query):
+    search_status.update({
+        "status": "extracting",
+        "message": "Extracting company names from search results",
+        "progress": 30
+    })
+    company_names = extract_company_names(search_results, query)
+    if not company_names or not isinstance(company_names, list):
+        raise StopPipeline(f"Failed to extract company names from search results for {query}")
+    print(f"Extracted {len(company_names)} company names")
+    return company_names
+
+def stage_new_candidates(company_names):
+    """Drop current partners and previously considered companies, then mark the rest as considered"""
+    # Filter out companies that are already partners
+    current_partner_names = [p['name'] for p in CURRENT_PARTNERS]
+
+    # Log checking against current partners
+    print(f"Checking {len(company_names)} potential companies against {len(current_partner_names)} current partners")
+
+    # Check for exact matches with current partners
+    exact_matches = [name for name in company_names if name in current_partner_names]
+    if exact_matches:
+        print(f"Warning: Found {len(exact_matches)} companies that are already partners: {', '.join(exact_matches)}")
+
+    filtered_companies = [name for name in company_names if name not in current_partner_names]
+
+    search_status.update({
+        "message": f"Found {len(filtered_companies)} potential companies after filtering out existing partners",
+        "progress": 32
+    })
+
+    # Filter out previously considered companies
+    not_previously_considered = [name for name in filtered_companies if name not in previously_considered_companies]
+
+    search_status.update({
+        "message": f"Filtered out {len(filtered_companies) - len(not_previously_considered)} previously considered companies",
+        "progress": 35
+    })
+
+    # Add newly considered companies to our tracking set
+    for name in not_previously_considered:
+        add_company_to_considered(name)
+
+    print(f"Previously considered companies (total: {len(previously_considered_companies)}): {previously_considered_companies}")
+
+    # Limit to 40 companies for analysis (changed from 20)
+    companies_to_analyze = not_previously_considered[:40]
+
+    search_status.update({
+        "message": f"Selected {len(companies_to_analyze)} new companies for analysis",
+        "progress": 40
+    })
+
+    if not companies_to_analyze:
+        raise StopPipeline("No new companies found in this industry. Try a different industry.")
+    return companies_to_analyze
+
+def stage_scored_companies(analysis):
+    """Companies worth enriching: only those with non-zero scores, to avoid rate limiting"""
+    if not analysis or not isinstance(analysis, dict):
+        raise StopPipeline("Failed to generate analysis for companies")
+    print(f"Generated analysis for {len(analysis.get('companies', []))} companies")
+    companies_to_process = [company for company in analysis.get('companies', []) if float(company.get('total_score', 0)) > 0]
+    search_status.update({
+        "status": "enriching",
+        "message": f"Processing {len(companies_to_process)} companies with non-zero scores",
+        "progress": 80
+    })
+    return companies_to_process
+
+def stage_warm_logo(company):
+    """Fetch the logo into the cache now, so the results page doesn't wait on logo.dev
+
+    Runs on enriched companies: the domain comes from the website enrichment
+    found, the same one the company's logo URL was generated from.
+    """
+    try:
+        domain = resolve_logo_domain(company.get('name'), company_website(company))
+        if domain:
+            get_logo(domain)
+    except Exception as e:
+        print(f"Error warming logo for {company.get('name')}: {str(e)}")
+
+def report_enrichment_progress(completed, total, company, result):
+    search_status.update({
+        "message": f"Processed {completed}/{total} companies (last: {company.get('name')}, score: {company.get('total_score', 0)})",
+        "progress": 80 + (completed / total * 15)  # Scale from 80 to 95
+    })
+
+def merge_enrichment(analysis, enrichment):
+    """Put the enriched companies back into the analysis
+
+    Enrichment updates the analysis companies in place, but a resumed search
+    loads the analysis and the enrichment from separate checkpoints.
+    """
+    enriched = {company.get('name'): company for company in enrichment or [] if isinstance(company, dict)}
+    analysis['companies'] = [enriched.get(company.get('name'), company) for company in analysis['companies']]
+    return analysis
+
+def build_search_pipeline(name, analysis_stage, enrich_company, checkpoint=None):
+    """Stages shared by /api/search and the AI search; candidate selection is added by the caller"""
+    return (
+        Pipeline(name, checkpoint=checkpoint)
+        .add("search_results", stage_search_results, inputs=("query", "api_key"))
+        .add("industry_overview", stage_industry_overview, inputs=("query",))
+        .add("company_names", stage_company_names, inputs=("search_results", "query"))
+        .add("analysis", analysis_stage, inputs=("candidates", "search_results", "query"))
+        .add("scored_companies", stage_scored_companies, inputs=("analysis",))
+        .add("enrichment", enrich_company, each="scored_companies", concurrency=1, on_item=report_enrichment_progress)
+        .add("logos", stage_warm_logo, each="enrichment", concurrency=4)
+    )
+
+# What /api/search returns unless the request asks (body "profile" or ?profile=):
+# "full" is everything, as before; "compact" is only what the UI renders
+SEARCH_RESPONSE_PROFILE = os.environ.get("SEARCH_RESPONSE_PROFILE", "full")
+
+# Characters of each page's text kept as its excerpt in compact responses
+SOURCE_EXCERPT_CHARS = int(os.environ.get("SOURCE_EXCERPT_CHARS", 300))
+
+# Checkpoint stage holding what a compact response leaves out. It lives in the
+# checkpoint store rather than in this process, so any worker sharing
+# CHECKPOINT_STORE_PATH can answer the follow-up requests, until the
+# checkpoint TTL runs out. Serverless instances don't share a local file:
+# there the follow-ups only work if the path is on shared storage.
+SEARCH_DETAILS_STAGE = "response_details"
+
+def remember_search_details(search_id, search_results, companies):
+    """Store the fields a compact response leaves out, for the follow-up endpoints
+
+    Returns False when they couldn't be stored; the caller then sends the
+    full response instead of links that would 404.
+    """
+    details = {
+        'search_results': search_results or [],
+        'coresignal_data': {
+            company.get('name'): company['coresignal_data']
+            for company in companies or [] if company.get('coresignal_data')
+        }
+    }
+    return checkpoint_store.save(search_id, SEARCH_DETAILS_STAGE, details)
+
+def load_search_details(search_id):
+    return checkpoint_store.load(search_id).get(SEARCH_DETAILS_STAGE)
+
+def compact_company(company):
+    """A company without its raw Coresignal data, except the company_details the UI shows"""
+    compact = {key: value for key, value in company.items() if key != 'coresignal_data'}
+    coresignal_data = company.get('coresignal_data')
+    if isinstance(coresignal_data, dict) and coresignal_data.get('company_details'):
+        compact['coresignal_data'] = {'company_details': coresignal_data['company_details']}
+    return compact
+
+def compact_search_response(payload, search_id):
+    """The /api/search payload cut down to what the UI renders, with links to the rest"""
+    compact = dict(payload)
+    compact['search_results'] = [
+        {
+            'title': result.get('title', ''),
+            'url': result.get('url', ''),
+            'excerpt': (result.get('text') or '')[:SOURCE_EXCERPT_CHARS]
+        }
+        for result in payload.get('search_results') or [] if isinstance(result, dict)
+    ]
+    if isinstance(payload.get('analysis'), dict):
+        compact['analysis'] = dict(payload['analysis'])
+        compact['analysis']['companies'] = [
+            compact_company(company) for company in payload['analysis'].get('companies', []) if isinstance(company, dict)
+        ]
+    compact.pop('scoring_criteria', None)
+    compact['profile'] = 'compact'
+    compact['details'] = {
+        'search_results': f"/api/search/{search_id}/sources",
+        'coresignal_data': f"/api/search/{search_id}/companies/{{name}}/coresignal",
+        'scoring_criteria': "/api/scoring-criteria"
+    }
+    return compact
+
+def search_response(payload, search_id, status=200):
+    """Encode a /api/search payload in the requested profile, compressed for the client
+
+    Upstream calls that were refused along the way (open circuit, no free
+    slot, deadline passed) are listed under "degraded", since some of the
+    data then came from caches or placeholders.
+    """
+    notes = degraded()
+    if notes:
+        payload = dict(payload, degraded=notes)
+    if payload.get('analysis'):
+        payload = dict(payload, analysis=with_local_logos(payload['analysis']))
+    data = request.get_json(silent=True) or {}
+    profile = data.get('profile') or request.args.get('profile') or SEARCH_RESPONSE_PROFILE
+    if profile == 'compact' and search_id and remember_search_details(
+            search_id, payload.get('search_results'), (payload.get('analysis') or {}).get('companies')):
+        payload = compact_search_response(payload, search_id)
+    else:
+        profile = 'full'
+
+    response = json_response(payload, status, request.headers.get('Accept-Encoding'))
+    stats = response.payload_stats
+    print(f"Search response ({profile}): {stats['json_bytes']} bytes of JSON, {stats['sent_bytes']} sent as {stats['encoding']}, "
+          f"encoded in {stats['encode_ms']}ms ({stats['encoder']}), compressed in {stats['compress_ms']}ms")
+    return response
+
+@app.route('/api/search/<search_id>/sources', methods=['GET'])
+def get_search_sources(search_id):
+    """Full text of the pages a compact search response only excerpted"""
+    details = load_search_details(search_id)
+    if details is None:
+        return jsonify({'error': 'Search details have expired, run the search again'}), 404
+    return json_response({'search_id': search_id, 'search_results': details['search_results']},
+                         accept_encoding=request.headers.get('Accept-Encoding'))
+
+@app.route('/api/search/<search_id>/companies/<path:name>/coresignal', methods=['GET'])
+def get_search_company_coresignal(search_id, name):
+    """Raw Coresignal data of one company from a compact search response"""
+    details = load_search_details(search_id)
+    if details is None:
+        return jsonify({'error': 'Search details have expired, run the search again'}), 404
+    if name not in details['coresignal_data']:
+        return jsonify({'error': f"No Coresignal data for {name} in this search"}), 404
+    return jsonify({'name': name, 'coresignal_data': details['coresignal_data'][name]})
 
-        # Generate a unique search ID
-        search_id = datetime.now().strftime("%Y%m%d%H%M%S")
+@app.route('/api/search', methods=['POST'])
+def search():
+    search_id = None
+    try:
+        global search_status
+        global previously_considered_companies
 
         # Reset search status
         search_status = {
@@ -2176,6 +2607,10 @@ def search():
         # Normalize the query
         query = query.strip()
 
+        # Every search gets its own id; passing back the search_id of a failed search resumes it
+        search_id = data.get('search_id') or new_search_id()
+        checkpoint = checkpoint_store.bind(search_id)
+
         # Get Exa API key from environment
         exa_api_key = os.getenv('EXA_API_KEY')
         if not exa_api_key:
@@ -2187,149 +2622,71 @@ def search():
             })
             return jsonify({'error': 'EXA_API_KEY not found in environment variables'}), 500
 
-        # Update status - starting search
-        search_status.update({
-            "status": "searching",
-            "message": f"Searching for companies related to: {query}",
-            "progress": 10
-        })
-
-        # Search for companies in the industry
-        search_results = search_companies_in_industry(query, exa_api_key)
-
-        # Update status - extracting companies
-        search_status.update({
-            "status": "extracting",
-            "message": "Extracting company names from search results",
-            "progress": 30
-        })
-
-        # Extract company names from search results
-        company_names = extract_company_names(search_results, query)
-
-        # Filter out companies that are already partners
-        current_partner_names = [p['name'] for p in CURRENT_PARTNERS]
-
-        # Log checking against current partners
-        print(f"Checking {len(company_names)} potential companies against {len(current_partner_names)} current partners")
-
-        # Check for exact matches with current partners
-        exact_matches = [name for name in company_names if name in current_partner_names]
-        if exact_matches:
-            print(f"Warning: Found {len(exact_matches)} companies that are already partners: {', '.join(exact_matches)}")
-
-        filtered_companies = [name for name in company_names if name not in current_partner_names]
-
-        search_status.update({
-            "message": f"Found {len(filtered_companies)} potential companies after filtering out existing partners",
-            "progress": 32
-        })
-
-        # Filter out previously considered companies
-        not_previously_considered = [name for name in filtered_companies if name not in previously_considered_companies]
-
-        search_status.update({
-            "message": f"Filtered out {len(filtered_companies) - len(not_previously_considered)} previously considered companies",
-            "progress": 35
-        })
+        def analyze(candidates, search_results, query):
+            search_status.update({
+                "status": "analyzing",
+                "message": "Analyzing companies and checking for competition with current partners",
+                "progress": 50
+            })
+            # Promising companies start enriching while the rest of the analysis streams in
+            return generate_company_analysis(
+                candidates, query, search_results, on_company=early_enrichment, with_overview=False
+            )
 
-        # Add newly considered companies to our tracking set
-        for name in not_previously_considered:
-            add_company_to_considered(name)
+        def save_results(analysis, enrichment, query):
+            merge_enrichment(analysis, enrichment)
 
-        print(f"Previously considered companies (total: {len(previously_considered_companies)}): {previously_considered_companies}")
+            # Mark companies with zero scores as not enriched
+            for company in analysis['companies']:
+                if float(company.get('total_score', 0)) <= 0:
+                    company['enriched'] = False
 
-        # Limit to 40 companies for analysis (changed from 20)
-        companies_to_analyze = not_previously_considered[:40]
+            # Replace the AI scores with deterministic local scores where we have enrichment data
+            apply_local_scores(analysis['companies'])
 
-        search_status.update({
-            "message": f"Selected {len(companies_to_analyze)} new companies for analysis",
-            "progress": 40
-        })
+            # Save non-conflicting companies to potential partners database
+            saved_count = 0
+            for company in analysis['companies']:
+                if not company.get('competes_with_partners', False) and not company.get('has_competition', False):
+                    if save_potential_partner(company, query):
+                        saved_count += 1
+            return saved_count
+
+        early_enrichment = EarlyEnrichment()
+        pipeline = (
+            build_search_pipeline(f"search {search_id}", analyze, lambda company: early_enrichment.enrich(company), checkpoint)
+            .add("candidates", stage_new_candidates, inputs=("company_names",))
+            .add("saved_count", save_results, inputs=("analysis", "enrichment", "query"))
+        )
 
-        # If no companies found, return error
-        if not companies_to_analyze:
+        try:
+            outputs = pipeline.run(query=query, api_key=exa_api_key)
+        except StopPipeline as stop:
+            # Nothing left to resume: the search finished, just without results
+            checkpoint.clear()
             search_status.update({
                 "status": "error",
-                "message": "No new companies found in this industry. Try a different industry.",
+                "message": str(stop),
                 "progress": 100,
                 "completed": True
             })
-            return jsonify({
-                'error': 'No new companies found in this industry. Try a different industry.',
+            return search_response({
+                'error': str(stop),
                 'industry': query,
-                'search_results': search_results,
+                'search_results': stop.outputs.get('search_results', []),
                 'previously_considered_count': len(previously_considered_companies)
-            }), 404
+            }, search_id, 404)
+        finally:
+            early_enrichment.shutdown()
 
-        # Update status - analyzing companies
-        search_status.update({
-            "status": "analyzing",
-            "message": "Analyzing companies and checking for competition with current partners",
-            "progress": 50
-        })
-
-        # Generate analysis for the companies
-        analysis = generate_company_analysis(companies_to_analyze, query)
+        checkpoint.clear()
+        analysis = outputs['analysis']
+        analysis['industry_overview'] = outputs['industry_overview']
+        saved_count = outputs['saved_count']
 
         # Calculate max total score
         max_total_score = sum(criteria['max_points'] for criteria in SCORING_CRITERIA.values())
 
-        # Update status - enriching data
-        search_status.update({
-            "status": "enriching",
-            "message": f"Enriching data for all {len(analysis['companies'])} companies",
-            "progress": 80
-        })
-
-        # Process companies one at a time to avoid rate limiting, but only those with non-zero scores
-        companies_to_process = [company for company in analysis['companies'] if float(company.get('total_score', 0)) > 0]
-        all_company_names = [company['name'] for company in companies_to_process]
-        search_status.update({
-            "message": f"Processing {len(all_company_names)} companies with non-zero scores",
-            "progress": 85
-        })
-
-        # Process each company sequentially
-        completed = 0
-        total = len(companies_to_process)
-
-        for company in companies_to_process:
-            # Update status for current company
-            search_status.update({
-                "message": f"Processing company {completed+1}/{total}: {company['name']} (Score: {company.get('total_score', 0)})",
-                "progress": 85 + (completed / total * 10)  # Scale from 85 to 95
-            })
-
-            # Process the company
-            process_company(company)
-
-            # Update completion status
-            completed += 1
-            search_status.update({
-                "message": f"Processed {completed}/{total} companies",
-                "progress": 85 + (completed / total * 10)  # Scale from 85 to 95
-            })
-
-            # Add a small delay between API calls to avoid rate limiting
-            time.sleep(1)
-
-        # Mark companies with zero scores as not enriched
-        for company in analysis['companies']:
-            if float(company.get('total_score', 0)) <= 0:
-                company['enriched'] = False
-
-        # Calculate summary metrics
-        final_competing_count = sum(1 for company in analysis['companies'] if company.get('competes_with_partners', False))
-        final_enriched_count = sum(1 for company in analysis['companies'] if company.get('enriched', False))
-
-        # Save non-conflicting companies to potential partners database
-        saved_count = 0
-        for company in analysis['companies']:
-            if not company.get('competes_with_partners', False) and not company.get('has_competition', False):
-                if save_potential_partner(company, query):
-                    saved_count += 1
-
         # Update status - completed
         search_status.update({
             "status": "completed",
@@ -2338,13 +2695,16 @@ def search():
             "completed": True
         })
 
-        return jsonify({
+        return search_response({
             'industry': query,
             'analysis': analysis,
-            'search_results': search_results,
+            'search_results': outputs['search_results'],
             'scoring_criteria': SCORING_CRITERIA,
-            'max_total_score': max_total_score
-        })
+            'max_total_score': max_total_score,
+            'timings': pipeline.timings,
+            'search_id': search_id,
+            'resumed_stages': pipeline.resumed
+        }, search_id)
 
     except Exception as e:
         # Update status - error
@@ -2355,7 +2715,8 @@ def search():
             "completed": True
         })
         print(f"Error in search: {e}")
-        return jsonify({'error': str(e)}), 500
+        # Completed stages stay checkpointed under search_id, a retry picks up from there
+        return jsonify({'error': str(e), 'search_id': search_id, 'degraded': degraded()}), 500
 
 # Add a non-prefixed route that forwards to the API route
 @app.route('/search', methods=['POST'])
@@ -2435,147 +2796,76 @@ def run_ai_search(industry, api_key):
     global search_status
     global previously_considered_companies
 
-    try:
-        print(f"Background thread: Searching for companies in {industry}")
-
-        # Perform the search
-        search_status.update({
-            "status": "searching",
-            "message": f"Finding companies in {industry}...",
-            "progress": 20
-        })
-
-        # Search for companies in the industry
-        search_results = search_companies_in_industry(industry, api_key)
-        if not search_results or not isinstance(search_results, list):
-            error_message = f"Failed to get search results for {industry}"
-            print(f"Error: {error_message}")
-            search_status.update({
-                "status": "error",
-                "message": error_message,
-                "progress": 0,
-                "error": error_message
-            })
-            return
-
-        print(f"Found {len(search_results)} search results")
-
-        # Update status
-        search_status.update({
-            "status": "processing",
-            "message": "Extracting company names...",
-            "progress": 50
-        })
-
-        # Extract company names
-        companies = extract_company_names(search_results, industry)
-        if not companies or not isinstance(companies, list) or len(companies) == 0:
-            error_message = f"Failed to extract company names from search results for {industry}"
-            print(f"Error: {error_message}")
-            search_status.update({
-                "status": "error",
-                "message": error_message,
-                "progress": 0,
-                "error": error_message
-            })
-            return
-
-        print(f"Extracted {len(companies)} company names")
-
-        # Limit to 40 companies for analysis
-        companies = companies[:40]
-
-        # Update status
+    def analyze(candidates, search_results, query):
         search_status.update({
             "status": "analyzing",
-            "message": f"Analyzing {len(companies)} companies...",
+            "message": f"Analyzing {len(candidates)} companies...",
             "progress": 70
         })
+        # Promising companies start enriching while the rest of the analysis streams in
+        return generate_company_analysis(
+            candidates, query, search_results, on_company=early_enrichment, with_overview=False
+        )
 
-        # Generate company analysis
-        analysis = generate_company_analysis(companies, industry)
-        if not analysis or not isinstance(analysis, dict):
-            error_message = f"Failed to generate analysis for companies in {industry}"
-            print(f"Error: {error_message}")
-            search_status.update({
-                "status": "error",
-                "message": error_message,
-                "progress": 0,
-                "error": error_message
-            })
-            return
-
-        print(f"Generated analysis for {len(analysis.get('companies', []))} companies")
-
-        # Process only companies with non-zero scores to avoid rate limiting
-        processed_companies = []
-        if analysis.get('companies') and isinstance(analysis['companies'], list):
-            # Filter companies with non-zero scores
-            companies_to_process = [company for company in analysis['companies'] if float(company.get('total_score', 0)) > 0]
-
-            # Update status
-            search_status.update({
-                "status": "processing",
-                "message": f"Processing {len(companies_to_process)} companies with non-zero scores",
-                "progress": 75
-            })
-
-            # Process each company sequentially
-            completed = 0
-            total = len(companies_to_process)
-
-            for company in companies_to_process:
-                try:
-                    # Update status for current company
-                    search_status.update({
-                        "message": f"Processing company {completed+1}/{total}: {company['name']} (Score: {company.get('total_score', 0)})",
-                        "progress": 75 + (completed / total * 15)  # Scale from 75 to 90
-                    })
-
-                    # Process the company
-                    processed_company = process_company(company)
-
-                    if processed_company:
-                        processed_companies.append(processed_company)
-                        # Add to previously considered companies
-                        if processed_company.get('name'):
-                            add_company_to_considered(processed_company['name'])
-
-                    # Update completion status
-                    completed += 1
-                    search_status.update({
-                        "message": f"Processed {completed}/{total} companies",
-                        "progress": 75 + (completed / total * 15)  # Scale from 75 to 90
-                    })
+    def enrich(company):
+        try:
+            # Process the company (or wait for the enrichment that started during analysis)
+            processed_company = early_enrichment.enrich(company)
+            # Add to previously considered companies
+            if processed_company and processed_company.get('name'):
+                add_company_to_considered(processed_company['name'])
+            return processed_company
+        except Exception as e:
+            print(f"Error processing company: {str(e)}")
+            # Continue with next company
+            return None
 
-                    # Add a small delay between API calls to avoid rate limiting
-                    time.sleep(1)
-                except Exception as e:
-                    print(f"Error processing company: {str(e)}")
-                    # Continue with next company
+    def save_results(analysis, enrichment, query):
+        processed_companies = [company for company in enrichment if company]
 
-            # Mark companies with zero scores as not enriched
-            for company in analysis['companies']:
-                if float(company.get('total_score', 0)) <= 0:
-                    company['enriched'] = False
+        # Mark companies with zero scores as not enriched
+        for company in analysis['companies']:
+            if float(company.get('total_score', 0)) <= 0:
+                company['enriched'] = False
 
-        # Update analysis with processed companies
-        analysis['companies'] = processed_companies
+        # Replace the AI scores with deterministic local scores where we have enrichment data
+        apply_local_scores(processed_companies)
 
         # Save non-conflicting companies to potential partners database
         saved_count = 0
         for company in processed_companies:
             if not company.get('competes_with_partners', False) and not company.get('has_competition', False):
-                if save_potential_partner(company, industry):
+                if save_potential_partner(company, query):
                     saved_count += 1
 
         # Record the search in history
-        add_search_to_history("AI Search", industry, len(processed_companies))
+        add_search_to_history("AI Search", query, len(processed_companies))
+        return {"processed_companies": processed_companies, "saved_count": saved_count}
+
+    early_enrichment = EarlyEnrichment()
+    # The AI search picks a random industry each time, so there is no earlier run to resume
+    checkpoint = checkpoint_store.bind(new_search_id())
+    try:
+        print(f"Background thread: Searching for companies in {industry}")
+
+        pipeline = (
+            build_search_pipeline(f"ai-search {industry}", analyze, enrich, checkpoint)
+            # Limit to 40 companies for analysis
+            .add("candidates", lambda company_names: company_names[:40], inputs=("company_names",))
+            .add("saved", save_results, inputs=("analysis", "enrichment", "query"))
+        )
+        outputs = pipeline.run(query=industry, api_key=api_key)
+        checkpoint.clear()
+
+        # Update analysis with processed companies
+        analysis = outputs['analysis']
+        analysis['industry_overview'] = outputs['industry_overview']
+        analysis['companies'] = outputs['saved']['processed_companies']
 
         # Update status to complete
         search_status.update({
             "status": "completed",
-            "message": f"Search complete: Saved {saved_count} non-conflicting companies to database",
+            "message": f"Search complete: Saved {outputs['saved']['saved_count']} non-conflicting companies to database",
             "progress": 100,
             "results": analysis,
             "error": None
@@ -2583,6 +2873,17 @@ def run_ai_search(industry, api_key):
 
         print("AI search completed successfully")
 
+    except StopPipeline as stop:
+        checkpoint.clear()
+        error_message = str(stop)
+        print(f"Error: {error_message}")
+        search_status.update({
+            "status": "error",
+            "message": error_message,
+            "progress": 0,
+            "error": error_message
+        })
+
     except Exception as e:
         error_message = f"Error in AI search background process: {str(e)}"
         print(f"ERROR: {error_message}")
@@ -2596,6 +2897,9 @@ def run_ai_search(industry, api_key):
             "error": error_message
         })
 
+    finally:
+        early_enrichment.shutdown()
+
 @app.route('/api/reset-history', methods=['POST'])
 def reset_history():
     """Reset the previously considered companies list and potential partners"""
@@ -3112,7 +3416,7 @@ def get_company_details():
             # Generate a logo URL for each competing partner
             for partner in company_data['competing_partners']:
                 if partner:
-                    partner_logo = generate_logo(partner)
+                    partner_logo = get_logo_url(partner)
                     partner_logos[partner] = partner_logo
                     competing_partners.append({
                         "name": partner,
@@ -3151,6 +3455,32 @@ def get_company_details():
             return jsonify({'error': str(e)}), 500
 
 # Function to fetch company data from Coresignal (replaced with LinkedIn Data API)
+# Last successful LinkedIn Data API results, served while RapidAPI is unavailable:
+# the most recently fetched companies, each only for so long
+LINKEDIN_CACHE_SIZE = int(os.environ.get("LINKEDIN_CACHE_SIZE", 256))
+LINKEDIN_CACHE_TTL_SECONDS = int(os.environ.get("LINKEDIN_CACHE_TTL_SECONDS", 6 * 60 * 60))
+_linkedin_data_cache = OrderedDict()
+_linkedin_data_cache_lock = Lock()
+
+def remember_linkedin_data(company_name, data):
+    with _linkedin_data_cache_lock:
+        _linkedin_data_cache[company_name] = (time.time(), data)
+        _linkedin_data_cache.move_to_end(company_name)
+        while len(_linkedin_data_cache) > LINKEDIN_CACHE_SIZE:
+            _linkedin_data_cache.popitem(last=False)
+
+def recall_linkedin_data(company_name):
+    """The company's last LinkedIn Data API result if it is recent enough, else None"""
+    with _linkedin_data_cache_lock:
+        entry = _linkedin_data_cache.get(company_name)
+        if entry is None:
+            return None
+        if time.time() - entry[0] > LINKEDIN_CACHE_TTL_SECONDS:
+            del _linkedin_data_cache[company_name]
+            return None
+        _linkedin_data_cache.move_to_end(company_name)
+        return entry[1]
+
 def fetch_coresignal_data(company_name):
     """
     Fetch company data from LinkedIn Data API via RapidAPI
@@ -3178,7 +3508,9 @@ def fetch_coresignal_data(company_name):
 
             print(f"Making API request to: {url}")
             # Make the API request
-            response = requests.get(url, headers=headers, params=querystring)
+            with upstream_governor.slot("rapidapi") as call:
+                response = requests.get(url, headers=headers, params=querystring, timeout=call.timeout(RAPIDAPI_TIMEOUT))
+                call.observe(response)
 
             # Check if the request was successful
             print(f"API response status code: {response.status_code}")
@@ -3202,7 +3534,10 @@ def fetch_coresignal_data(company_name):
                                 "industry": ", ".join(company_data.get("industries", [])) if company_data.get("industries") else "",
                                 "founded": company_data.get("founded", ""),
                                 "company_type": company_data.get("type", ""),
-                                "description": company_data.get("description", "")
+                                "description": company_data.get("description", ""),
+                                "employee_count": company_data.get("staffCount"),
+                                "follower_count": company_data.get("followerCount"),
+                                "funding_rounds": (company_data.get("fundingData") or {}).get("numFundingRounds")
                             },
                             "leadership": {
                                 "executives": []
@@ -3235,6 +3570,7 @@ def fetch_coresignal_data(company_name):
                             coresignal_data["company_details"]["logo"] = company_data.get("Images").get("logo")
 
                         print(f"Successfully created company data object")
+                        remember_linkedin_data(company_name, coresignal_data)
                         return coresignal_data
                     else:
                         print(f"Invalid or empty data in API response: {data}")
@@ -3246,6 +3582,13 @@ def fetch_coresignal_data(company_name):
             # Don't fall back to mock data, return error information instead
             return {"error": f"API request failed with status {response.status_code}", "company_name": company_name}
 
+        except UPSTREAM_UNAVAILABLE as e:
+            # RapidAPI is failing or we're out of time: reuse what we fetched earlier rather than wait
+            print(f"LinkedIn Data API unavailable for {company_name}: {str(e)}")
+            cached = recall_linkedin_data(company_name)
+            if cached is not None:
+                return cached
+            return {"error": f"LinkedIn Data API temporarily unavailable: {str(e)}", "company_name": company_name}
         except Exception as e:
             print(f"Error fetching company data: {str(e)}")
             print(f"Stack trace: {traceback.format_exc()}")
@@ -3268,8 +3611,8 @@ def generate_mock_coresignal_data(company_name):
         # Create domain name from company name
         formatted_company_name = company_name.lower().replace(' ', '')
 
-        # Generate mock logo URL
-        logo_url = f"https://logo.clearbit.com/{formatted_company_name}.com"
+        # Mock data uses the same logo.dev URL a real company gets
+        logo_url = generate_logo(company_name)
 
         # Generate industries
         industries = [
@@ -3490,316 +3833,51 @@ def get_company_research(company_name):
         traceback.print_exc()
         return None
 
-def generate_research_pdf(company_name, research_data):
-    """Generate a PDF with company research data in a modern dark theme
+# Function to get research data for many companies in one round-trip
+def get_company_research_bulk(company_names):
+    """Get company research data for several companies with a single query (Supabase)
 
     Args:
-        company_name (str): The name of the company
-        research_data (dict): The research data to include in the PDF
+        company_names (list): Names of the companies
 
     Returns:
-        bytes: The PDF file as bytes
+        dict: Maps each company name that has research to the same structure
+        returned by get_company_research
     """
-    # Create a file-like buffer to receive PDF data
-    buffer = io.BytesIO()
-
-    # Set up the document with letter size page and 0.5 inch margins
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=letter,
-        rightMargin=0.5 * inch,
-        leftMargin=0.5 * inch,
-        topMargin=0.5 * inch,
-        bottomMargin=0.5 * inch
-    )
-
-    # Register a custom font for modern appearance
-    # Use default fonts if custom ones aren't available
-    try:
-        pdfmetrics.registerFont(TTFont('Roboto', 'Roboto-Regular.ttf'))
-        pdfmetrics.registerFont(TTFont('RobotoBold', 'Roboto-Bold.ttf'))
-        base_font = 'Roboto'
-        bold_font = 'RobotoBold'
-    except:
-        base_font = 'Helvetica'
-        bold_font = 'Helvetica-Bold'
-
-    # Create styles for dark theme
-    styles = getSampleStyleSheet()
-
-    # Create custom paragraph styles
-    title_style = ParagraphStyle(
-        'Title',
-        parent=styles['Title'],
-        fontName=bold_font,
-        fontSize=28,
-        leading=32,
-        textColor=colors.white,
-        alignment=1  # Center alignment
-    )
-
-    subtitle_style = ParagraphStyle(
-        'Subtitle',
-        parent=styles['Normal'],
-        fontName=base_font,
-        fontSize=14,
-        leading=18,
-        textColor=colors.Color(0.7, 0.7, 0.9),  # Light blue/purple
-        alignment=1  # Center alignment
-    )
-
-    heading1_style = ParagraphStyle(
-        'Heading1',
-        parent=styles['Heading1'],
-        fontName=bold_font,
-        fontSize=18,
-        leading=22,
-        textColor=colors.white,
-        spaceBefore=16,
-        spaceAfter=8
-    )
-
-    heading2_style = ParagraphStyle(
-        'Heading2',
-        parent=styles['Heading2'],
-        fontName=bold_font,
-        fontSize=14,
-        leading=18,
-        textColor=colors.Color(0.5, 0.7, 1.0),  # Light blue
-        spaceBefore=12,
-        spaceAfter=6
-    )
-
-    normal_style = ParagraphStyle(
-        'Normal',
-        parent=styles['Normal'],
-        fontName=base_font,
-        fontSize=10,
-        leading=14,
-        textColor=colors.Color(0.9, 0.9, 0.9)  # Almost white
-    )
-
-    bullet_style = ParagraphStyle(
-        'Bullet',
-        parent=normal_style,
-        leftIndent=20,
-        firstLineIndent=-20,
-    )
-
-    footer_style = ParagraphStyle(
-        'Footer',
-        parent=styles['Normal'],
-        fontName=base_font,
-        fontSize=8,
-        textColor=colors.Color(0.6, 0.6, 0.7),  # Muted purple
-        alignment=1  # Center alignment
-    )
-
-    # Create elements for the PDF
-    elements = []
-
-    # Add a title page
-    elements.append(Spacer(1, 2 * inch))  # Space at top of page
-    elements.append(Paragraph(company_name.upper(), title_style))
-    elements.append(Spacer(1, 0.25 * inch))
-    elements.append(Paragraph("Company Research Report", subtitle_style))
-    elements.append(Spacer(1, 2 * inch))
-
-    # Try to add company logo if available
-    logo_url = None
-    if research_data and 'data' in research_data:
-        data = research_data['data']
-        if isinstance(data, dict) and 'logo' in data and data['logo']:
-            logo_url = data['logo']
-
-        # Also check the LinkedIn data if available
-        if not logo_url and 'linkedin_data' in data and isinstance(data['linkedin_data'], dict):
-            linkedin = data['linkedin_data']
-            if 'logo' in linkedin and linkedin['logo']:
-                logo_url = linkedin['logo']
-
-    # Add logo if available
-    if logo_url:
-        try:
-            # Download the logo image
-            logo_response = requests.get(logo_url, timeout=5)
-            if logo_response.status_code == 200:
-                logo_data = io.BytesIO(logo_response.content)
-                logo_img = Image(logo_data, width=2*inch, height=2*inch)
-                logo_img.hAlign = 'CENTER'
-                elements.append(logo_img)
-        except Exception as e:
-            print(f"Error adding logo to PDF: {str(e)}")
-
-    # Add date and disclaimer
-    elements.append(Spacer(1, 1 * inch))
-    date_generated = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    elements.append(Paragraph(f"Generated on: {date_generated}", footer_style))
-    elements.append(Spacer(1, 0.25 * inch))
-    elements.append(Paragraph("CONFIDENTIAL RESEARCH REPORT", footer_style))
-
-    # Add a page break
-    elements.append(PageBreak())
-
-    # Add table of contents header
-    elements.append(Paragraph("CONTENTS", heading1_style))
-    elements.append(Spacer(1, 0.25 * inch))
-
-    # Simple table of contents
-    toc_data = []
-    if research_data and 'data' in research_data:
-        data = research_data['data']
-
-        toc_items = [
-            ("Company Description", 2),
-            ("Key Products & Services", 2),
-            ("Leadership Team", 3),
-            ("Partnership Opportunities", 3),
-            ("Market Analysis", 4),
-            ("Partnership Potential", 5)
-        ]
-
-        for item, page in toc_items:
-            toc_data.append([Paragraph(item, normal_style), Paragraph(str(page), normal_style)])
-
-    if toc_data:
-        # Create table of contents
-        toc_table = Table(toc_data, colWidths=[4*inch, 0.5*inch])
-        toc_table.setStyle(TableStyle([
-            ('TEXTCOLOR', (0, 0), (-1, -1), colors.white),
-            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-            ('LINEABOVE', (0, 0), (-1, 0), 1, colors.Color(0.3, 0.3, 0.5)),
-            ('LINEBELOW', (0, -1), (-1, -1), 1, colors.Color(0.3, 0.3, 0.5)),
-        ]))
-        elements.append(toc_table)
-
-    # Add a page break before main content
-    elements.append(PageBreak())
-
-    # Add research data sections
-    if research_data and 'data' in research_data:
-        data = research_data['data']
-
-        # Company description
-        if isinstance(data, dict) and 'description' in data:
-            elements.append(Paragraph("Company Description", heading1_style))
-            elements.append(Paragraph(data['description'], normal_style))
-            elements.append(Spacer(1, 0.25 * inch))
-
-        # Key Products/Services
-        if isinstance(data, dict) and 'key_products' in data and data['key_products']:
-            elements.append(Paragraph("Key Products & Services", heading1_style))
-            if isinstance(data['key_products'], list):
-                for product in data['key_products']:
-                    if isinstance(product, str):
-                        elements.append(Paragraph(f"• {product}", bullet_style))
-                    elif isinstance(product, dict) and 'name' in product:
-                        elements.append(Paragraph(f"• {product['name']}", bullet_style))
-            elements.append(Spacer(1, 0.25 * inch))
-
-        # Leadership
-        if isinstance(data, dict) and 'key_leadership' in data and data['key_leadership']:
-            elements.append(Paragraph("Leadership Team", heading1_style))
-            if isinstance(data['key_leadership'], list):
-                for leader in data['key_leadership']:
-                    if isinstance(leader, str):
-                        elements.append(Paragraph(f"• {leader}", bullet_style))
-                    elif isinstance(leader, dict) and 'name' in leader:
-                        title = leader.get('title', '')
-                        leader_text = f"• {leader['name']}"
-                        if title:
-                            leader_text += f" ({title})"
-                        elements.append(Paragraph(leader_text, bullet_style))
-            elements.append(Spacer(1, 0.25 * inch))
-
-        # Partnership Opportunities
-        if isinstance(data, dict) and 'partnership_opportunities' in data and data['partnership_opportunities']:
-            elements.append(Paragraph("Partnership Opportunities", heading1_style))
-            if isinstance(data['partnership_opportunities'], list):
-                for opportunity in data['partnership_opportunities']:
-                    elements.append(Paragraph(f"• {opportunity}", bullet_style))
-            elements.append(Spacer(1, 0.25 * inch))
-
-        # Market Analysis
-        if isinstance(data, dict) and 'market_analysis' in data and data['market_analysis']:
-            elements.append(Paragraph("Market Analysis", heading1_style))
-            market = data['market_analysis']
-            if isinstance(market, dict):
-                for key, value in market.items():
-                    if key and value:
-                        formatted_key = key.replace('_', ' ').title()
-                        elements.append(Paragraph(formatted_key, heading2_style))
-                        elements.append(Paragraph(str(value), normal_style))
-                        elements.append(Spacer(1, 0.15 * inch))
-            elements.append(Spacer(1, 0.25 * inch))
-
-        # Partnership Potential
-        if isinstance(data, dict) and 'partnership_potential' in data and data['partnership_potential']:
-            elements.append(Paragraph("Partnership Potential", heading1_style))
-            potential = data['partnership_potential']
-            if isinstance(potential, dict):
-                for key, value in potential.items():
-                    if key and value:
-                        formatted_key = key.replace('_', ' ').title()
-                        elements.append(Paragraph(formatted_key, heading2_style))
-                        elements.append(Paragraph(str(value), normal_style))
-                        elements.append(Spacer(1, 0.15 * inch))
-
-        # Include other important fields that may be available
-        if isinstance(data, dict):
-            # Website
-            if 'website' in data and data['website']:
-                elements.append(Paragraph("Website", heading1_style))
-                elements.append(Paragraph(data['website'], normal_style))
-                elements.append(Spacer(1, 0.25 * inch))
-
-            # Headquarters
-            if 'hq_location' in data and data['hq_location']:
-                elements.append(Paragraph("Headquarters", heading1_style))
-                elements.append(Paragraph(data['hq_location'], normal_style))
-                elements.append(Spacer(1, 0.25 * inch))
-
-            # Company Size
-            if 'size_range' in data and data['size_range']:
-                elements.append(Paragraph("Company Size", heading1_style))
-                elements.append(Paragraph(data['size_range'], normal_style))
-                elements.append(Spacer(1, 0.25 * inch))
-
-    # Add a background to each page
-    def add_dark_background(canvas, doc):
-        # Save the canvas state
-        canvas.saveState()
-
-        # Set the fill color to a dark blue/gray color - more pleasant dark theme
-        canvas.setFillColor(colors.Color(0.12, 0.14, 0.25))
-
-        # Draw a rectangle that covers the entire page
-        canvas.rect(
-            0,
-            0,
-            letter[0],  # width of the page
-            letter[1],  # height of the page
-            fill=True
-        )
+    if not supabase:
+        print("Error: Supabase client not available.")
+        return {}
 
-        # Add a footer with page number to each page
-        canvas.setFont(base_font, 8)
-        canvas.setFillColor(colors.Color(0.6, 0.6, 0.7))  # Light gray/purple
-        page_num = canvas.getPageNumber()
-        text = f"Page {page_num}"
-        canvas.drawCentredString(letter[0]/2, 0.25*inch, text)
+    names = [name.strip() for name in company_names if name and name.strip()]
+    if not names:
+        return {}
 
-        # Restore the canvas state
-        canvas.restoreState()
+    try:
+        response = supabase.table('company_research').select(
+            'research_data, source, created_at, updated_at, company_name'
+        ).in_('company_name', names).execute()
 
-    # Build the PDF with the dark background on every page
-    doc.build(elements, onFirstPage=add_dark_background, onLaterPages=add_dark_background)
+        research_by_name = {}
+        for row in response.data or []:
+            try:
+                research_data = json.loads(row.get('research_data'))
+            except (json.JSONDecodeError, TypeError):
+                research_data = row.get('research_data')
 
-    # Get the PDF data from the buffer
-    pdf_data = buffer.getvalue()
-    buffer.close()
+            research_by_name[row.get('company_name')] = {
+                'data': research_data,
+                'source': row.get('source'),
+                'created_at': row.get('created_at'),
+                'updated_at': row.get('updated_at'),
+                'company_name': row.get('company_name')
+            }
 
-    return pdf_data
+        print(f"Found research for {len(research_by_name)}/{len(names)} companies")
+        return research_by_name
+    except Exception as e:
+        print(f"Error retrieving bulk company research from Supabase: {e}")
+        traceback.print_exc()
+        return {}
 
 @app.route('/api/company-research', methods=['POST'])
 def save_research_endpoint():
@@ -3921,6 +3999,73 @@ def export_research_pdf_endpoint(company_name):
         traceback.print_exc()
         return jsonify({'error': str(e), 'company_name': company_name}), 500
 
+def get_top_partner_names(limit):
+    """Get the names of the top-scoring potential partners (Supabase)"""
+    if not supabase:
+        print("Error: Supabase client not available.")
+        return []
+    try:
+        response = supabase.table('potential_partners').select('name').order('score', desc=True).limit(limit).execute()
+        return [row.get('name') for row in response.data or [] if row.get('name')]
+    except Exception as e:
+        print(f"Error getting top partner names from Supabase: {e}")
+        traceback.print_exc()
+        return []
+
+@app.route('/api/company-research/bulk-export', methods=['GET', 'POST'])
+def bulk_export_research_pdf_endpoint():
+    """API endpoint to export research for many companies as one streamed zip of PDFs
+
+    Accepts either a JSON body with 'company_names' or a 'top' count (query
+    string or body) to export the N highest-scoring potential partners.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        company_names = data.get('company_names') or request.args.getlist('company_name')
+        top = data.get('top') or request.args.get('top', type=int)
+
+        if not company_names and top:
+            try:
+                limit = max(1, min(int(top), 100))
+            except (TypeError, ValueError):
+                return jsonify({'error': 'top must be a number'}), 400
+            company_names = get_top_partner_names(limit)
+
+        if not company_names or not isinstance(company_names, list):
+            return jsonify({'error': 'Provide company_names or top'}), 400
+
+        # Preserve the requested order while dropping duplicates
+        company_names = list(dict.fromkeys(name.strip() for name in company_names if isinstance(name, str) and name.strip()))
+        print(f"API: Bulk exporting PDF research for {len(company_names)} companies")
+
+        research_by_name = get_company_research_bulk(company_names)
+        if not research_by_name:
+            return jsonify({
+                'success': False,
+                'company_names': company_names,
+                'message': 'No research found for the requested companies'
+            }), 404
+
+        missing = [name for name in company_names if name not in research_by_name]
+
+        def generate_archive():
+            entries = iter_research_pdfs(company_names, research_by_name)
+            if missing:
+                entries = chain(entries, [("MISSING_RESEARCH.txt", "\n".join(missing).encode('utf-8'))])
+            yield from stream_zip(entries)
+
+        filename = f"Partner_Research_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+        return Response(
+            stream_with_context(generate_archive()),
+            mimetype='application/zip',
+            headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+        )
+
+    except Exception as e:
+        print(f"Error bulk exporting research data as PDF: {str(e)}")
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/api-healthcheck', methods=['GET'])
 def api_healthcheck():
     """Check if the API keys are valid and services are operational"""
@@ -4033,15 +4178,23 @@ def perplexity_proxy():
         print(f"Making proxy request to Perplexity API: {perplexity_api_url}{endpoint}")
         print(f"Request payload: {json.dumps(data, indent=2)}")
 
-        response = requests.post(
-            f"{perplexity_api_url}{endpoint}",
-            headers=headers,
-            json=data,
-            timeout=60  # 60 second timeout
-        )
+        with upstream_governor.slot("perplexity") as call:
+            response = requests.post(
+                f"{perplexity_api_url}{endpoint}",
+                headers=headers,
+                json=data,
+                timeout=call.timeout(60)  # 60 second timeout, or less if the request deadline is closer
+            )
+            call.observe(response)
 
         # Return the response from Perplexity API
         return jsonify(response.json()), response.status_code
+    except UPSTREAM_UNAVAILABLE as e:
+        print(f"Perplexity API unavailable: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': f'Perplexity API temporarily unavailable: {str(e)}'
+        }), 503
     except Exception as e:
         print(f"Error in Perplexity API proxy: {str(e)}")
         traceback.print_exc()
@@ -4154,21 +4307,20 @@ def get_scoring_criteria():
             'message': f"Error retrieving scoring criteria: {str(e)}"
         }), 500
 
+# Frontend build: index.html from memory, precompressed hashed assets, ETag/304 (see static_assets.py)
+static_assets = StaticAssets(app.static_folder)
+
 # Serve frontend static files
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
 def serve(path):
-    print(f"Serving path: {path}")
-    if path and path != "" and os.path.exists(os.path.join(app.static_folder, path)):
-        print(f"Serving file: {path}")
-        return send_from_directory(app.static_folder, path)
-    else:
-        print(f"Serving index.html for path: {path}")
-        try:
-            return send_from_directory(app.static_folder, 'index.html')
-        except Exception as e:
-            print(f"Error serving index.html: {str(e)}")
-            return f"Error serving React app: {str(e)}", 500
+    asset = static_assets.respond(path, request.headers)
+    if asset.path:
+        body = wrap_file(request.environ, open(asset.path, 'rb'))
+        return Response(body, status=asset.status, headers=asset.headers, direct_passthrough=True)
+    if asset.status == 404:
+        print(f"Error serving React app: index.html not found in {app.static_folder}")
+    return Response(asset.body, status=asset.status, headers=asset.headers)
 
 # Entry point for Vercel
 app.debug = True  # Enable debug for troubleshooting
@@ -4180,5 +4332,6 @@ if __name__ == '__main__':
 
     # Use the port from command line arguments or environment variable
     port = args.port or int(os.environ.get('PORT', 5020))
+    start_warm_up()
     print(f"Starting Flask server on port {port}")
     app.run(host='0.0.0.0', port=port)
@@ -1,10 +1,13 @@
 import os
-from supabase import create_client, Client
 import traceback
+from app.utils.lazy import LazyClient
 
 # --- Supabase Setup ---
 def initialize_supabase():
     """Initialize and return the Supabase client"""
+    # Imported here: the supabase package is a large share of cold-start time
+    from supabase import create_client, Client
+
     # Use Project URL and Anon Key from environment variables
     supabase_url = os.environ.get("SUPABASE_URL")
     supabase_key = os.environ.get("SUPABASE_ANON_KEY")
@@ -23,8 +26,8 @@ def initialize_supabase():
         print("Warning: SUPABASE_URL or SUPABASE_ANON_KEY environment variables not set. Supabase client not initialized.")
         return None
 
-# Initialize the client
-supabase_client = initialize_supabase()
+# Created on first use, so importing the app doesn't pay for it
+supabase_client = LazyClient(initialize_supabase, "Supabase client")
 
 # History operations
 def add_search_to_history(search_type, query, results_count):
@@ -1,5 +1,6 @@
 from flask import Blueprint, request, jsonify
 from app.models.database import supabase_client
+from app.services.upstream_governor import upstream_governor, UPSTREAM_UNAVAILABLE
 import traceback
 import requests
 import os
@@ -94,15 +95,17 @@ def generate_partner_research():
 
         print(f"Sending request to Perplexity API with sonar model. Query: {query}\nPayload: {payload}")
         try:
-            perplexity_response = session.post(
-                f"{perplexity_api_url}/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {perplexity_api_key}",
-                    "Content-Type": "application/json"
-                },
-                json=payload,
-                timeout=180  # Increased to 3 minutes
-            )
+            with upstream_governor.slot("perplexity") as call:
+                perplexity_response = session.post(
+                    f"{perplexity_api_url}/chat/completions",
+                    headers={
+                        "Authorization": f"Bearer {perplexity_api_key}",
+                        "Content-Type": "application/json"
+                    },
+                    json=payload,
+                    timeout=call.timeout(180)  # Up to 3 minutes, less if the request deadline is closer
+                )
+                call.observe(perplexity_response)
             print(f"Perplexity API raw response: {perplexity_response.status_code} {perplexity_response.text}")
             perplexity_response.raise_for_status()
             response_json = perplexity_response.json()
@@ -110,6 +113,10 @@ def generate_partner_research():
             content = response_json['choices'][0]['message']['content']
             source = "perplexity"
             print(f"Successfully generated research using Perplexity API")
+        except UPSTREAM_UNAVAILABLE as e:
+            # Perplexity keeps failing or the request is out of time; don't hold the worker waiting on it
+            print(f"Perplexity API unavailable for {partner_name}: {str(e)}")
+            return jsonify({'success': False, 'message': f'Research is temporarily unavailable, please try again shortly: {e}'}), 503
         except Exception as e:
             print(f"Error calling Perplexity API: {e}\n{traceback.format_exc()}")
             return jsonify({'success': False, 'message': f'Error calling Perplexity API: {e}'}), 500
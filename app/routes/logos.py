@@ -0,0 +1,38 @@
+from flask import Blueprint, jsonify, request, Response
+from app.services.logo_service import get_logo, is_signed
+import traceback
+
+logos_bp = Blueprint('logos', __name__)
+
+# A domain's logo is fetched once and never refreshed, so browsers and CDNs
+# can keep it for good. Fallback images get a short lifetime so a real logo
+# shows up once logo.dev has one.
+LONG_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+FALLBACK_CACHE_CONTROL = 'public, max-age=3600'
+
+@logos_bp.route('/api/logos/<domain>', methods=['GET'])
+def serve_logo(domain):
+    """Serve a company logo from the local logo cache
+
+    Only signed URLs (see get_logo_url) are served, so nobody can make us
+    fetch and store logos for arbitrary domains.
+    """
+    if not is_signed(domain, request.args.get('sig')):
+        return jsonify({'success': False, 'message': 'Unknown logo'}), 404
+    try:
+        logo = get_logo(domain, request.args.get('size', type=int))
+        if not logo:
+            response = jsonify({'success': False, 'message': 'Logo not available'})
+            response.status_code = 404
+            response.headers['Cache-Control'] = FALLBACK_CACHE_CONTROL
+            return response
+
+        data, content_type, etag, is_fallback = logo
+        response = Response(data, mimetype=content_type)
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = FALLBACK_CACHE_CONTROL if is_fallback else LONG_CACHE_CONTROL
+        return response.make_conditional(request)
+    except Exception as e:
+        print(f"Error serving logo for {domain}: {str(e)}")
+        traceback.print_exc()
+        return jsonify({'success': False, 'message': str(e)}), 500
@@ -0,0 +1,110 @@
+import sys
+import base64
+from flask import Flask
+from flask_cors import CORS
+
+from app.services.deadline import install_request_deadline
+
+
+def create_function_app(name, *blueprints):
+    """A Flask app serving only `blueprints`, for one route-scoped serverless function
+
+    Unlike importing app.py, this loads just the modules the blueprints
+    import. Clients (Supabase, OpenAI) are module-level LazyClients, so a
+    warm function instance reuses them across invocations.
+    """
+    app = Flask(name)
+    CORS(app, resources={r"/*": {"origins": "*"}})
+    install_request_deadline(app)
+    for blueprint in blueprints:
+        app.register_blueprint(blueprint)
+    return app
+
+
+def create_partners_app():
+    """Read-only partner endpoints: potential partners, top partners and saved partner research"""
+    from app.routes.potential_partners import potential_partners_bp
+    from app.routes.top_partners import top_partners_bp
+    from app.routes.partner_research import partner_research_bp
+    return create_function_app("partners", potential_partners_bp, top_partners_bp, partner_research_bp)
+
+
+def create_research_app():
+    """Perplexity research generation and stored company research"""
+    from app.routes.generate_research import generate_research_bp
+    return create_function_app("research", generate_research_bp)
+
+
+def netlify_handler(flask_app):
+    """Netlify Function handler that adapts API Gateway requests to a Flask app"""
+
+    def handler(event, context):
+        # Extract request details from the Netlify event
+        path = event.get('path', '/')
+        http_method = event.get('httpMethod', 'GET')
+        headers = event.get('headers', {})
+        query_params = event.get('queryStringParameters', {}) or {}
+        body = event.get('body', '')
+
+        # Handle base64 encoded body if provided
+        is_base64_encoded = event.get('isBase64Encoded', False)
+        if is_base64_encoded and body:
+            body = base64.b64decode(body)
+
+        # Create environment dictionary for Flask
+        environ = {
+            'PATH_INFO': path,
+            'REQUEST_METHOD': http_method,
+            'QUERY_STRING': '&'.join([f"{k}={v}" for k, v in query_params.items()]) if query_params else '',
+            'SERVER_NAME': 'netlify',
+            'SERVER_PORT': '443',
+            'SERVER_PROTOCOL': 'HTTP/1.1',
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': 'https',
+            'wsgi.input': body.encode('utf-8') if isinstance(body, str) else body,
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': False,
+            'wsgi.multiprocess': False,
+            'wsgi.run_once': False,
+            'CONTENT_TYPE': headers.get('content-type', ''),
+            'CONTENT_LENGTH': str(len(body) if body else 0),
+        }
+
+        # Add HTTP headers to environment
+        for key, value in headers.items():
+            key = key.upper().replace('-', '_')
+            if key not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+                environ[f'HTTP_{key}'] = value
+
+        # Create a response object to capture the Flask response
+        response_data = {}
+
+        def start_response(status, response_headers, exc_info=None):
+            status_code = int(status.split(' ')[0])
+            response_data['statusCode'] = status_code
+            response_data['headers'] = dict(response_headers)
+
+        # Process the request through the Flask app
+        response_body = b''.join(flask_app(environ, start_response))
+
+        # Binary bodies go back base64 encoded: media, PDFs, and anything compressed
+        # (json_response gzips/brotlis large payloads, which are not valid UTF-8)
+        is_binary = False
+        response_headers = {key.lower(): value for key, value in response_data.get('headers', {}).items()}
+        content_type = response_headers.get('content-type', '')
+        compressed = response_headers.get('content-encoding', 'identity').lower() != 'identity'
+        if compressed or (content_type and ('image/' in content_type or 'application/pdf' in content_type or 'audio/' in content_type or 'video/' in content_type)):
+            response_body = base64.b64encode(response_body).decode('utf-8')
+            is_binary = True
+        else:
+            response_body = response_body.decode('utf-8')
+
+        # Construct and return the API Gateway response
+        return {
+            'statusCode': response_data.get('statusCode', 200),
+            'headers': response_data.get('headers', {}),
+            'body': response_body,
+            'isBase64Encoded': is_binary
+        }
+
+    return handler
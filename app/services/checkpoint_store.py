@@ -0,0 +1,146 @@
+import os
+import json
+import time
+import sqlite3
+import secrets
+import threading
+
+# SQLite file holding the stage outputs of unfinished searches. Empty disables checkpointing.
+CHECKPOINT_STORE_PATH = os.environ.get(
+    "CHECKPOINT_STORE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), ".cache", "checkpoints.sqlite3")
+)
+
+# A search that started longer ago than this starts over instead of resuming
+CHECKPOINT_TTL_HOURS = float(os.environ.get("CHECKPOINT_TTL_HOURS", 24))
+
+
+def new_search_id():
+    """Id for one search run; a client resumes a failed search by sending it back
+
+    Not derived from the query: two people searching the same thing at once
+    would otherwise write over each other's checkpoints.
+    """
+    return secrets.token_hex(8)
+
+
+class CheckpointStore:
+    """Stage outputs of running searches, keyed by search id and stage name
+
+    Rows live until the search finishes (the caller clears them) or the TTL
+    runs out. The TTL counts from the first checkpoint of a search, so a
+    resumed search never mixes fresh stages with expired ones.
+    """
+
+    def __init__(self, path=CHECKPOINT_STORE_PATH, ttl_hours=CHECKPOINT_TTL_HOURS):
+        self.path = path
+        self.ttl_seconds = ttl_hours * 60 * 60
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    @property
+    def enabled(self):
+        return bool(self.path)
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=10)
+        if not self._initialized:
+            with self._lock:
+                if not self._initialized:
+                    connection.execute("PRAGMA journal_mode=WAL")
+                    connection.execute("""
+                        CREATE TABLE IF NOT EXISTS checkpoints (
+                            search_id TEXT,
+                            stage TEXT,
+                            value TEXT,
+                            started_at REAL,
+                            PRIMARY KEY (search_id, stage)
+                        )
+                    """)
+                    connection.commit()
+                    self._initialized = True
+        return connection
+
+    def bind(self, search_id):
+        return SearchCheckpoint(self, search_id)
+
+    def load(self, search_id):
+        """Return {stage: output} for a search, dropping searches past the TTL"""
+        if not self.enabled:
+            return {}
+        try:
+            connection = self._connect()
+            try:
+                connection.execute(
+                    "DELETE FROM checkpoints WHERE search_id IN "
+                    "(SELECT search_id FROM checkpoints GROUP BY search_id HAVING MIN(started_at) < ?)",
+                    (time.time() - self.ttl_seconds,)
+                )
+                connection.commit()
+                rows = connection.execute(
+                    "SELECT stage, value FROM checkpoints WHERE search_id = ?", (search_id,)
+                ).fetchall()
+                return {stage: json.loads(value) for stage, value in rows}
+            finally:
+                connection.close()
+        except (OSError, sqlite3.Error, ValueError) as e:
+            print(f"Error reading checkpoints for {search_id}: {str(e)}")
+            return {}
+
+    def save(self, search_id, stage, value):
+        """Store one stage output; returns whether it was written"""
+        if not self.enabled:
+            return False
+        try:
+            serialized = json.dumps(value, default=str)
+        except (TypeError, ValueError) as e:
+            print(f"Not checkpointing stage {stage}: {str(e)}")
+            return False
+
+        try:
+            connection = self._connect()
+            try:
+                # Keep the search's original start time so the TTL still counts from the first stage
+                connection.execute(
+                    "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, "
+                    "COALESCE((SELECT MIN(started_at) FROM checkpoints WHERE search_id = ?), ?))",
+                    (search_id, stage, serialized, search_id, time.time())
+                )
+                connection.commit()
+            finally:
+                connection.close()
+            return True
+        except (OSError, sqlite3.Error) as e:
+            print(f"Error writing checkpoint {stage} for {search_id}: {str(e)}")
+            return False
+
+    def clear(self, search_id):
+        if not self.enabled:
+            return
+        try:
+            connection = self._connect()
+            try:
+                connection.execute("DELETE FROM checkpoints WHERE search_id = ?", (search_id,))
+                connection.commit()
+            finally:
+                connection.close()
+        except (OSError, sqlite3.Error) as e:
+            print(f"Error clearing checkpoints for {search_id}: {str(e)}")
+
+
+class SearchCheckpoint:
+    """The checkpoints of one search, in the shape Pipeline(checkpoint=...) expects"""
+
+    def __init__(self, store, search_id):
+        self.store = store
+        self.search_id = search_id
+
+    def load(self):
+        return self.store.load(self.search_id)
+
+    def save(self, stage, value):
+        self.store.save(self.search_id, stage, value)
+
+    def clear(self):
+        self.store.clear(self.search_id)
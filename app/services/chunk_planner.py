@@ -0,0 +1,237 @@
+import os
+import re
+import math
+import time
+import threading
+import contextvars
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Hard ceiling on companies per request; the model's output budget usually binds first
+MAX_CHUNK_SIZE = int(os.environ.get("ANALYSIS_MAX_CHUNK_SIZE", 12))
+
+# Output tokens one company's analysis takes (overview, competition check, score breakdown)
+OUTPUT_TOKENS_PER_COMPANY = int(os.environ.get("ANALYSIS_OUTPUT_TOKENS_PER_COMPANY", 450))
+
+# Completion budget per request; keep well under the model limit so JSON isn't truncated
+MAX_OUTPUT_TOKENS = int(os.environ.get("ANALYSIS_MAX_OUTPUT_TOKENS", 4096))
+
+# Upper bound on concurrent analysis requests, rate limits may push it lower
+MAX_WORKERS = int(os.environ.get("ANALYSIS_MAX_WORKERS", 8))
+
+# How many times a chunk's missing companies get split and retried
+MAX_RESPLITS = int(os.environ.get("ANALYSIS_MAX_RESPLITS", 2))
+
+_encoding = None
+_encoding_lock = threading.Lock()
+
+
+def estimate_tokens(text):
+    """Token count for text, exact with tiktoken installed, otherwise ~4 chars per token"""
+    global _encoding
+    if not text:
+        return 0
+    if tiktoken is not None:
+        with _encoding_lock:
+            if _encoding is None:
+                try:
+                    _encoding = tiktoken.encoding_for_model("gpt-4o")
+                except Exception:
+                    _encoding = tiktoken.get_encoding("cl100k_base")
+        return len(_encoding.encode(text))
+    return math.ceil(len(text) / 4)
+
+
+def _parse_reset(value):
+    """Parse OpenAI reset headers like '1s', '6m0s' or '250ms' into seconds"""
+    if not value:
+        return 0.0
+    total = 0.0
+    for amount, unit in re.findall(r'([\d.]+)(ms|s|m|h)', value):
+        total += float(amount) * {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600}[unit]
+    return total
+
+
+class RateLimitTracker:
+    """Keeps the latest x-ratelimit-* headers seen from OpenAI
+
+    Every analysis response updates it, and the batcher asks it how many
+    requests it can safely have in flight.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.remaining_requests = None
+        self.remaining_tokens = None
+        self.reset_requests_at = 0.0
+        self.reset_tokens_at = 0.0
+
+    def update(self, headers):
+        if not headers:
+            return
+        now = time.time()
+        with self._lock:
+            try:
+                if headers.get('x-ratelimit-remaining-requests') is not None:
+                    self.remaining_requests = int(headers.get('x-ratelimit-remaining-requests'))
+                    self.reset_requests_at = now + _parse_reset(headers.get('x-ratelimit-reset-requests'))
+                if headers.get('x-ratelimit-remaining-tokens') is not None:
+                    self.remaining_tokens = int(headers.get('x-ratelimit-remaining-tokens'))
+                    self.reset_tokens_at = now + _parse_reset(headers.get('x-ratelimit-reset-tokens'))
+            except (TypeError, ValueError) as e:
+                print(f"Could not parse OpenAI rate limit headers: {e}")
+
+    def recommended_workers(self, tokens_per_request, max_workers=MAX_WORKERS):
+        """How many requests of this size we can have in flight right now"""
+        now = time.time()
+        with self._lock:
+            limit = max_workers
+            if self.remaining_requests is not None and now < self.reset_requests_at:
+                limit = min(limit, self.remaining_requests)
+            if self.remaining_tokens is not None and now < self.reset_tokens_at and tokens_per_request > 0:
+                limit = min(limit, self.remaining_tokens // tokens_per_request)
+            return max(1, int(limit))
+
+    def wait_seconds(self, tokens_per_request):
+        """Seconds to hold off before sending another request, 0 if we have budget"""
+        now = time.time()
+        with self._lock:
+            waits = []
+            if self.remaining_requests is not None and self.remaining_requests <= 0:
+                waits.append(self.reset_requests_at - now)
+            if self.remaining_tokens is not None and self.remaining_tokens < tokens_per_request:
+                waits.append(self.reset_tokens_at - now)
+            return max([0.0] + waits)
+
+
+# Shared by every analysis call in the process
+rate_limits = RateLimitTracker()
+
+
+def plan_chunk_size(item_count, shared_prefix_tokens, per_item_tokens, target_workers=MAX_WORKERS,
+                    output_tokens_per_item=OUTPUT_TOKENS_PER_COMPANY, max_chunk_size=MAX_CHUNK_SIZE):
+    """Choose how many companies to put in each analysis request
+
+    Every request repeats the shared partner/criteria prefix, so chunks grow
+    until the companies' own tokens (prompt + completion) at least match the
+    prefix, and never shrink below what keeps all workers busy. The output
+    budget per request caps both.
+    """
+    if item_count <= 0:
+        return 1
+    output_cap = max(1, MAX_OUTPUT_TOKENS // max(1, output_tokens_per_item))
+    cap = max(1, min(max_chunk_size, output_cap))
+
+    per_item_total = max(1, per_item_tokens + output_tokens_per_item)
+    amortized = math.ceil(shared_prefix_tokens / per_item_total)
+    spread = math.ceil(item_count / max(1, target_workers))
+    return max(1, min(cap, item_count, max(amortized, spread)))
+
+
+def request_tokens(shared_prefix_tokens, per_item_tokens, chunk_size, output_tokens_per_item=OUTPUT_TOKENS_PER_COMPANY):
+    """Approximate total tokens (prompt + completion) one request will use"""
+    return shared_prefix_tokens + chunk_size * (per_item_tokens + output_tokens_per_item)
+
+
+def is_resplittable(error):
+    """Whether a smaller chunk could succeed where this one raised `error`
+
+    Truncated or malformed JSON, context-length and rate-limit errors are;
+    auth errors, an open circuit, a passed deadline or an exhausted quota
+    would fail the same way for every part, so they are not.
+    """
+    if isinstance(error, ValueError):
+        return True
+    code = str(getattr(error, 'code', None) or '')
+    if code == 'insufficient_quota':
+        return False
+    if getattr(error, 'status_code', None) == 429 or type(error).__name__ == 'RateLimitError':
+        return True
+    text = str(error).lower()
+    return code == 'context_length_exceeded' or 'context_length_exceeded' in text or 'maximum context length' in text
+
+
+def _halves(items):
+    middle = math.ceil(len(items) / 2)
+    return [part for part in (items[:middle], items[middle:]) if part]
+
+
+def run_adaptive_batches(items, analyze_chunk, shared_prefix_tokens, per_item_tokens,
+                         tracker=rate_limits, max_workers=MAX_WORKERS, max_resplits=MAX_RESPLITS,
+                         output_tokens_per_item=OUTPUT_TOKENS_PER_COMPANY, max_chunk_size=MAX_CHUNK_SIZE):
+    """Analyze items in adaptively sized, rate-limit aware parallel batches
+
+    Args:
+        items (list): Company names to analyze
+        analyze_chunk (callable): Takes a list of items, returns (results, missing_items)
+        shared_prefix_tokens (int): Tokens every request repeats (partners, criteria, instructions)
+        per_item_tokens (int): Prompt tokens a single item adds
+        tracker (RateLimitTracker): Source of the current rate-limit budget
+        max_workers (int): Upper bound on concurrent requests
+        output_tokens_per_item (int): Completion tokens one item's answer takes
+        max_chunk_size (int): Hard ceiling on items per request
+
+    Returns:
+        tuple: (results, items that still failed after re-splitting)
+
+    Only failures a smaller chunk can fix are re-split (see is_resplittable);
+    any other error fails its chunk and every chunk not yet sent.
+    """
+    if not items:
+        return [], []
+
+    chunk_size = plan_chunk_size(len(items), shared_prefix_tokens, per_item_tokens, max_workers,
+                                 output_tokens_per_item, max_chunk_size)
+    pending = deque((items[i:i + chunk_size], 0) for i in range(0, len(items), chunk_size))
+    print(f"Adaptive batching: {len(items)} companies in {len(pending)} chunks of up to {chunk_size} "
+          f"(shared prefix ~{shared_prefix_tokens} tokens, ~{per_item_tokens} per company)")
+
+    results, failed = [], []
+    in_flight = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while pending or in_flight:
+            while pending:
+                chunk, depth = pending[0]
+                cost = request_tokens(shared_prefix_tokens, per_item_tokens, len(chunk), output_tokens_per_item)
+                if len(in_flight) >= tracker.recommended_workers(cost, max_workers):
+                    break
+                delay = tracker.wait_seconds(cost)
+                if delay > 0 and in_flight:
+                    break
+                if delay > 0:
+                    print(f"Rate limit budget exhausted, waiting {delay:.1f}s")
+                    time.sleep(min(delay, 60))
+                pending.popleft()
+                in_flight[executor.submit(contextvars.copy_context().run, analyze_chunk, chunk)] = (chunk, depth)
+
+            done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+            for future in done:
+                chunk, depth = in_flight.pop(future)
+                try:
+                    found, missing = future.result()
+                except Exception as e:
+                    print(f"Error analyzing chunk {', '.join(map(str, chunk))}: {e}")
+                    if not is_resplittable(e):
+                        # Every other request would fail the same way: stop sending them
+                        failed.extend(chunk)
+                        while pending:
+                            failed.extend(pending.popleft()[0])
+                        continue
+                    found, missing = [], list(chunk)
+
+                results.extend(found)
+                if not missing:
+                    continue
+                if depth < max_resplits:
+                    parts = _halves(missing) if len(missing) > 1 else [missing]
+                    print(f"Re-analyzing {len(missing)} missing companies in {len(parts)} smaller chunk(s)")
+                    pending.extend((part, depth + 1) for part in parts)
+                else:
+                    failed.extend(missing)
+
+    return results, failed
@@ -4,16 +4,8 @@ import json
 import traceback
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import random
-from openai import OpenAI
 from ..models.database import add_company_to_considered, save_potential_partner
-
-# Initialize OpenAI client
-api_key = os.environ.get("OPENAI_API_KEY")
-try:
-    client = OpenAI(api_key=api_key) if api_key else None
-except Exception as e:
-    print(f"Error initializing OpenAI client: {e}")
-    client = None
+from .openai_provider import get_openai_client
 
 def fetch_coresignal_data(company_name):
     """Fetch company data from Coresignal API or mock data"""
@@ -262,8 +254,8 @@ def generate_company_analysis(companies, industry, formatted_partners, formatted
         if not companies:
             return {"companies": []}
         
-        # Check if we have a client
-        global client
+        # Shared client; None when OPENAI_API_KEY is not set
+        client = get_openai_client()
         if not client:
             print("Error: OpenAI client not available for company analysis")
             return {"error": "OpenAI client not available", "companies": []}
@@ -0,0 +1,172 @@
+import os
+import re
+import math
+import zlib
+
+import numpy as np
+
+from app.services.name_extractor import normalize_name
+
+# Set COMPETITION_PRESCREEN=false to send every candidate, even one a partner excludes by name, through the GPT check
+PRESCREEN_ENABLED = os.environ.get("COMPETITION_PRESCREEN", "true").lower() != "false"
+
+# Width of the hashed feature space (word unigrams, bigrams and stems)
+HASH_DIMENSIONS = int(os.environ.get("PRESCREEN_HASH_DIMENSIONS", 2 ** 14))
+
+# Below this cosine similarity a company counts as unrelated to a partner, so a stored
+# verdict survives changes to that partner's category (see VerdictStore)
+CLEAR_THRESHOLD = float(os.environ.get("PRESCREEN_CLEAR_THRESHOLD", 0.08))
+
+# Characters of search-result text kept as a candidate's description
+MAX_DESCRIPTION_CHARS = 1200
+
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have", "in", "is", "it", "its",
+    "of", "on", "or", "that", "the", "their", "this", "to", "was", "were", "with", "other", "competing",
+    "major", "products", "services", "service", "company", "companies", "brands", "brand", "provider",
+    "providers", "based", "including", "such", "also", "which", "who", "will", "can", "more", "most",
+    "new", "our", "we", "you", "your", "they", "all", "both", "than", "not", "but", "into", "over", "top"
+}
+
+# Exclusions that describe a kind of company instead of naming one
+_GENERIC_EXCLUSION_WORDS = {"other", "competing", "non", "premium", "online"}
+
+_WORD_RE = re.compile(r"[a-z0-9][a-z0-9&'\-]*")
+
+
+def _stem(word):
+    """Crude stem so "beverage"/"beverages" and "sport"/"sports" share a feature"""
+    if word.endswith("ies") and len(word) > 4:
+        word = word[:-3] + "y"
+    elif word.endswith("s") and not word.endswith("ss") and len(word) > 3:
+        word = word[:-1]
+    return word[:6]
+
+
+def _tokens(text):
+    words = [w for w in _WORD_RE.findall((text or "").lower()) if w not in _STOPWORDS and len(w) > 1]
+    stems = [_stem(w) for w in words]
+    bigrams = [f"{a} {b}" for a, b in zip(stems, stems[1:])]
+    return stems + bigrams
+
+
+def _hash(token):
+    return zlib.crc32(token.encode('utf-8')) % HASH_DIMENSIONS
+
+
+def _counts(text):
+    counts = {}
+    for token in _tokens(text):
+        index = _hash(token)
+        counts[index] = counts.get(index, 0) + 1
+    return counts
+
+
+def _named_exclusion(exclusion):
+    """'Nike' or 'Pepsi products' name a company; 'Other airlines' does not"""
+    if exclusion.strip().lower() in ("n/a", "na", "none", ""):
+        return None
+    words = exclusion.replace('-', ' ').split()
+    if not words or words[0].lower() in _GENERIC_EXCLUSION_WORDS:
+        return None
+    while words and words[-1].lower() in ("products", "brands"):
+        words = words[:-1]
+    if words and all(w[:1].isupper() for w in words):
+        return " ".join(words)
+    return None
+
+
+def _profile_text(partner):
+    exclusions = [e for e in partner.get('exclusions', []) if not _named_exclusion(e)]
+    return " ".join([
+        partner.get('category', ''),
+        partner.get('description', ''),
+        " ".join(partner.get('inclusions', [])),
+        " ".join(exclusions)
+    ])
+
+
+class CompetitionPrescreen:
+    """Cheap local checks of companies against current partners
+
+    Named exclusions ("Nike", "Gatorade") are matched by name, which settles
+    a candidate without a GPT call. Each partner's category, description,
+    inclusions and generic exclusions also become one hashed TF-IDF vector,
+    built once; VerdictStore compares a stored company against them to tell
+    whether a changed partner category concerns it. Low similarity is no
+    proof of not competing, so it never settles a candidate on its own.
+    """
+
+    def __init__(self, partners):
+        self.partners = list(partners)
+        documents = [_counts(_profile_text(p)) for p in self.partners]
+
+        document_frequency = np.zeros(HASH_DIMENSIONS, dtype=np.float32)
+        for counts in documents:
+            document_frequency[list(counts)] += 1
+        self.idf = np.log((1 + len(documents)) / (1 + document_frequency)).astype(np.float32) + 1
+
+        self.matrix = np.zeros((len(documents), HASH_DIMENSIONS), dtype=np.float32)
+        for row, counts in enumerate(documents):
+            self.matrix[row] = self._vector(counts)
+
+        self.named_exclusions = {}
+        for partner in self.partners:
+            for exclusion in partner.get('exclusions', []):
+                key = normalize_name(_named_exclusion(exclusion))
+                if key:
+                    self.named_exclusions.setdefault(key, partner['name'])
+
+    def _vector(self, counts):
+        vector = np.zeros(HASH_DIMENSIONS, dtype=np.float32)
+        for index, count in counts.items():
+            vector[index] = 1 + math.log(count)
+        vector *= self.idf
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def exclusion_hit(self, name):
+        """Partner whose exclusions name this company, or None
+
+        The whole name has to match, legal suffixes aside: excluding "Apple"
+        excludes "Apple Inc" but not "Apple Leisure Group".
+        """
+        return self.named_exclusions.get(normalize_name(name))
+
+    def similarities(self, description):
+        """Cosine similarity of a description to every partner"""
+        if not self.partners:
+            return np.zeros(0, dtype=np.float32)
+        return self.matrix @ self._vector(_counts(description))
+
+
+def describe_from_results(names, search_results, max_chars=MAX_DESCRIPTION_CHARS):
+    """Collect the sentences in search results that mention each company
+
+    Returns:
+        dict: company name -> description text (empty when never mentioned)
+    """
+    sentences = []
+    for result in search_results or []:
+        text = f"{result.get('title') or ''}. {result.get('text') or result.get('snippet') or ''}"
+        sentences.extend(s.strip() for s in re.split(r'(?<=[\.\!\?])\s+|\n+', text) if s.strip())
+
+    descriptions = {}
+    for name in names:
+        key = normalize_name(name)
+        pattern = re.compile(r'\b' + re.escape(name.lower().split()[0]) + r'\b') if name.strip() else None
+        parts, length = [], 0
+        for sentence in sentences:
+            lowered = sentence.lower()
+            if not pattern or not pattern.search(lowered):
+                continue
+            if key and key not in re.sub(r'[^a-z0-9]', '', lowered):
+                continue
+            if sentence in parts:
+                continue
+            parts.append(sentence)
+            length += len(sentence) + 1
+            if length >= max_chars:
+                break
+        descriptions[name] = " ".join(parts)[:max_chars]
+    return descriptions
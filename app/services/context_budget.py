@@ -0,0 +1,159 @@
+import os
+import re
+import zlib
+
+from app.services.chunk_planner import estimate_tokens
+
+# Prompt tokens extract_company_names may spend on search results
+CONTEXT_TOKEN_BUDGET = int(os.environ.get("CONTEXT_TOKEN_BUDGET", 12000))
+
+# Pages whose shingle sets overlap at least this much are treated as copies
+NEAR_DUPLICATE_THRESHOLD = float(os.environ.get("CONTEXT_NEAR_DUPLICATE_THRESHOLD", 0.8))
+
+# Passages longer than this many words are split so one wall of text can't eat the budget
+MAX_PASSAGE_WORDS = 120
+
+SHINGLE_SIZE = 5
+
+_WORD_RE = re.compile(r"[A-Za-z0-9][A-Za-z0-9&'\.-]*")
+_ENTITY_RE = re.compile(r"\b[A-Z][A-Za-z0-9&\.'-]*(?:\s+(?:&\s+)?[A-Z][A-Za-z0-9&\.'-]*)*")
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "in", "is", "it", "its", "of",
+    "on", "or", "that", "the", "their", "this", "to", "was", "were", "with", "top", "best", "companies",
+    "company", "industry", "we", "our", "you", "your", "they", "these", "those", "how", "what", "why",
+    "when", "which", "who", "here", "there", "also", "more", "most", "new", "i", "if", "but", "not"
+}
+
+
+def _shingles(text):
+    words = [w.lower() for w in _WORD_RE.findall(text)]
+    if len(words) < SHINGLE_SIZE:
+        return {zlib.crc32(" ".join(words).encode('utf-8'))} if words else set()
+    return {
+        zlib.crc32(" ".join(words[i:i + SHINGLE_SIZE]).encode('utf-8'))
+        for i in range(len(words) - SHINGLE_SIZE + 1)
+    }
+
+
+def dedupe_pages(results, threshold=NEAR_DUPLICATE_THRESHOLD):
+    """Drop search results whose text is a near copy of an earlier one (shingle Jaccard)"""
+    kept, kept_shingles = [], []
+    for result in results:
+        shingles = _shingles(result.get('text') or result.get('snippet') or "")
+        duplicate = False
+        for other in kept_shingles:
+            if shingles and other:
+                overlap = len(shingles & other) / len(shingles | other)
+                if overlap >= threshold:
+                    duplicate = True
+                    break
+        if not duplicate:
+            kept.append(result)
+            kept_shingles.append(shingles)
+    return kept
+
+
+def _industry_terms(industry):
+    """Word stems from the industry query, e.g. 'sports analytics' -> {'sport', 'analy'}"""
+    terms = set()
+    for word in _WORD_RE.findall((industry or "").lower()):
+        if len(word) > 2 and word not in _STOPWORDS:
+            terms.add(word[:5])
+    return terms
+
+
+def _passages(text):
+    """Split page text into paragraphs, breaking up very long ones"""
+    for block in re.split(r'\n\s*\n|\n(?=\s*(?:[-*•]|\d+[\.\)])\s)', text or ""):
+        block = " ".join(block.split())
+        if not block:
+            continue
+        words = block.split(" ")
+        for i in range(0, len(words), MAX_PASSAGE_WORDS):
+            yield " ".join(words[i:i + MAX_PASSAGE_WORDS])
+
+
+def score_passage(passage, industry_terms):
+    """Density of capitalized entity candidates and industry terms per word"""
+    words = _WORD_RE.findall(passage)
+    if not words:
+        return 0.0
+    # Distinct names, so a word repeated down a page doesn't look like a list of companies
+    entities = {
+        match for match in _ENTITY_RE.findall(passage)
+        if match.split()[0].lower() not in _STOPWORDS or len(match.split()) > 1
+    }
+    industry_hits = sum(1 for w in words if w.lower()[:5] in industry_terms)
+    return (len(entities) * 2 + industry_hits) / len(words)
+
+
+def _format_page(result, passages):
+    body = "\n".join(passages) if passages else (result.get('snippet') or "")
+    return f"Title: {result.get('title', 'No Title')}\nURL: {result.get('url', 'No URL')}\nContent: {body}"
+
+
+def build_search_context(search_results, industry, token_budget=CONTEXT_TOKEN_BUDGET):
+    """Pack the most useful search-result passages into a token budget
+
+    Near-duplicate pages are dropped, passages are ranked by entity and
+    industry-term density, and the best ones are kept (in their original
+    order) until the budget is spent. Every surviving page keeps its title
+    and URL, which often name the company on their own.
+
+    Args:
+        search_results (list): Dicts with title, url, text, snippet
+        industry (str): Industry query, used to weight passages
+        token_budget (int): Maximum tokens for the formatted context
+
+    Returns:
+        tuple: (formatted context string, stats dict)
+    """
+    full_text = "\n\n".join(
+        _format_page(r, [r.get('text', r.get('snippet', 'No Content'))]) for r in search_results
+    )
+    tokens_before = estimate_tokens(full_text)
+
+    pages = dedupe_pages(search_results)
+    terms = _industry_terms(industry)
+
+    # Headers are always included so they come out of the budget first
+    remaining = token_budget - sum(estimate_tokens(_format_page(p, [])) for p in pages)
+
+    candidates = []
+    seen = set()
+    for page_index, page in enumerate(pages):
+        for passage_index, passage in enumerate(_passages(page.get('text') or page.get('snippet') or "")):
+            key = passage.lower()
+            if key in seen:
+                continue
+            seen.add(key)
+            candidates.append((score_passage(passage, terms), page_index, passage_index, passage))
+
+    chosen = {}
+    for score, page_index, passage_index, passage in sorted(candidates, key=lambda c: c[0], reverse=True):
+        if score <= 0:
+            break
+        cost = estimate_tokens(passage) + 1
+        if cost > remaining:
+            continue
+        remaining -= cost
+        chosen.setdefault(page_index, []).append((passage_index, passage))
+
+    formatted = "\n\n".join(
+        _format_page(page, [p for _, p in sorted(chosen.get(i, []))])
+        for i, page in enumerate(pages)
+    )
+    tokens_after = estimate_tokens(formatted)
+
+    stats = {
+        "pages_in": len(search_results),
+        "pages_kept": len(pages),
+        "near_duplicates_dropped": len(search_results) - len(pages),
+        "passages_considered": len(candidates),
+        "passages_kept": sum(len(v) for v in chosen.values()),
+        "tokens_before": tokens_before,
+        "tokens_after": tokens_after,
+        "tokens_saved": max(0, tokens_before - tokens_after),
+        "token_budget": token_budget
+    }
+    return formatted, stats
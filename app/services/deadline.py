@@ -0,0 +1,109 @@
+import os
+import time
+import contextvars
+from contextlib import contextmanager
+
+# Time budget for one incoming request, shared by every upstream call it makes.
+# Clients can ask for less with an X-Request-Deadline header (seconds).
+REQUEST_DEADLINE_SECONDS = float(os.environ.get("REQUEST_DEADLINE_SECONDS", 300))
+
+# Budget for endpoints that run a whole search before answering (the synchronous /api/search):
+# 40 enrichments at up to 20s each don't fit in REQUEST_DEADLINE_SECONDS
+LONG_REQUEST_DEADLINE_SECONDS = float(os.environ.get("LONG_REQUEST_DEADLINE_SECONDS", 1200))
+
+# Absolute time.time() the current request must finish by; None outside a request
+_deadline = contextvars.ContextVar("request_deadline", default=None)
+
+# {(upstream, reason): skipped calls} for the current request; None outside a request
+_degraded = contextvars.ContextVar("request_degraded", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """The request's deadline passed before an upstream call could start"""
+
+
+def remaining():
+    """Seconds left before the current deadline, or None when no deadline is set"""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.time()
+
+
+def set_deadline(seconds):
+    """Start a deadline `seconds` from now and return a token for reset_deadline
+
+    A deadline can only shorten the one already in force, never extend it.
+    """
+    deadline = time.time() + seconds
+    current = _deadline.get()
+    if current is not None:
+        deadline = min(deadline, current)
+    return _deadline.set(deadline)
+
+
+def reset_deadline(token):
+    _deadline.reset(token)
+
+
+@contextmanager
+def deadline(seconds):
+    token = set_deadline(seconds)
+    try:
+        yield
+    finally:
+        reset_deadline(token)
+
+
+def note_degraded(upstream, error):
+    """Record that a call to `upstream` was refused, so the response can say its data is partial"""
+    notes = _degraded.get()
+    if notes is not None:
+        key = (upstream, type(error).__name__)
+        notes[key] = notes.get(key, 0) + 1
+
+
+def degraded():
+    """Upstream calls refused so far in this request: [{upstream, reason, calls}]"""
+    notes = dict(_degraded.get() or {})
+    return [{"upstream": upstream, "reason": reason, "calls": calls} for (upstream, reason), calls in sorted(notes.items())]
+
+
+def timeout_for(cap=None):
+    """Timeout for one upstream call: its own cap, shortened to what is left of the deadline
+
+    Raises DeadlineExceeded when nothing is left, so the call never starts.
+    """
+    left = remaining()
+    if left is None:
+        return cap
+    if left <= 0:
+        raise DeadlineExceeded(f"Request deadline passed {-left:.1f}s ago")
+    return left if cap is None else min(cap, left)
+
+
+def install_request_deadline(app, long_endpoints=()):
+    """Give every request of a Flask app its own deadline: REQUEST_DEADLINE_SECONDS or X-Request-Deadline, whichever is less
+
+    Endpoints named in long_endpoints start from LONG_REQUEST_DEADLINE_SECONDS instead.
+    Each request also gets an empty degraded() list.
+    """
+    from flask import request, g
+
+    @app.before_request
+    def start_request_deadline():
+        seconds = LONG_REQUEST_DEADLINE_SECONDS if request.endpoint in long_endpoints else REQUEST_DEADLINE_SECONDS
+        try:
+            seconds = min(seconds, float(request.headers.get('X-Request-Deadline', seconds)))
+        except ValueError:
+            pass
+        g.deadline_token = set_deadline(seconds)
+        g.degraded_token = _degraded.set({})
+
+    @app.teardown_request
+    def end_request_deadline(exc):
+        for name, var in (('deadline_token', _deadline), ('degraded_token', _degraded)):
+            token = g.pop(name, None)
+            if token is not None:
+                try:
+                    var.reset(token)
+                except ValueError:
+                    pass  # torn down in a different context than the one that set it
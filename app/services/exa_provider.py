@@ -0,0 +1,422 @@
+# Canonical Exa client; fastapi_app/app/exa_provider.py is a trimmed fork of it, keep fixes in step
+
+import os
+import asyncio
+import threading
+import requests
+from collections import OrderedDict
+
+from app.services.page_cache import page_cache, canonical_url
+from app.services.upstream_governor import upstream_governor, UPSTREAM_UNAVAILABLE
+
+try:
+    from exa_py import Exa
+except ImportError:
+    Exa = None
+
+EXA_SEARCH_URL = "https://api.exa.ai/search"
+EXA_CONTENTS_URL = "https://api.exa.ai/contents"
+
+# Number of search results per query
+EXA_NUM_RESULTS = int(os.environ.get("EXA_NUM_RESULTS", 40))
+
+# Page text is cut server-side so we never download (or prompt with) whole pages
+EXA_TEXT_MAX_CHARACTERS = int(os.environ.get("EXA_TEXT_MAX_CHARACTERS", 3000))
+
+# Highlights become the result snippet
+EXA_HIGHLIGHT_SENTENCES = int(os.environ.get("EXA_HIGHLIGHT_SENTENCES", 3))
+EXA_HIGHLIGHTS_PER_URL = int(os.environ.get("EXA_HIGHLIGHTS_PER_URL", 2))
+
+EXA_TIMEOUT = int(os.environ.get("EXA_TIMEOUT", 30))
+
+# Last good results for this many recent queries, served when Exa's circuit is open
+# or the request deadline has run out
+EXA_STALE_RESULTS = int(os.environ.get("EXA_STALE_RESULTS", 256))
+
+_last_results = OrderedDict()
+_last_results_lock = threading.Lock()
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def _get_client(api_key):
+    """One exa-py client per API key, reused across searches"""
+    with _clients_lock:
+        client = _clients.get(api_key)
+        if client is None:
+            client = _clients[api_key] = Exa(api_key)
+        return client
+
+
+def _format_result(title, url, text, highlights):
+    """Shape a result the way the rest of the app expects: {title, url, text, snippet}"""
+    snippet = " ... ".join(h.strip() for h in (highlights or []) if h and h.strip())
+    return {
+        "title": title or "",
+        "url": url or "",
+        "text": text or snippet,
+        "snippet": snippet
+    }
+
+
+def _search_with_sdk(query, api_key, num_results, max_characters, use_autoprompt):
+    with upstream_governor.slot("exa"):
+        response = _get_client(api_key).search_and_contents(
+            query,
+            num_results=num_results,
+            use_autoprompt=use_autoprompt,
+            text={"max_characters": max_characters},
+            highlights={"num_sentences": EXA_HIGHLIGHT_SENTENCES, "highlights_per_url": EXA_HIGHLIGHTS_PER_URL}
+        )
+    return [
+        _format_result(
+            getattr(result, 'title', ''),
+            getattr(result, 'url', ''),
+            getattr(result, 'text', ''),
+            getattr(result, 'highlights', None)
+        )
+        for result in (response.results or [])
+    ]
+
+
+def _search_with_rest(query, api_key, num_results, max_characters, use_autoprompt):
+    with upstream_governor.slot("exa") as call:
+        response = requests.post(
+            EXA_SEARCH_URL,
+            headers={"x-api-key": api_key, "Content-Type": "application/json"},
+            json={
+                "query": query,
+                "numResults": num_results,
+                "useAutoprompt": use_autoprompt,
+                "contents": {
+                    "text": {"maxCharacters": max_characters},
+                    "highlights": {"numSentences": EXA_HIGHLIGHT_SENTENCES, "highlightsPerUrl": EXA_HIGHLIGHTS_PER_URL}
+                }
+            },
+            timeout=call.timeout(EXA_TIMEOUT)
+        )
+        call.observe(response)
+    if response.status_code != 200:
+        raise RuntimeError(f"Exa API returned {response.status_code}: {response.text[:500]}")
+    return [
+        _format_result(result.get('title'), result.get('url'), result.get('text'), result.get('highlights'))
+        for result in response.json().get('results', [])
+    ]
+
+
+def _search_urls_with_sdk(query, api_key, num_results, use_autoprompt):
+    with upstream_governor.slot("exa"):
+        response = _get_client(api_key).search(query, num_results=num_results, use_autoprompt=use_autoprompt)
+    return [
+        {"title": getattr(result, 'title', '') or "", "url": getattr(result, 'url', '') or ""}
+        for result in (response.results or [])
+    ]
+
+
+def _search_urls_with_rest(query, api_key, num_results, use_autoprompt):
+    with upstream_governor.slot("exa") as call:
+        response = requests.post(
+            EXA_SEARCH_URL,
+            headers={"x-api-key": api_key, "Content-Type": "application/json"},
+            json={"query": query, "numResults": num_results, "useAutoprompt": use_autoprompt},
+            timeout=call.timeout(EXA_TIMEOUT)
+        )
+        call.observe(response)
+    if response.status_code != 200:
+        raise RuntimeError(f"Exa API returned {response.status_code}: {response.text[:500]}")
+    return [
+        {"title": result.get('title') or "", "url": result.get('url') or ""}
+        for result in response.json().get('results', [])
+    ]
+
+
+def _contents_with_sdk(urls, api_key, max_characters):
+    with upstream_governor.slot("exa"):
+        response = _get_client(api_key).get_contents(
+            urls,
+            text={"max_characters": max_characters},
+            highlights={"num_sentences": EXA_HIGHLIGHT_SENTENCES, "highlights_per_url": EXA_HIGHLIGHTS_PER_URL}
+        )
+    return [
+        _format_result(
+            getattr(result, 'title', ''),
+            getattr(result, 'url', '') or getattr(result, 'id', ''),
+            getattr(result, 'text', ''),
+            getattr(result, 'highlights', None)
+        )
+        for result in (response.results or [])
+    ]
+
+
+def _contents_with_rest(urls, api_key, max_characters):
+    with upstream_governor.slot("exa") as call:
+        response = requests.post(
+            EXA_CONTENTS_URL,
+            headers={"x-api-key": api_key, "Content-Type": "application/json"},
+            json={
+                "ids": urls,
+                "text": {"maxCharacters": max_characters},
+                "highlights": {"numSentences": EXA_HIGHLIGHT_SENTENCES, "highlightsPerUrl": EXA_HIGHLIGHTS_PER_URL}
+            },
+            timeout=call.timeout(EXA_TIMEOUT)
+        )
+        call.observe(response)
+    if response.status_code != 200:
+        raise RuntimeError(f"Exa contents API returned {response.status_code}: {response.text[:500]}")
+    return [
+        _format_result(result.get('title'), result.get('url') or result.get('id'), result.get('text'), result.get('highlights'))
+        for result in response.json().get('results', [])
+    ]
+
+
+def fetch_contents(urls, api_key, max_characters=EXA_TEXT_MAX_CHARACTERS):
+    """Fetch capped text and highlights for several URLs in one request"""
+    if not urls:
+        return []
+    if Exa is not None:
+        try:
+            return _contents_with_sdk(urls, api_key, max_characters)
+        except UPSTREAM_UNAVAILABLE:
+            raise
+        except Exception as e:
+            print(f"exa-py get_contents failed, falling back to REST: {str(e)}")
+    return _contents_with_rest(urls, api_key, max_characters)
+
+
+def _search_with_page_cache(query, api_key, num_results, max_characters, use_autoprompt):
+    """Search without contents, then fetch text only for pages not already cached"""
+    if Exa is not None:
+        try:
+            hits = _search_urls_with_sdk(query, api_key, num_results, use_autoprompt)
+        except UPSTREAM_UNAVAILABLE:
+            raise
+        except Exception as e:
+            print(f"exa-py search failed, falling back to REST: {str(e)}")
+            hits = _search_urls_with_rest(query, api_key, num_results, use_autoprompt)
+    else:
+        hits = _search_urls_with_rest(query, api_key, num_results, use_autoprompt)
+
+    cached = {}
+    missing = []
+    for hit in hits:
+        entry = page_cache.get(hit['url'], max_characters)
+        if entry:
+            cached[hit['url']] = entry
+        elif hit['url'] and hit['url'] not in missing:
+            missing.append(hit['url'])
+
+    fetched = {}
+    if missing:
+        try:
+            for result in fetch_contents(missing, api_key, max_characters):
+                fetched[canonical_url(result['url'])] = result
+                page_cache.put(result['url'], result['text'], result['title'], result['snippet'], max_characters=max_characters)
+        except Exception as e:
+            print(f"Error fetching contents for {len(missing)} pages: {str(e)}")
+
+    print(f"Page cache: {len(cached)} of {len(hits)} pages reused, {len(fetched)} fetched")
+
+    results = []
+    for hit in hits:
+        entry = cached.get(hit['url']) or fetched.get(canonical_url(hit['url'])) or {}
+        results.append({
+            "title": hit['title'] or entry.get('title', ""),
+            "url": hit['url'],
+            "text": entry.get('text') or entry.get('snippet', ""),
+            "snippet": entry.get('snippet', "")
+        })
+    return results
+
+
+def _remember_results(key, results):
+    if not EXA_STALE_RESULTS or not results:
+        return
+    with _last_results_lock:
+        _last_results[key] = results
+        _last_results.move_to_end(key)
+        while len(_last_results) > EXA_STALE_RESULTS:
+            _last_results.popitem(last=False)
+
+
+def _stale_results(key, error):
+    """The last good results for a query, or re-raise the error that kept us from Exa"""
+    with _last_results_lock:
+        results = _last_results.get(key)
+    if results is None:
+        raise error
+    print(f"Exa unavailable ({str(error)}); serving the last {len(results)} results for {key[0]!r}")
+    return results
+
+
+def search_with_contents(query, api_key, num_results=EXA_NUM_RESULTS, max_characters=EXA_TEXT_MAX_CHARACTERS, use_autoprompt=True):
+    """Run an Exa search and return results with capped page text and highlights
+
+    By default exa-py's search_and_contents (or the REST equivalent) does
+    both in a single request. With the page cache enabled (PAGE_CACHE_MAX_BYTES)
+    it is a search plus one batched contents request for pages not seen
+    recently, and no contents request at all when every page is cached.
+
+    Args:
+        query (str): Search query
+        api_key (str): Exa API key
+        num_results (int): Number of results to return
+        max_characters (int): Maximum page text characters per result
+
+    Returns:
+        list: Dicts with title, url, text and snippet
+
+    When the Exa circuit is open or the request deadline has passed, the
+    last results for the same query are returned instead, if there are any.
+    """
+    key = (query, num_results, max_characters)
+    try:
+        results = _search(query, api_key, num_results, max_characters, use_autoprompt)
+    except UPSTREAM_UNAVAILABLE as e:
+        return _stale_results(key, e)
+    _remember_results(key, results)
+    return results
+
+
+def _search(query, api_key, num_results, max_characters, use_autoprompt):
+    if page_cache.enabled:
+        return _search_with_page_cache(query, api_key, num_results, max_characters, use_autoprompt)
+
+    if Exa is not None:
+        try:
+            return _search_with_sdk(query, api_key, num_results, max_characters, use_autoprompt)
+        except (AttributeError, TypeError, ValueError) as e:
+            if not _sdk_unsupported(e):
+                raise
+            print(f"exa-py can't run this search, falling back to REST: {str(e)}")
+    return _search_with_rest(query, api_key, num_results, max_characters, use_autoprompt)
+
+
+def _sdk_unsupported(error):
+    """Whether exa-py failed for lack of support rather than because the request failed
+
+    A missing method, a signature or result type it doesn't know, or an option
+    its validation rejects (before anything is sent). Failed requests, bad keys
+    and timeouts propagate instead of being sent again over REST.
+    """
+    if isinstance(error, (AttributeError, TypeError)):
+        return True
+    return isinstance(error, ValueError) and str(error).startswith(("Invalid option", "Invalid type for option"))
+
+
+# Contents for pages missing from the page cache are fetched in batches of this many URLs,
+# with at most EXA_CONTENTS_CONCURRENCY batches in flight (async search only)
+EXA_CONTENTS_BATCH_SIZE = int(os.environ.get("EXA_CONTENTS_BATCH_SIZE", 10))
+EXA_CONTENTS_CONCURRENCY = int(os.environ.get("EXA_CONTENTS_CONCURRENCY", 4))
+
+
+async def _async_post(client, url, api_key, payload):
+    async with upstream_governor.async_slot("exa") as call:
+        response = await client.post(
+            url,
+            headers={"x-api-key": api_key, "Content-Type": "application/json"},
+            json=payload,
+            timeout=call.timeout(EXA_TIMEOUT)
+        )
+        call.observe(response)
+    if response.status_code != 200:
+        raise RuntimeError(f"Exa API returned {response.status_code}: {response.text[:500]}")
+    return response.json().get('results', [])
+
+
+async def async_fetch_contents(client, urls, api_key, max_characters=EXA_TEXT_MAX_CHARACTERS):
+    """fetch_contents over an httpx.AsyncClient, batches fetched concurrently"""
+    if not urls:
+        return []
+    semaphore = asyncio.Semaphore(EXA_CONTENTS_CONCURRENCY)
+
+    async def fetch_batch(batch):
+        async with semaphore:
+            try:
+                return await _async_post(client, EXA_CONTENTS_URL, api_key, {
+                    "ids": batch,
+                    "text": {"maxCharacters": max_characters},
+                    "highlights": {"numSentences": EXA_HIGHLIGHT_SENTENCES, "highlightsPerUrl": EXA_HIGHLIGHTS_PER_URL}
+                })
+            except Exception as e:
+                print(f"Error fetching contents for {len(batch)} pages: {str(e)}")
+                return []
+
+    batches = [urls[i:i + EXA_CONTENTS_BATCH_SIZE] for i in range(0, len(urls), EXA_CONTENTS_BATCH_SIZE)]
+    results = []
+    for batch_results in await asyncio.gather(*(fetch_batch(batch) for batch in batches)):
+        results.extend(
+            _format_result(result.get('title'), result.get('url') or result.get('id'), result.get('text'), result.get('highlights'))
+            for result in batch_results
+        )
+    return results
+
+
+async def async_search_with_contents(client, query, api_key, num_results=EXA_NUM_RESULTS,
+                                     max_characters=EXA_TEXT_MAX_CHARACTERS, use_autoprompt=True):
+    """search_with_contents for async callers, over a shared httpx.AsyncClient
+
+    Uses the REST API directly (exa-py is synchronous). With the page cache
+    enabled, cache lookups and writes run in a worker thread and only the
+    uncached pages are fetched. Falls back to the last results for the
+    query like search_with_contents does.
+    """
+    key = (query, num_results, max_characters)
+    try:
+        results = await _async_search(client, query, api_key, num_results, max_characters, use_autoprompt)
+    except UPSTREAM_UNAVAILABLE as e:
+        return _stale_results(key, e)
+    _remember_results(key, results)
+    return results
+
+
+async def _async_search(client, query, api_key, num_results, max_characters, use_autoprompt):
+    if not page_cache.enabled:
+        results = await _async_post(client, EXA_SEARCH_URL, api_key, {
+            "query": query,
+            "numResults": num_results,
+            "useAutoprompt": use_autoprompt,
+            "contents": {
+                "text": {"maxCharacters": max_characters},
+                "highlights": {"numSentences": EXA_HIGHLIGHT_SENTENCES, "highlightsPerUrl": EXA_HIGHLIGHTS_PER_URL}
+            }
+        })
+        return [
+            _format_result(result.get('title'), result.get('url'), result.get('text'), result.get('highlights'))
+            for result in results
+        ]
+
+    hits = [
+        {"title": result.get('title') or "", "url": result.get('url') or ""}
+        for result in await _async_post(client, EXA_SEARCH_URL, api_key, {
+            "query": query, "numResults": num_results, "useAutoprompt": use_autoprompt
+        })
+    ]
+
+    def lookup():
+        return {hit['url']: page_cache.get(hit['url'], max_characters) for hit in hits if hit['url']}
+
+    cached = {url: entry for url, entry in (await asyncio.to_thread(lookup)).items() if entry}
+    missing = list(dict.fromkeys(hit['url'] for hit in hits if hit['url'] and hit['url'] not in cached))
+
+    fetched = {canonical_url(result['url']): result for result in await async_fetch_contents(client, missing, api_key, max_characters)}
+
+    def store():
+        for result in fetched.values():
+            page_cache.put(result['url'], result['text'], result['title'], result['snippet'], max_characters=max_characters)
+
+    if fetched:
+        await asyncio.to_thread(store)
+
+    print(f"Page cache: {len(cached)} of {len(hits)} pages reused, {len(fetched)} fetched")
+
+    results = []
+    for hit in hits:
+        entry = cached.get(hit['url']) or fetched.get(canonical_url(hit['url'])) or {}
+        results.append({
+            "title": hit['title'] or entry.get('title', ""),
+            "url": hit['url'],
+            "text": entry.get('text') or entry.get('snippet', ""),
+            "snippet": entry.get('snippet', "")
+        })
+    return results
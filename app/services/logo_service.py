@@ -0,0 +1,363 @@
+import os
+import re
+import io
+import hmac
+import json
+import time
+import hashlib
+import secrets
+import tempfile
+import threading
+from urllib.parse import urlparse, parse_qs, quote
+
+import requests
+
+try:
+    from PIL import Image as PILImage
+except ImportError:
+    PILImage = None
+
+# logo.dev publishable token, overridable per deployment
+LOGO_DEV_TOKEN = os.environ.get("LOGO_DEV_TOKEN", "pk_TCK5i8rzR92YmS65BY2fgQ")
+
+# Where fetched logos live on disk. Blobs are content addressed so two
+# domains that resolve to the same image share a file.
+LOGO_CACHE_DIR = os.environ.get(
+    "LOGO_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), ".cache", "logos")
+)
+
+# Local route the UI and PDFs load logos from
+LOGO_ROUTE_PREFIX = "/api/logos"
+
+# Key signing the local logo URLs, so the route only fetches logos for domains
+# this app handed out. Every instance of a deployment needs the same key; by
+# default it is derived from a server secret they already share.
+LOGO_URL_SECRET = (
+    os.environ.get("LOGO_URL_SECRET")
+    or os.environ.get("SUPABASE_SERVICE_KEY")
+    or os.environ.get("OPENAI_API_KEY")
+)
+
+# Widths we are willing to resize to; anything else snaps to the nearest one
+LOGO_SIZES = (32, 64, 128, 256)
+
+# How long to wait before retrying a domain logo.dev had nothing for
+MISSING_RETRY_SECONDS = int(os.environ.get("LOGO_MISSING_RETRY_SECONDS", 24 * 60 * 60))
+
+DEFAULT_LOGO_DOMAIN = "default.com"
+
+_DOMAIN_RE = re.compile(r'^[a-z0-9][a-z0-9.-]{0,252}$')
+_EXTENSIONS = {
+    "image/png": ".png",
+    "image/jpeg": ".jpg",
+    "image/gif": ".gif",
+    "image/webp": ".webp",
+    "image/svg+xml": ".svg",
+}
+
+# One lock per source so concurrent requests for the same logo fetch it once
+_fetch_locks = {}
+_fetch_locks_guard = threading.Lock()
+
+_session = requests.Session()
+
+if LOGO_URL_SECRET:
+    _signing_key = hashlib.sha256(f"logo-url:{LOGO_URL_SECRET}".encode('utf-8')).digest()
+else:
+    print("LOGO_URL_SECRET is not set, signing logo URLs with a per-process key")
+    _signing_key = secrets.token_bytes(32)
+
+
+def _lock_for(key):
+    with _fetch_locks_guard:
+        lock = _fetch_locks.get(key)
+        if lock is None:
+            lock = _fetch_locks[key] = threading.Lock()
+        return lock
+
+
+def _write_atomic(path, data):
+    """Write a file so concurrent readers never see a partial image"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+_cache_dir = None
+
+
+def _cache_root():
+    """LOGO_CACHE_DIR, or a temp directory when it can't be written (read-only serverless filesystems)"""
+    global _cache_dir
+    if _cache_dir is None:
+        try:
+            os.makedirs(LOGO_CACHE_DIR, exist_ok=True)
+            writable = os.access(LOGO_CACHE_DIR, os.W_OK)
+        except OSError:
+            writable = False
+        _cache_dir = LOGO_CACHE_DIR if writable else os.path.join(tempfile.gettempdir(), "logos")
+        if not writable:
+            print(f"Logo cache {LOGO_CACHE_DIR} is not writable, caching logos in {_cache_dir}")
+    return _cache_dir
+
+
+def _blob_path(digest, suffix):
+    return os.path.join(_cache_root(), "blobs", digest[:2], f"{digest}{suffix}")
+
+
+def _pointer_path(key):
+    # Keys can be domains or arbitrary URLs, so hash them for the filename
+    name = hashlib.sha256(key.encode('utf-8')).hexdigest()
+    return os.path.join(_cache_root(), "sources", name[:2], f"{name}.json")
+
+
+def _read_pointer(key):
+    try:
+        with open(_pointer_path(key), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def is_valid_domain(domain):
+    return bool(domain) and bool(_DOMAIN_RE.match(domain)) and '..' not in domain
+
+
+def resolve_logo_domain(company_name, website=None):
+    """Pick the domain to look a logo up by
+
+    Args:
+        company_name (str): Company name, used when there is no website
+        website (str): Website from enrichment data, if any
+
+    Returns:
+        str: Bare domain such as ``nike.com``
+    """
+    if website and isinstance(website, str):
+        candidate = website.strip().lower()
+        if '://' not in candidate:
+            candidate = f"http://{candidate}"
+        host = (urlparse(candidate).hostname or "").strip('.')
+        if host.startswith('www.'):
+            host = host[4:]
+        if is_valid_domain(host) and '.' in host:
+            return host
+
+    # Same heuristic generate_logo has always used
+    domain_name = re.sub(r'[^a-zA-Z0-9]', '', (company_name or "").lower())
+    if not domain_name:
+        return DEFAULT_LOGO_DOMAIN
+    if not domain_name.endswith('.com'):
+        domain_name = f"{domain_name}.com"
+    return domain_name
+
+
+def logo_signature(domain):
+    return hmac.new(_signing_key, domain.encode('utf-8'), hashlib.sha256).hexdigest()[:32]
+
+
+def is_signed(domain, signature):
+    """Whether a local logo URL for this domain was handed out by us"""
+    return bool(signature) and hmac.compare_digest(logo_signature((domain or "").lower()), signature)
+
+
+def _local_url(domain, size=None):
+    url = f"{LOGO_ROUTE_PREFIX}/{quote(domain)}?sig={logo_signature(domain)}"
+    if size:
+        url += f"&size={_snap_size(size)}"
+    return url
+
+
+def get_logo_url(company_name, website=None, size=None):
+    """Signed local URL for a company's logo
+
+    Building the URL is free; the image is only fetched the first time
+    someone actually loads it.
+    """
+    return _local_url(resolve_logo_domain(company_name, website), size)
+
+
+def get_source_logo_url(company_name, website=None):
+    """Absolute logo.dev URL for a company's logo, the form stored in the database
+
+    Other apps read the same rows and have no logo route; cached_logo_url()
+    turns it into a local URL when this app responds.
+    """
+    return _logo_dev_url(resolve_logo_domain(company_name, website))
+
+
+def cached_logo_url(logo_url, size=None):
+    """The signed local URL for a stored logo.dev or local logo URL; other URLs unchanged"""
+    if not logo_url or not isinstance(logo_url, str):
+        return logo_url
+    parsed = urlparse(logo_url)
+    if parsed.hostname == 'img.logo.dev':
+        domain = parsed.path.strip('/')
+    elif parsed.path.startswith(f"{LOGO_ROUTE_PREFIX}/") and not parsed.netloc:
+        # Rows saved while the local URL was stored
+        domain = parsed.path[len(LOGO_ROUTE_PREFIX) + 1:]
+        size = size or parse_qs(parsed.query).get('size', [None])[0]
+    else:
+        return logo_url
+    domain = domain.lower()
+    return _local_url(domain, size) if is_valid_domain(domain) else logo_url
+
+
+def _snap_size(size):
+    try:
+        size = int(size)
+    except (TypeError, ValueError):
+        return None
+    return min(LOGO_SIZES, key=lambda s: abs(s - size))
+
+
+def _logo_dev_url(domain):
+    return f"https://img.logo.dev/{domain}?token={LOGO_DEV_TOKEN}&retina=true"
+
+
+def _fetch_source(key, source_url):
+    """Return the cache pointer for a source, fetching it if needed
+
+    The pointer records the content digest, or that the source had no
+    image so we do not hammer the upstream for it on every request.
+    """
+    pointer = _read_pointer(key)
+    if pointer and pointer.get('digest') and os.path.exists(_blob_path(pointer['digest'], pointer['ext'])):
+        return pointer
+    if pointer and pointer.get('missing') and time.time() - pointer.get('fetched_at', 0) < MISSING_RETRY_SECONDS:
+        return pointer
+
+    with _lock_for(key):
+        # Another thread may have finished the fetch while we waited
+        pointer = _read_pointer(key)
+        if pointer and pointer.get('digest') and os.path.exists(_blob_path(pointer['digest'], pointer['ext'])):
+            return pointer
+
+        pointer = {'missing': True, 'fetched_at': time.time()}
+        try:
+            response = _session.get(source_url, timeout=5)
+            content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+            if response.status_code == 200 and response.content and content_type.startswith('image/'):
+                digest = hashlib.sha256(response.content).hexdigest()
+                ext = _EXTENSIONS.get(content_type, '')
+                pointer = {
+                    'digest': digest,
+                    'ext': ext,
+                    'content_type': content_type,
+                    'fetched_at': time.time()
+                }
+                blob = _blob_path(digest, ext)
+                if not os.path.exists(blob):
+                    try:
+                        _write_atomic(blob, response.content)
+                    except OSError as e:
+                        # Serve the download from memory; the next request fetches it again
+                        print(f"Error caching logo for {key}, serving it uncached: {str(e)}")
+                        return dict(pointer, content=response.content)
+            else:
+                print(f"Logo fetch for {key} returned {response.status_code} ({content_type or 'no content type'})")
+        except Exception as e:
+            print(f"Error fetching logo for {key}: {str(e)}")
+
+        try:
+            _write_atomic(_pointer_path(key), json.dumps(pointer).encode('utf-8'))
+        except OSError as e:
+            print(f"Error writing logo cache entry for {key}: {str(e)}")
+        return pointer
+
+
+def _load_variant(pointer, size):
+    """Read the original blob, or a resized PNG copy when Pillow is available
+
+    A logo that could not be written to disk is served from memory, unresized.
+    """
+    digest, ext = pointer['digest'], pointer['ext']
+    if 'content' in pointer:
+        return pointer['content'], pointer['content_type'], digest[:32]
+    original = _blob_path(digest, ext)
+
+    if size and PILImage is not None and ext != '.svg':
+        variant = _blob_path(digest, f"_{size}.png")
+        if not os.path.exists(variant):
+            try:
+                with PILImage.open(original) as img:
+                    img.thumbnail((size, size))
+                    buffer = io.BytesIO()
+                    img.save(buffer, format='PNG', optimize=True)
+                _write_atomic(variant, buffer.getvalue())
+            except Exception as e:
+                print(f"Error resizing logo {digest[:12]} to {size}px: {str(e)}")
+                variant = None
+        if variant:
+            with open(variant, 'rb') as f:
+                return f.read(), 'image/png', f"{digest[:32]}-{size}"
+
+    with open(original, 'rb') as f:
+        return f.read(), pointer.get('content_type', 'application/octet-stream'), digest[:32]
+
+
+def get_logo(domain, size=None):
+    """Return a cached logo for a domain, fetching it from logo.dev once
+
+    Args:
+        domain (str): Domain produced by resolve_logo_domain
+        size (int): Optional width to resize to
+
+    Returns:
+        tuple: (bytes, content_type, etag, is_fallback) or None
+    """
+    domain = (domain or "").lower()
+    if not is_valid_domain(domain):
+        return None
+    size = _snap_size(size) if size else None
+
+    pointer = _fetch_source(domain, _logo_dev_url(domain))
+    is_fallback = False
+    if not pointer.get('digest') and domain != DEFAULT_LOGO_DOMAIN:
+        pointer = _fetch_source(DEFAULT_LOGO_DOMAIN, _logo_dev_url(DEFAULT_LOGO_DOMAIN))
+        is_fallback = True
+    if not pointer.get('digest'):
+        return None
+
+    try:
+        data, content_type, etag = _load_variant(pointer, size)
+    except OSError as e:
+        print(f"Error reading cached logo for {domain}: {str(e)}")
+        return None
+    return data, content_type, etag, is_fallback
+
+
+def load_logo_bytes(logo_url, size=None):
+    """Resolve any logo URL we have stored to image bytes via the cache
+
+    Handles our own /api/logos URLs, legacy img.logo.dev URLs saved on
+    older rows, and arbitrary image URLs (e.g. LinkedIn logos).
+    """
+    if not logo_url or not isinstance(logo_url, str):
+        return None
+
+    parsed = urlparse(logo_url)
+    domain = None
+    if parsed.path.startswith(f"{LOGO_ROUTE_PREFIX}/") and (not parsed.netloc or parsed.hostname in ('localhost', '127.0.0.1')):
+        domain = parsed.path[len(LOGO_ROUTE_PREFIX) + 1:]
+        size = size or parse_qs(parsed.query).get('size', [None])[0]
+    elif parsed.hostname == 'img.logo.dev':
+        domain = parsed.path.strip('/')
+
+    if domain is not None:
+        logo = get_logo(domain, size)
+        return logo[0] if logo else None
+
+    if parsed.scheme not in ('http', 'https'):
+        return None
+    pointer = _fetch_source(logo_url, logo_url)
+    if not pointer.get('digest'):
+        return None
+    try:
+        return _load_variant(pointer, _snap_size(size) if size else None)[0]
+    except OSError as e:
+        print(f"Error reading cached logo for {logo_url}: {str(e)}")
+        return None
@@ -0,0 +1,54 @@
+import os
+import threading
+
+# "full" sends every candidate straight to the full model. "cascade" triages every
+# candidate with a cheap model first and gives only promising ones the full analysis;
+# it is opt-in because the cheap model's rough score decides who is never analyzed
+ANALYSIS_MODE = os.environ.get("ANALYSIS_MODE", "full").lower()
+
+TRIAGE_MODEL = os.environ.get("ANALYSIS_TRIAGE_MODEL", "gpt-4o-mini")
+FULL_MODEL = os.environ.get("ANALYSIS_FULL_MODEL", "gpt-4o")
+
+# Candidates whose rough triage score (0-10) is below this skip the full analysis
+TRIAGE_THRESHOLD = float(os.environ.get("ANALYSIS_TRIAGE_THRESHOLD", 4))
+
+# Triage answers are short, so batches can be much larger than full-analysis chunks
+TRIAGE_MAX_CHUNK_SIZE = int(os.environ.get("ANALYSIS_TRIAGE_MAX_CHUNK_SIZE", 40))
+TRIAGE_OUTPUT_TOKENS_PER_COMPANY = int(os.environ.get("ANALYSIS_TRIAGE_OUTPUT_TOKENS_PER_COMPANY", 60))
+
+
+class TierMetrics:
+    """Calls, companies, tokens and latency per analysis tier, for one analysis run"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tiers = {}
+
+    def record(self, tier, companies, seconds, usage=None, prompt_tokens=0, completion_tokens=0):
+        """Add one call; token counts come from the response usage, or are passed in when estimated"""
+        if usage is not None:
+            prompt_tokens = getattr(usage, 'prompt_tokens', 0) or 0
+            completion_tokens = getattr(usage, 'completion_tokens', 0) or 0
+        with self._lock:
+            stats = self._tiers.setdefault(tier, {
+                "calls": 0, "companies": 0, "prompt_tokens": 0, "completion_tokens": 0, "seconds": 0.0
+            })
+            stats["calls"] += 1
+            stats["companies"] += companies
+            stats["seconds"] += seconds
+            stats["prompt_tokens"] += prompt_tokens
+            stats["completion_tokens"] += completion_tokens
+
+    def snapshot(self):
+        with self._lock:
+            return {tier: dict(stats) for tier, stats in self._tiers.items()}
+
+    def summary(self):
+        """Per-tier totals with average seconds per call"""
+        result = {}
+        for tier, stats in self.snapshot().items():
+            if stats["calls"]:
+                stats["seconds"] = round(stats["seconds"], 2)
+                stats["avg_seconds"] = round(stats["seconds"] / stats["calls"], 2)
+                result[tier] = stats
+        return result
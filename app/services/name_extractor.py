@@ -0,0 +1,204 @@
+import os
+import re
+from collections import defaultdict
+from urllib.parse import urlparse
+
+# "auto" (local first, GPT when unsure), "local" (never GPT) or "gpt" (always GPT)
+NAME_EXTRACTION_MODE = os.environ.get("NAME_EXTRACTION_MODE", "auto").lower()
+
+# Token budget for the search context sent along when GPT verifies local candidates
+VERIFY_CONTEXT_BUDGET = int(os.environ.get("NAME_EXTRACTION_VERIFY_CONTEXT_BUDGET", 6000))
+
+# Below this many confident names, or this average confidence, GPT verifies the list
+MIN_LOCAL_COMPANIES = int(os.environ.get("NAME_EXTRACTION_MIN_COMPANIES", 15))
+MIN_LOCAL_CONFIDENCE = float(os.environ.get("NAME_EXTRACTION_MIN_CONFIDENCE", 0.6))
+
+# Candidates scoring at least this are treated as companies
+ACCEPT_SCORE = float(os.environ.get("NAME_EXTRACTION_ACCEPT_SCORE", 0.5))
+
+MAX_NGRAM = 4
+
+LEGAL_SUFFIXES = {
+    "inc", "inc.", "incorporated", "corp", "corp.", "corporation", "llc", "l.l.c.", "ltd", "ltd.", "limited",
+    "co", "co.", "plc", "gmbh", "ag", "s.a.", "sa", "n.v.", "nv", "b.v.", "bv", "pty", "ulc", "lp", "llp", "oy", "ab",
+    # Not legal forms, but "Genius Sports Group" and "Genius Sports" are the same company
+    "group", "holdings"
+}
+
+# Not legal forms, but words that very often end a company name
+COMPANY_WORDS = {
+    "technologies", "technology", "labs", "systems", "solutions", "software", "media", "entertainment",
+    "brands", "foods", "studios", "networks", "analytics", "partners", "ventures",
+    "sports", "games", "digital", "interactive", "capital", "financial", "bank", "airlines", "motors",
+    "pharmaceuticals", "health", "energy", "beverages", "brewing", "apparel", "ai", "io"
+}
+
+# Capitalized phrases that show up all over web pages but are never companies
+_NOT_COMPANIES = {
+    "read more", "learn more", "contact us", "privacy policy", "terms of service", "sign up", "log in",
+    "subscribe", "share", "home", "about", "about us", "blog", "news", "careers", "menu", "search",
+    "january", "february", "march", "april", "may", "june", "july", "august", "september", "october",
+    "november", "december", "monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday",
+    "ceo", "cto", "cfo", "coo", "usa", "us", "uk", "canada", "united states", "north america", "europe",
+    "asia", "toronto", "new york", "london", "california", "ontario", "covid", "covid-19", "ai", "api",
+    "faq", "faqs", "overview", "introduction", "conclusion", "summary", "table of contents", "list",
+    "founded", "headquarters", "website", "industry", "revenue", "employees", "key features", "pricing"
+}
+
+# Plural category words mean the phrase describes companies rather than naming one
+_CATEGORY_WORDS = {"companies", "company", "firms", "startups", "vendors", "providers", "leaders", "players", "tools", "platforms"}
+
+_LEADING_NOISE = {
+    "the", "top", "best", "leading", "our", "a", "an", "this", "these", "here", "why", "how", "what",
+    "with", "and", "in", "for", "from", "by", "at", "of", "on", "to", "is", "are", "as", "if", "when",
+    "while", "after", "before", "since", "like", "including", "both", "all", "each", "every", "many",
+    "some", "most", "other", "more", "new", "we", "you", "they", "it", "its", "their", "then", "also"
+}
+
+_TOKEN_RE = re.compile(r"[A-Za-z0-9][A-Za-z0-9&'\.\-]*|&")
+_LIST_LINE_RE = re.compile(r'^\s*(?:\d+[\.\)]|[-*•#]+)\s*')
+
+
+def normalize_name(name):
+    """Key for matching names: lowercase alphanumerics without legal suffixes"""
+    words = [w for w in re.split(r'[\s,]+', (name or "").lower()) if w]
+    while words and words[-1] in LEGAL_SUFFIXES:
+        words.pop()
+    return re.sub(r'[^a-z0-9]', '', "".join(words))
+
+
+def _strip_legal_suffix(words):
+    while words and words[-1].lower().rstrip(',') in LEGAL_SUFFIXES:
+        words = words[:-1]
+    return [w.rstrip(',') for w in words]
+
+
+def _is_capitalized(token):
+    return token[:1].isupper() or (token[:1].isdigit() and any(c.isalpha() for c in token))
+
+
+def _candidates_in_line(line):
+    """Yield (name, had_legal_suffix) for each maximal run of capitalized tokens"""
+    tokens = _TOKEN_RE.findall(line)
+    i = 0
+    while i < len(tokens):
+        if not _is_capitalized(tokens[i]):
+            i += 1
+            continue
+        run = [tokens[i]]
+        j = i + 1
+        while j < len(tokens) and len(run) < MAX_NGRAM + 1:
+            token = tokens[j]
+            if _is_capitalized(token) or token == "&" or token.lower().rstrip(',') in LEGAL_SUFFIXES:
+                run.append(token)
+                j += 1
+            else:
+                break
+        i = j
+
+        while run and run[0].lower() in _LEADING_NOISE:
+            run = run[1:]
+        while run and run[-1] == "&":
+            run = run[:-1]
+        if not run:
+            continue
+        had_suffix = run[-1].lower().rstrip(',') in LEGAL_SUFFIXES
+        words = _strip_legal_suffix(run)[:MAX_NGRAM]
+        if words:
+            yield " ".join(words).rstrip('.'), had_suffix
+
+
+def _domain_tokens(url):
+    host = (urlparse(url or "").hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    return normalize_name(host.split('.')[0]) if host else ""
+
+
+def extract_names_locally(search_results, industry="", gazetteer=None):
+    """Pull company names out of search results without calling a model
+
+    Candidates are capitalized n-grams; evidence comes from legal suffixes
+    ("Inc", "Ltd"...), company-like final words ("Technologies", "Labs"),
+    a gazetteer of names we already know, list-item positions, matching
+    result domains and how many pages mention the name.
+
+    Args:
+        search_results (list): Dicts with title, url, text, snippet
+        industry (str): Industry query; its own words are not company names
+        gazetteer (iterable): Known company names
+
+    Returns:
+        dict: companies (accepted names, best first), candidates
+        ((name, score) pairs), confidence (0-1) and needs_verification
+    """
+    known = {normalize_name(name): name for name in (gazetteer or []) if name}
+    industry_key = normalize_name(industry)
+    industry_words = {w.lower() for w in re.findall(r'[A-Za-z]+', industry or "")}
+    domains = {_domain_tokens(r.get('url')) for r in search_results}
+
+    evidence = defaultdict(lambda: {
+        "pages": set(), "mentions": 0, "suffix": False, "list": False, "title": False, "forms": defaultdict(int)
+    })
+    for page_index, result in enumerate(search_results):
+        lines = [(result.get('title') or "", True)]
+        lines += [(line, False) for line in re.split(r'[\n\r]+', result.get('text') or result.get('snippet') or "")]
+        for line, is_title in lines:
+            # The first name on a numbered or bulleted line is usually the list item itself
+            list_head = bool(_LIST_LINE_RE.match(line))
+            for sentence in re.split(r'(?<=[\.\!\?:;])\s+|\s+[\|–—-]\s+|,\s+', line):
+                for name, had_suffix in _candidates_in_line(sentence):
+                    key = normalize_name(name)
+                    if not key or len(key) < 2 or name.lower() in _NOT_COMPANIES or key == industry_key:
+                        continue
+                    lowered = [w.lower() for w in name.split()]
+                    if any(w in _CATEGORY_WORDS for w in lowered):
+                        continue
+                    if all(w in industry_words or w in COMPANY_WORDS for w in lowered):
+                        continue
+                    item = evidence[key]
+                    item["pages"].add(page_index)
+                    item["mentions"] += 1
+                    item["suffix"] |= had_suffix
+                    item["list"] |= list_head
+                    item["title"] |= is_title
+                    item["forms"][name] += 1
+                    list_head = False
+
+    scored = []
+    for key, item in evidence.items():
+        name = known.get(key) or max(item["forms"].items(), key=lambda f: (f[1], len(f[0])))[0]
+        words = name.split()
+        score = 0.0
+        if key in known:
+            score += 0.6
+        if item["suffix"]:
+            score += 0.5
+        if words[-1].lower() in COMPANY_WORDS and len(words) > 1:
+            score += 0.5
+        if key in domains:
+            score += 0.4
+        if item["list"]:
+            score += 0.5
+        if item["title"]:
+            score += 0.1
+        score += min(0.45, 0.15 * (len(item["pages"]) - 1))
+        if item["mentions"] >= 3:
+            score += 0.1
+        # Single generic-looking words need more than one weak signal
+        if len(words) == 1 and key not in known and not item["suffix"] and key not in domains:
+            score -= 0.2
+        scored.append((name, round(min(score, 1.5), 3)))
+
+    scored.sort(key=lambda s: s[1], reverse=True)
+    accepted = [name for name, score in scored if score >= ACCEPT_SCORE]
+    confidence = (
+        sum(min(score, 1.0) for _, score in scored if score >= ACCEPT_SCORE) / len(accepted)
+        if accepted else 0.0
+    )
+    return {
+        "companies": accepted,
+        "candidates": scored,
+        "confidence": round(confidence, 3),
+        "needs_verification": len(accepted) < MIN_LOCAL_COMPANIES or confidence < MIN_LOCAL_CONFIDENCE
+    }
@@ -0,0 +1,103 @@
+# Canonical OpenAI client setup; fastapi_app/app/openai_provider.py is a trimmed fork of it, keep fixes in step
+
+import os
+import atexit
+import threading
+
+import httpx
+
+from app.services.deadline import timeout_for
+from app.services.upstream_governor import upstream_governor
+
+try:
+    import h2  # noqa: F401  (httpx needs it for HTTP/2)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+OPENAI_TIMEOUT = float(os.environ.get("OPENAI_TIMEOUT", 60))
+OPENAI_CONNECT_TIMEOUT = float(os.environ.get("OPENAI_CONNECT_TIMEOUT", 10))
+
+# Connection pool shared by every request in the process. Idle connections are kept
+# long enough to span the gaps between the calls of one search.
+OPENAI_MAX_CONNECTIONS = int(os.environ.get("OPENAI_MAX_CONNECTIONS", 100))
+OPENAI_MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get("OPENAI_MAX_KEEPALIVE_CONNECTIONS", 20))
+OPENAI_KEEPALIVE_EXPIRY = float(os.environ.get("OPENAI_KEEPALIVE_EXPIRY", 120))
+
+# HTTP/2 multiplexes concurrent calls over one connection; only used when h2 is installed
+OPENAI_HTTP2 = os.environ.get("OPENAI_HTTP2", "true").lower() != "false" and HTTP2_AVAILABLE
+
+# Retries for connection errors, 408, 409, 429 and 5xx, with the SDK's exponential backoff
+# (honouring Retry-After).
+OPENAI_MAX_RETRIES = int(os.environ.get("OPENAI_MAX_RETRIES", 3))
+
+
+def _clamp_timeouts(request):
+    """Shorten the request's connect/read/write/pool timeouts to what is left of the request deadline"""
+    timeouts = request.extensions.get("timeout") or {}
+    request.extensions["timeout"] = {
+        key: timeout_for(timeouts.get(key)) for key in ("connect", "read", "write", "pool")
+    }
+
+
+class _GovernedTransport(httpx.HTTPTransport):
+    """Every request (SDK retries included) takes an "openai" slot from the upstream governor
+
+    The slot is held until the response headers arrive; streamed bodies are read after it is freed.
+    Requests are refused while the circuit is open and never outlast the request deadline.
+    """
+
+    def handle_request(self, request):
+        with upstream_governor.slot("openai") as call:
+            _clamp_timeouts(request)
+            return call.observe(super().handle_request(request))
+
+
+_clients = {}
+_lock = threading.Lock()
+
+
+def _limits():
+    return httpx.Limits(
+        max_connections=OPENAI_MAX_CONNECTIONS,
+        max_keepalive_connections=OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=OPENAI_KEEPALIVE_EXPIRY
+    )
+
+
+def _timeout():
+    return httpx.Timeout(OPENAI_TIMEOUT, connect=OPENAI_CONNECT_TIMEOUT)
+
+
+def get_openai_client(api_key=None):
+    """The process-wide OpenAI client for an API key (OPENAI_API_KEY by default)
+
+    Returns None when no key is configured, so callers keep their existing
+    "client not available" handling.
+    """
+    api_key = api_key or os.environ.get("OPENAI_API_KEY")
+    if not api_key:
+        return None
+    with _lock:
+        client = _clients.get(api_key)
+        if client is None:
+            # The SDK is imported with the first client; it is the slowest import in the app
+            from openai import OpenAI
+            client = _clients[api_key] = OpenAI(
+                api_key=api_key,
+                max_retries=OPENAI_MAX_RETRIES,
+                timeout=_timeout(),
+                http_client=httpx.Client(
+                    timeout=_timeout(),
+                    transport=_GovernedTransport(limits=_limits(), http2=OPENAI_HTTP2)
+                )
+            )
+        return client
+
+
+@atexit.register
+def close_clients():
+    with _lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
@@ -0,0 +1,188 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# Extracted page text shared across searches. Overlapping industry queries
+# keep landing on the same listicles, so their text is fetched once.
+PAGE_CACHE_DIR = os.environ.get(
+    "PAGE_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), ".cache", "pages")
+)
+
+# How long page text stays fresh
+PAGE_CACHE_TTL_SECONDS = int(os.environ.get("PAGE_CACHE_TTL_SECONDS", 7 * 24 * 60 * 60))
+
+# Disk budget; least recently used pages are evicted past this. Off (0) by default: with the
+# cache on, every search is a URL-only search plus a contents request for uncached pages
+# instead of one search_and_contents call, which only pays off when queries overlap a lot.
+# Try e.g. 209715200 (200MB).
+PAGE_CACHE_MAX_BYTES = int(os.environ.get("PAGE_CACHE_MAX_BYTES", 0))
+
+# Query parameters that never change page content
+_TRACKING_PARAMS = {"fbclid", "gclid", "mc_cid", "mc_eid", "ref", "ref_src", "igshid", "_hsenc", "_hsmi"}
+
+
+def canonical_url(url):
+    """Normalize a URL so trivially different links share a cache entry
+
+    Lowercases scheme and host, drops www., default ports, fragments,
+    tracking parameters and trailing slashes, and sorts the query.
+    """
+    if not url:
+        return ""
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url.strip()
+
+    scheme = (parts.scheme or "https").lower()
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    port = parts.port
+    if port and not ((scheme == "http" and port == 80) or (scheme == "https" and port == 443)):
+        host = f"{host}:{port}"
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in _TRACKING_PARAMS
+    )
+    path = parts.path.rstrip("/") or "/"
+    # http and https versions of a page are the same document
+    return urlunsplit(("https" if scheme in ("http", "https") else scheme, host, path, urlencode(query), ""))
+
+
+class PageCache:
+    """Size-bounded on-disk store of extracted page text keyed by canonical URL
+
+    Each page is one small JSON file. Reads bump the file's mtime, so
+    eviction by oldest mtime gives least-recently-used behaviour without a
+    separate index that several workers would have to agree on.
+    """
+
+    def __init__(self, directory=PAGE_CACHE_DIR, ttl_seconds=PAGE_CACHE_TTL_SECONDS, max_bytes=PAGE_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size = None
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    def _path(self, canonical):
+        digest = hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, digest[:2], f"{digest}.json")
+
+    def get(self, url, max_characters=None):
+        """Return the cached entry for a URL, or None if missing, stale or too short"""
+        if not self.enabled or not url:
+            return None
+        canonical = canonical_url(url)
+        path = self._path(canonical)
+        try:
+            with open(path, 'r') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        if time.time() - entry.get('fetched_at', 0) > self.ttl_seconds:
+            self.misses += 1
+            return None
+        # Text cached under a smaller cap than requested may be truncated
+        if max_characters and (entry.get('max_characters') or 0) < max_characters:
+            self.misses += 1
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        if max_characters and entry.get('text'):
+            entry['text'] = entry['text'][:max_characters]
+        return entry
+
+    def put(self, url, text, title="", snippet="", max_characters=None):
+        """Store extracted text for a URL"""
+        if not self.enabled or not url:
+            return
+        canonical = canonical_url(url)
+        entry = {
+            "url": url,
+            "canonical_url": canonical,
+            "title": title or "",
+            "text": text or "",
+            "snippet": snippet or "",
+            "fetched_at": time.time(),
+            "max_characters": max_characters
+        }
+        data = json.dumps(entry).encode('utf-8')
+        path = self._path(canonical)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            try:
+                previous = os.path.getsize(path)
+            except OSError:
+                previous = 0
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Error writing page cache entry for {url}: {str(e)}")
+            return
+
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan_size()
+            else:
+                self._size += len(data) - previous
+            over_budget = self._size > self.max_bytes
+        if over_budget:
+            self.evict()
+
+    def _entries(self):
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith('.json'):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    yield path, stat.st_size, stat.st_mtime
+
+    def _scan_size(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self):
+        """Delete least recently used pages until the cache is under 90% of its budget"""
+        with self._lock:
+            entries = sorted(self._entries(), key=lambda e: e[2])
+            total = sum(size for _, size, _ in entries)
+            target = int(self.max_bytes * 0.9)
+            removed = 0
+            for path, size, _ in entries:
+                if total <= target:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                    removed += 1
+                except OSError:
+                    continue
+            self._size = total
+        if removed:
+            print(f"Page cache: evicted {removed} least recently used pages, {total} bytes remain")
+
+
+# Shared by all searches in the process
+page_cache = PageCache()
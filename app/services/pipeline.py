@@ -0,0 +1,294 @@
+# Canonical stage pipeline; fastapi_swagger/app/services/pipeline.py is a copy of it, keep fixes in step
+
+import os
+import time
+import asyncio
+import functools
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# Threads shared by every AsyncPipeline for stage functions that block (requests, OpenAI, Supabase)
+BLOCKING_WORKERS = int(os.environ.get("PIPELINE_BLOCKING_WORKERS", 32))
+
+_blocking_pool = None
+_blocking_pool_lock = threading.Lock()
+
+
+def _get_blocking_pool():
+    global _blocking_pool
+    with _blocking_pool_lock:
+        if _blocking_pool is None:
+            _blocking_pool = ThreadPoolExecutor(max_workers=BLOCKING_WORKERS, thread_name_prefix="pipeline-blocking")
+        return _blocking_pool
+
+
+async def run_blocking(func, *args, **kwargs):
+    """Await a blocking call on the shared thread pool instead of running it on the event loop"""
+    loop = asyncio.get_running_loop()
+    # Copy the context so the call sees the caller's request deadline
+    return await loop.run_in_executor(_get_blocking_pool(), functools.partial(contextvars.copy_context().run, func, *args, **kwargs))
+
+
+class StopPipeline(Exception):
+    """Raised by a stage to end a run early, e.g. when nothing is left to analyze
+
+    The outputs of the stages that finished are attached as .outputs.
+    """
+
+    def __init__(self, message="", result=None):
+        super().__init__(message)
+        self.result = result
+        self.outputs = {}
+
+
+class PipelineError(Exception):
+    """A stage raised; the original exception is kept as .error"""
+
+    def __init__(self, stage, error):
+        super().__init__(f"Stage '{stage}' failed: {error}")
+        self.stage = stage
+        self.error = error
+
+
+class Stage:
+    def __init__(self, name, func, inputs=(), each=None, concurrency=1, on_item=None):
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.each = each
+        self.concurrency = max(1, int(concurrency))
+        self.on_item = on_item
+
+
+class Pipeline:
+    """Small DAG runner for the search flow
+
+    Stages declare the names of the outputs they read. A stage starts as
+    soon as all of its inputs exist, so independent stages (the industry
+    overview and the company analysis) run at the same time. Stage functions get their inputs as keyword arguments.
+
+    A stage with each="<input>" is a map stage: func(item, **other_inputs)
+    runs for every element of that input list, at most `concurrency` at a
+    time, and the stage output is the list of results in input order.
+
+    With a checkpoint (anything with load() -> {stage: output} and
+    save(stage, output)), every finished stage and every finished item of a
+    map stage is saved as it completes. The next run loads them and only
+    runs what is missing. Map items are saved by position, which holds
+    because the list they come from is itself restored or recomputed.
+    """
+
+    def __init__(self, name, max_workers=4, checkpoint=None):
+        self.name = name
+        self.max_workers = max_workers
+        self.checkpoint = checkpoint
+        self.stages = {}
+        self.timings = {}
+        self.resumed = []
+
+    def add(self, name, func, inputs=(), each=None, concurrency=1, on_item=None):
+        """Declare a stage; returns the pipeline so declarations can be chained"""
+        if name in self.stages:
+            raise ValueError(f"Duplicate pipeline stage: {name}")
+        if each is not None and each not in inputs:
+            inputs = tuple(inputs) + (each,)
+        self.stages[name] = Stage(name, func, inputs, each, concurrency, on_item)
+        return self
+
+    def _save(self, name, value):
+        if self.checkpoint is not None:
+            self.checkpoint.save(name, value)
+
+    def _run_stage(self, stage, inputs, saved_items):
+        started = time.time()
+        try:
+            if stage.each is None:
+                return stage.func(**inputs)
+
+            items = list(inputs.pop(stage.each) or [])
+            results, todo = self._pending_items(items, saved_items)
+            if not todo:
+                return results
+            with ThreadPoolExecutor(max_workers=min(stage.concurrency, len(todo))) as executor:
+                futures = {
+                    executor.submit(contextvars.copy_context().run, stage.func, items[index], **inputs): index
+                    for index in todo
+                }
+                done_count = len(items) - len(todo)
+                for future in futures:
+                    index = futures[future]
+                    results[index] = future.result()
+                    self._save(f"{stage.name}[{index}]", results[index])
+                    done_count += 1
+                    if stage.on_item:
+                        stage.on_item(done_count, len(items), items[index], results[index])
+            return results
+        finally:
+            self.timings[stage.name] = round(time.time() - started, 3)
+
+    def _prepare(self, seeds):
+        """Check the declared inputs and load checkpoints; returns (outputs, pending stages, saved)"""
+        outputs = dict(seeds)
+        known = set(outputs) | set(self.stages)
+        for stage in self.stages.values():
+            missing = [name for name in stage.inputs if name not in known]
+            if missing:
+                raise ValueError(f"Stage '{stage.name}' reads unknown inputs: {', '.join(missing)}")
+
+        pending = dict(self.stages)
+        saved = self.checkpoint.load() if self.checkpoint is not None else {}
+        for name in list(pending):
+            if name in saved:
+                outputs[name] = saved[name]
+                del pending[name]
+                self.resumed.append(name)
+        if self.resumed:
+            print(f"Pipeline {self.name}: resuming after {', '.join(self.resumed)}")
+        return outputs, pending, saved
+
+    @staticmethod
+    def _saved_items(stage, saved):
+        if stage.each is None:
+            return {}
+        prefix = f"{stage.name}["
+        return {int(key[len(prefix):-1]): value for key, value in saved.items()
+                if key.startswith(prefix) and key.endswith("]")}
+
+    @staticmethod
+    def _pending_items(items, saved_items):
+        """Results list pre-filled from checkpoints, and the indexes still to run"""
+        results = [None] * len(items)
+        todo = []
+        for index in range(len(items)):
+            if index in saved_items:
+                results[index] = saved_items[index]
+            else:
+                todo.append(index)
+        return results, todo
+
+    def _finish(self, outputs, failure, started):
+        total = round(time.time() - started, 3)
+        print(f"Pipeline {self.name}: " + ", ".join(f"{name} {seconds}s" for name, seconds in self.timings.items())
+              + f" (total {total}s)")
+        self.timings["total"] = total
+
+        if failure is not None:
+            if isinstance(failure, StopPipeline):
+                failure.outputs = outputs
+            raise failure
+        return outputs
+
+    def run(self, **seeds):
+        """Run every stage and return all outputs (seeds included) by name"""
+        outputs, pending, saved = self._prepare(seeds)
+        running = {}
+        failure = None
+        started = time.time()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or running:
+                if failure is None:
+                    ready = [s for s in pending.values() if all(name in outputs for name in s.inputs)]
+                    for stage in ready:
+                        del pending[stage.name]
+                        inputs = {name: outputs[name] for name in stage.inputs}
+                        # Stages run in the caller's context, so they share its request deadline
+                        running[executor.submit(
+                            contextvars.copy_context().run, self._run_stage, stage, inputs, self._saved_items(stage, saved)
+                        )] = stage
+                if not running:
+                    if failure is None and pending:
+                        raise ValueError(f"Pipeline {self.name} has a dependency cycle: {', '.join(pending)}")
+                    break
+
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage = running.pop(future)
+                    try:
+                        outputs[stage.name] = future.result()
+                        self._save(stage.name, outputs[stage.name])
+                    except StopPipeline as stop:
+                        failure = failure or stop
+                    except Exception as e:
+                        failure = failure or PipelineError(stage.name, e)
+
+        return self._finish(outputs, failure, started)
+
+
+class AsyncPipeline(Pipeline):
+    """Pipeline for an event loop
+
+    Same declarations as Pipeline. Stages written as coroutines are awaited
+    on the loop; plain functions run on the shared blocking pool, so a
+    search never holds up the loop (or the status endpoint) while waiting
+    on a synchronous client. Map stages fan out with an asyncio.Semaphore
+    of `concurrency`. Checkpoint reads and writes also go to the pool.
+    """
+
+    async def _call(self, func, *args, **kwargs):
+        if asyncio.iscoroutinefunction(func):
+            return await func(*args, **kwargs)
+        return await run_blocking(func, *args, **kwargs)
+
+    async def _save_async(self, name, value):
+        if self.checkpoint is not None:
+            await run_blocking(self.checkpoint.save, name, value)
+
+    async def _run_stage_async(self, stage, inputs, saved_items):
+        started = time.time()
+        try:
+            if stage.each is None:
+                return await self._call(stage.func, **inputs)
+
+            items = list(inputs.pop(stage.each) or [])
+            results, todo = self._pending_items(items, saved_items)
+            semaphore = asyncio.Semaphore(stage.concurrency)
+            done_count = len(items) - len(todo)
+
+            async def run_item(index):
+                nonlocal done_count
+                async with semaphore:
+                    results[index] = await self._call(stage.func, items[index], **inputs)
+                await self._save_async(f"{stage.name}[{index}]", results[index])
+                done_count += 1
+                if stage.on_item:
+                    stage.on_item(done_count, len(items), items[index], results[index])
+
+            await asyncio.gather(*(run_item(index) for index in todo))
+            return results
+        finally:
+            self.timings[stage.name] = round(time.time() - started, 3)
+
+    async def run(self, **seeds):
+        """Run every stage and return all outputs (seeds included) by name"""
+        outputs, pending, saved = await run_blocking(self._prepare, seeds)
+        running = {}
+        failure = None
+        started = time.time()
+
+        while pending or running:
+            if failure is None:
+                ready = [s for s in pending.values() if all(name in outputs for name in s.inputs)]
+                for stage in ready:
+                    del pending[stage.name]
+                    inputs = {name: outputs[name] for name in stage.inputs}
+                    task = asyncio.ensure_future(self._run_stage_async(stage, inputs, self._saved_items(stage, saved)))
+                    running[task] = stage
+            if not running:
+                if failure is None and pending:
+                    raise ValueError(f"Pipeline {self.name} has a dependency cycle: {', '.join(pending)}")
+                break
+
+            done, _ = await asyncio.wait(list(running), return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                stage = running.pop(task)
+                try:
+                    outputs[stage.name] = task.result()
+                    await self._save_async(stage.name, outputs[stage.name])
+                except StopPipeline as stop:
+                    failure = failure or stop
+                except Exception as e:
+                    failure = failure or PipelineError(stage.name, e)
+
+        return self._finish(outputs, failure, started)
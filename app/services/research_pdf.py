@@ -0,0 +1,405 @@
+import io
+import os
+import atexit
+import threading
+from collections import deque
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from app.services.logo_service import load_logo_bytes
+
+
+def generate_research_pdf(company_name, research_data):
+    """Generate a PDF with company research data in a modern dark theme
+
+    Args:
+        company_name (str): The name of the company
+        research_data (dict): The research data to include in the PDF
+
+    Returns:
+        bytes: The PDF file as bytes
+    """
+    # ReportLab is only needed here, so it's imported on the first PDF rather than at startup
+    from reportlab.lib.pagesizes import letter
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle, PageBreak
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib import colors
+    from reportlab.lib.units import inch
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+
+    # Create a file-like buffer to receive PDF data
+    buffer = io.BytesIO()
+
+    # Set up the document with letter size page and 0.5 inch margins
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=letter,
+        rightMargin=0.5 * inch,
+        leftMargin=0.5 * inch,
+        topMargin=0.5 * inch,
+        bottomMargin=0.5 * inch
+    )
+
+    # Register a custom font for modern appearance
+    # Use default fonts if custom ones aren't available
+    try:
+        pdfmetrics.registerFont(TTFont('Roboto', 'Roboto-Regular.ttf'))
+        pdfmetrics.registerFont(TTFont('RobotoBold', 'Roboto-Bold.ttf'))
+        base_font = 'Roboto'
+        bold_font = 'RobotoBold'
+    except:
+        base_font = 'Helvetica'
+        bold_font = 'Helvetica-Bold'
+
+    # Create styles for dark theme
+    styles = getSampleStyleSheet()
+
+    # Create custom paragraph styles
+    title_style = ParagraphStyle(
+        'Title',
+        parent=styles['Title'],
+        fontName=bold_font,
+        fontSize=28,
+        leading=32,
+        textColor=colors.white,
+        alignment=1  # Center alignment
+    )
+
+    subtitle_style = ParagraphStyle(
+        'Subtitle',
+        parent=styles['Normal'],
+        fontName=base_font,
+        fontSize=14,
+        leading=18,
+        textColor=colors.Color(0.7, 0.7, 0.9),  # Light blue/purple
+        alignment=1  # Center alignment
+    )
+
+    heading1_style = ParagraphStyle(
+        'Heading1',
+        parent=styles['Heading1'],
+        fontName=bold_font,
+        fontSize=18,
+        leading=22,
+        textColor=colors.white,
+        spaceBefore=16,
+        spaceAfter=8
+    )
+
+    heading2_style = ParagraphStyle(
+        'Heading2',
+        parent=styles['Heading2'],
+        fontName=bold_font,
+        fontSize=14,
+        leading=18,
+        textColor=colors.Color(0.5, 0.7, 1.0),  # Light blue
+        spaceBefore=12,
+        spaceAfter=6
+    )
+
+    normal_style = ParagraphStyle(
+        'Normal',
+        parent=styles['Normal'],
+        fontName=base_font,
+        fontSize=10,
+        leading=14,
+        textColor=colors.Color(0.9, 0.9, 0.9)  # Almost white
+    )
+
+    bullet_style = ParagraphStyle(
+        'Bullet',
+        parent=normal_style,
+        leftIndent=20,
+        firstLineIndent=-20,
+    )
+
+    footer_style = ParagraphStyle(
+        'Footer',
+        parent=styles['Normal'],
+        fontName=base_font,
+        fontSize=8,
+        textColor=colors.Color(0.6, 0.6, 0.7),  # Muted purple
+        alignment=1  # Center alignment
+    )
+
+    # Create elements for the PDF
+    elements = []
+
+    # Add a title page
+    elements.append(Spacer(1, 2 * inch))  # Space at top of page
+    elements.append(Paragraph(company_name.upper(), title_style))
+    elements.append(Spacer(1, 0.25 * inch))
+    elements.append(Paragraph("Company Research Report", subtitle_style))
+    elements.append(Spacer(1, 2 * inch))
+
+    # Try to add company logo if available
+    logo_url = None
+    if research_data and 'data' in research_data:
+        data = research_data['data']
+        if isinstance(data, dict) and 'logo' in data and data['logo']:
+            logo_url = data['logo']
+
+        # Also check the LinkedIn data if available
+        if not logo_url and 'linkedin_data' in data and isinstance(data['linkedin_data'], dict):
+            linkedin = data['linkedin_data']
+            if 'logo' in linkedin and linkedin['logo']:
+                logo_url = linkedin['logo']
+
+    # Add logo if available
+    if logo_url:
+        try:
+            # Load the logo through the local cache so repeated exports don't refetch it
+            logo_bytes = load_logo_bytes(logo_url, size=256)
+            if logo_bytes:
+                logo_data = io.BytesIO(logo_bytes)
+                logo_img = Image(logo_data, width=2*inch, height=2*inch)
+                logo_img.hAlign = 'CENTER'
+                elements.append(logo_img)
+        except Exception as e:
+            print(f"Error adding logo to PDF: {str(e)}")
+
+    # Add date and disclaimer
+    elements.append(Spacer(1, 1 * inch))
+    date_generated = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    elements.append(Paragraph(f"Generated on: {date_generated}", footer_style))
+    elements.append(Spacer(1, 0.25 * inch))
+    elements.append(Paragraph("CONFIDENTIAL RESEARCH REPORT", footer_style))
+
+    # Add a page break
+    elements.append(PageBreak())
+
+    # Add table of contents header
+    elements.append(Paragraph("CONTENTS", heading1_style))
+    elements.append(Spacer(1, 0.25 * inch))
+
+    # Simple table of contents
+    toc_data = []
+    if research_data and 'data' in research_data:
+        data = research_data['data']
+
+        toc_items = [
+            ("Company Description", 2),
+            ("Key Products & Services", 2),
+            ("Leadership Team", 3),
+            ("Partnership Opportunities", 3),
+            ("Market Analysis", 4),
+            ("Partnership Potential", 5)
+        ]
+
+        for item, page in toc_items:
+            toc_data.append([Paragraph(item, normal_style), Paragraph(str(page), normal_style)])
+
+    if toc_data:
+        # Create table of contents
+        toc_table = Table(toc_data, colWidths=[4*inch, 0.5*inch])
+        toc_table.setStyle(TableStyle([
+            ('TEXTCOLOR', (0, 0), (-1, -1), colors.white),
+            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+            ('LINEABOVE', (0, 0), (-1, 0), 1, colors.Color(0.3, 0.3, 0.5)),
+            ('LINEBELOW', (0, -1), (-1, -1), 1, colors.Color(0.3, 0.3, 0.5)),
+        ]))
+        elements.append(toc_table)
+
+    # Add a page break before main content
+    elements.append(PageBreak())
+
+    # Add research data sections
+    if research_data and 'data' in research_data:
+        data = research_data['data']
+
+        # Company description
+        if isinstance(data, dict) and 'description' in data:
+            elements.append(Paragraph("Company Description", heading1_style))
+            elements.append(Paragraph(data['description'], normal_style))
+            elements.append(Spacer(1, 0.25 * inch))
+
+        # Key Products/Services
+        if isinstance(data, dict) and 'key_products' in data and data['key_products']:
+            elements.append(Paragraph("Key Products & Services", heading1_style))
+            if isinstance(data['key_products'], list):
+                for product in data['key_products']:
+                    if isinstance(product, str):
+                        elements.append(Paragraph(f"• {product}", bullet_style))
+                    elif isinstance(product, dict) and 'name' in product:
+                        elements.append(Paragraph(f"• {product['name']}", bullet_style))
+            elements.append(Spacer(1, 0.25 * inch))
+
+        # Leadership
+        if isinstance(data, dict) and 'key_leadership' in data and data['key_leadership']:
+            elements.append(Paragraph("Leadership Team", heading1_style))
+            if isinstance(data['key_leadership'], list):
+                for leader in data['key_leadership']:
+                    if isinstance(leader, str):
+                        elements.append(Paragraph(f"• {leader}", bullet_style))
+                    elif isinstance(leader, dict) and 'name' in leader:
+                        title = leader.get('title', '')
+                        leader_text = f"• {leader['name']}"
+                        if title:
+                            leader_text += f" ({title})"
+                        elements.append(Paragraph(leader_text, bullet_style))
+            elements.append(Spacer(1, 0.25 * inch))
+
+        # Partnership Opportunities
+        if isinstance(data, dict) and 'partnership_opportunities' in data and data['partnership_opportunities']:
+            elements.append(Paragraph("Partnership Opportunities", heading1_style))
+            if isinstance(data['partnership_opportunities'], list):
+                for opportunity in data['partnership_opportunities']:
+                    elements.append(Paragraph(f"• {opportunity}", bullet_style))
+            elements.append(Spacer(1, 0.25 * inch))
+
+        # Market Analysis
+        if isinstance(data, dict) and 'market_analysis' in data and data['market_analysis']:
+            elements.append(Paragraph("Market Analysis", heading1_style))
+            market = data['market_analysis']
+            if isinstance(market, dict):
+                for key, value in market.items():
+                    if key and value:
+                        formatted_key = key.replace('_', ' ').title()
+                        elements.append(Paragraph(formatted_key, heading2_style))
+                        elements.append(Paragraph(str(value), normal_style))
+                        elements.append(Spacer(1, 0.15 * inch))
+            elements.append(Spacer(1, 0.25 * inch))
+
+        # Partnership Potential
+        if isinstance(data, dict) and 'partnership_potential' in data and data['partnership_potential']:
+            elements.append(Paragraph("Partnership Potential", heading1_style))
+            potential = data['partnership_potential']
+            if isinstance(potential, dict):
+                for key, value in potential.items():
+                    if key and value:
+                        formatted_key = key.replace('_', ' ').title()
+                        elements.append(Paragraph(formatted_key, heading2_style))
+                        elements.append(Paragraph(str(value), normal_style))
+                        elements.append(Spacer(1, 0.15 * inch))
+
+        # Include other important fields that may be available
+        if isinstance(data, dict):
+            # Website
+            if 'website' in data and data['website']:
+                elements.append(Paragraph("Website", heading1_style))
+                elements.append(Paragraph(data['website'], normal_style))
+                elements.append(Spacer(1, 0.25 * inch))
+
+            # Headquarters
+            if 'hq_location' in data and data['hq_location']:
+                elements.append(Paragraph("Headquarters", heading1_style))
+                elements.append(Paragraph(data['hq_location'], normal_style))
+                elements.append(Spacer(1, 0.25 * inch))
+
+            # Company Size
+            if 'size_range' in data and data['size_range']:
+                elements.append(Paragraph("Company Size", heading1_style))
+                elements.append(Paragraph(data['size_range'], normal_style))
+                elements.append(Spacer(1, 0.25 * inch))
+
+    # Add a background to each page
+    def add_dark_background(canvas, doc):
+        # Save the canvas state
+        canvas.saveState()
+
+        # Set the fill color to a dark blue/gray color - more pleasant dark theme
+        canvas.setFillColor(colors.Color(0.12, 0.14, 0.25))
+
+        # Draw a rectangle that covers the entire page
+        canvas.rect(
+            0,
+            0,
+            letter[0],  # width of the page
+            letter[1],  # height of the page
+            fill=True
+        )
+
+        # Add a footer with page number to each page
+        canvas.setFont(base_font, 8)
+        canvas.setFillColor(colors.Color(0.6, 0.6, 0.7))  # Light gray/purple
+        page_num = canvas.getPageNumber()
+        text = f"Page {page_num}"
+        canvas.drawCentredString(letter[0]/2, 0.25*inch, text)
+
+        # Restore the canvas state
+        canvas.restoreState()
+
+    # Build the PDF with the dark background on every page
+    doc.build(elements, onFirstPage=add_dark_background, onLaterPages=add_dark_background)
+
+    # Get the PDF data from the buffer
+    pdf_data = buffer.getvalue()
+    buffer.close()
+
+    return pdf_data
+
+
+# Processes rendering research PDFs in bulk (the pool is created on first use). Workers
+# unpickle render_research_pdf_entry by importing this module, which stays free of Flask
+# and app.py so a spawned worker doesn't build the whole app.
+PDF_EXPORT_WORKERS = int(os.getenv('PDF_EXPORT_WORKERS', min(4, os.cpu_count() or 1)))
+pdf_export_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_pdf_export_executor():
+    """Return the shared process pool used for bulk PDF rendering"""
+    global pdf_export_executor
+    with _executor_lock:
+        if pdf_export_executor is None:
+            pdf_export_executor = ProcessPoolExecutor(max_workers=PDF_EXPORT_WORKERS)
+        return pdf_export_executor
+
+
+@atexit.register
+def shutdown_pdf_export_executor():
+    """Stop the worker processes; queued renders are dropped"""
+    global pdf_export_executor
+    with _executor_lock:
+        executor, pdf_export_executor = pdf_export_executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def render_research_pdf_entry(company_name, research):
+    """Render one research PDF and return it as a (filename, bytes) archive entry"""
+    filename = f"{company_name.replace(' ', '_')}_Research.pdf"
+    return filename, generate_research_pdf(company_name, research)
+
+
+def iter_research_pdfs(company_names, research_by_name):
+    """Render research PDFs across the process pool, yielding them in request order
+
+    At most two PDFs per worker are in flight, so memory stays flat no
+    matter how many companies are exported.
+    """
+    global pdf_export_executor
+
+    names = [name for name in company_names if name in research_by_name]
+    window = PDF_EXPORT_WORKERS * 2
+    pending = deque()
+    position = 0
+
+    try:
+        executor = get_pdf_export_executor()
+        while position < len(names) or pending:
+            while position < len(names) and len(pending) < window:
+                name = names[position]
+                pending.append((name, executor.submit(render_research_pdf_entry, name, research_by_name[name])))
+                position += 1
+
+            # Stays queued until its result is in, so a broken pool re-renders it below
+            name, future = pending[0]
+            try:
+                entry = future.result()
+            except BrokenProcessPool:
+                raise
+            except Exception as e:
+                print(f"Error rendering PDF for {name}: {str(e)}")
+                entry = f"{name.replace(' ', '_')}_ERROR.txt", f"PDF generation failed: {str(e)}".encode('utf-8')
+            pending.popleft()
+            yield entry
+    except BrokenProcessPool as e:
+        # Finish the remaining PDFs in this process rather than failing the download
+        print(f"PDF process pool unavailable, rendering in-process: {str(e)}")
+        pdf_export_executor = None
+        remaining = [name for name, _ in pending] + names[position:]
+        for name in remaining:
+            yield render_research_pdf_entry(name, research_by_name[name])
@@ -0,0 +1,277 @@
+import re
+import numpy as np
+
+# Keyword rules for the boolean features. They run over the free text we have
+# for a company (description, industry, products, market position).
+_TEXT_FEATURES = {
+    "industry_sports_entertainment": re.compile(
+        r'\b(sports?|entertainment|events?|concerts?|live music|gaming|esports|media|ticketing|stadiums?|arenas?)\b'),
+    "industry_hospitality": re.compile(
+        r'\b(hospitality|hotels?|restaurants?|food|beverages?|drinks?|brewery|breweries|coffee|catering|dining|spirits|wine)\b'),
+    "industry_technology": re.compile(
+        r'\b(technology|software|saas|fintech|ai|artificial intelligence|machine learning|cloud|digital platform|payments?)\b'),
+    "media_mentions": re.compile(
+        r'\b(forbes|bloomberg|techcrunch|wall street journal|new york times|financial times|globe and mail|business insider)\b'),
+    "partnership_program": re.compile(
+        r'\b(partnership program|partner program|sponsorship program|ambassador program|brand partnerships?)\b'),
+    "arena_tenant_relationship": re.compile(
+        r'\b(raptors|maple leafs|toronto fc|argonauts|marlies|mlse|scotiabank arena|air canada centre)\b'),
+    "scotiabank_collaboration": re.compile(r'\bscotiabank\b'),
+    "community_programs": re.compile(
+        r'\b(community|philanthrop\w*|charit\w*|volunteer\w*|non-?profit|donat\w*)\b'),
+    "csr_program": re.compile(
+        r'\b(csr|corporate social responsibility|foundation|social impact|esg)\b'),
+}
+_SPONSOR_RE = re.compile(r'\bsponsor\w*\b')
+_SPONSOR_CONTEXT_RE = re.compile(r'\b(sports?|teams?|leagues?|venues?|events?|arenas?|stadiums?|festivals?|tournaments?)\b')
+_MARKETING_HIRING_RE = re.compile(r'\bhiring\b.{0,60}\b(marketing|brand)\b|\b(marketing|brand)\b.{0,60}\bhiring\b')
+
+# Numeric features and the fields they can be read from, first match wins
+_NUMERIC_FIELDS = {
+    "employee_count": ("employee_count", "staff_count", "employees"),
+    "linkedin_followers": ("follower_count", "linkedin_followers", "followers"),
+    "social_followers": ("social_followers", "total_social_followers"),
+    "funding_rounds": ("funding_rounds", "num_funding_rounds"),
+    "funding_total_usd": ("funding_total_usd", "total_funding", "funding_total"),
+    "revenue_usd": ("revenue_usd", "annual_revenue", "revenue"),
+    "job_listings": ("job_listings", "open_positions", "job_count"),
+}
+
+_PROVINCES = {
+    "on", "ontario", "qc", "quebec", "québec", "bc", "british columbia", "ab", "alberta", "mb", "manitoba",
+    "sk", "saskatchewan", "ns", "nova scotia", "nb", "new brunswick", "nl", "newfoundland and labrador",
+    "pe", "prince edward island", "yt", "yukon", "nt", "northwest territories", "nu", "nunavut"
+}
+_CANADA = {"ca", "can", "canada"}
+_NORTH_AMERICA = {"us", "usa", "united states", "united states of america", "mx", "mexico", "méxico"}
+
+_NUMBER_RE = re.compile(r'\d[\d,\.]*')
+_MULTIPLIERS = {'k': 1e3, 'thousand': 1e3, 'm': 1e6, 'million': 1e6, 'b': 1e9, 'billion': 1e9}
+
+
+def _parse_number(value):
+    """Parse 1200, "1,001-5,000", "10,001+" or "$50M" into a float (lower bound for ranges)"""
+    if value is None or isinstance(value, bool):
+        return 0.0
+    if isinstance(value, (int, float)):
+        return float(value) if np.isfinite(value) else 0.0
+    text = str(value).strip().lower()
+    match = _NUMBER_RE.search(text)
+    if not match:
+        return 0.0
+    try:
+        number = float(match.group(0).replace(',', '').rstrip('.'))
+    except ValueError:
+        return 0.0
+    suffix = re.match(r'\s*(thousand|million|billion|k|m|b)\b', text[match.end():])
+    if suffix:
+        number *= _MULTIPLIERS[suffix.group(1)]
+    return number
+
+
+def location_tier(headquarters):
+    """Map a headquarters string to 5=Toronto, 4=Ontario, 3=Canada, 2=North America, 1=elsewhere, 0=unknown"""
+    if not headquarters or not isinstance(headquarters, str):
+        return 0
+    parts = [p.strip().lower() for p in headquarters.split(',') if p.strip()]
+    if not parts:
+        return 0
+    country = parts[-1]
+    in_canada = country in _CANADA or any(p in _PROVINCES for p in parts[1:]) or 'canada' in parts
+    if in_canada and 'toronto' in parts[0]:
+        return 5
+    if in_canada and any(p in ('on', 'ontario') for p in parts):
+        return 4
+    if in_canada:
+        return 3
+    if country in _NORTH_AMERICA:
+        return 2
+    if len(parts) == 1 and 'toronto' in parts[0]:
+        return 5
+    return 1
+
+
+def _details(record):
+    coresignal = record.get('coresignal_data')
+    if isinstance(coresignal, dict) and isinstance(coresignal.get('company_details'), dict):
+        return coresignal['company_details']
+    # Stored rows carry the same values under market_analysis (see scoring_inputs)
+    market_analysis = record.get('market_analysis')
+    if isinstance(market_analysis, dict) and isinstance(market_analysis.get('scoring_inputs'), dict):
+        return market_analysis['scoring_inputs']
+    return {}
+
+
+def scoring_inputs(record):
+    """The enrichment values extract_features reads that potential_partners has no column for
+
+    save_potential_partner stores them under market_analysis['scoring_inputs'],
+    so a bulk rescore sees the same inputs as scoring at search time.
+    """
+    if not isinstance(record, dict):
+        return {}
+    details = _details(record)
+    inputs = {}
+    for keys in list(_NUMERIC_FIELDS.values()) + [('hiring_marketing',), ('headquarters', 'hq_location', 'location'),
+                                                  ('size', 'size_range')]:
+        value = _first(record, details, keys)
+        if value not in (None, ""):
+            inputs[keys[0]] = value
+    for key in ('industry', 'description', 'company_type'):
+        if details.get(key):
+            inputs[key] = details[key]
+    coresignal = record.get('coresignal_data')
+    if isinstance(coresignal, dict) and isinstance(coresignal.get('products_and_services'), list):
+        inputs['product_names'] = [p.get('name', '') for p in coresignal['products_and_services'] if isinstance(p, dict)]
+    return inputs
+
+
+def _first(record, details, keys):
+    for key in keys:
+        for source in (details, record):
+            value = source.get(key)
+            if value not in (None, ""):
+                return value
+    return None
+
+
+def _text_blob(record, details):
+    pieces = [
+        record.get('description'), record.get('products_services'), record.get('market_position'),
+        record.get('industry'), details.get('industry'), details.get('description'), details.get('company_type')
+    ]
+    for key in ('products', 'key_products'):
+        if isinstance(record.get(key), list):
+            pieces.extend(str(p) for p in record[key])
+    coresignal = record.get('coresignal_data')
+    if isinstance(coresignal, dict) and isinstance(coresignal.get('products_and_services'), list):
+        pieces.extend(p.get('name', '') for p in coresignal['products_and_services'] if isinstance(p, dict))
+    elif isinstance(details.get('product_names'), list):
+        pieces.extend(details['product_names'])
+    return " ".join(str(p) for p in pieces if p).lower()
+
+
+def extract_features(record):
+    """Pull the raw scoring features out of a search result or a potential_partners row
+
+    Works on companies from process_company (with coresignal_data) and on rows
+    stored in potential_partners (hq_location, size_range, ...). Missing data
+    simply scores as 0.
+    """
+    if not isinstance(record, dict):
+        return {}
+    details = _details(record)
+    features = {}
+
+    features['location_tier'] = location_tier(
+        _first(record, details, ('headquarters', 'hq_location', 'location')))
+
+    for feature, keys in _NUMERIC_FIELDS.items():
+        features[feature] = _parse_number(_first(record, details, keys))
+
+    if not features['employee_count']:
+        features['employee_count'] = _parse_number(_first(record, details, ('size', 'size_range')))
+
+    text = _text_blob(record, details)
+    for feature, pattern in _TEXT_FEATURES.items():
+        features[feature] = 1.0 if pattern.search(text) else 0.0
+    features['sponsorship_history'] = 1.0 if _SPONSOR_RE.search(text) and _SPONSOR_CONTEXT_RE.search(text) else 0.0
+    features['marketing_hiring'] = 1.0 if (_first(record, details, ('hiring_marketing',)) or _MARKETING_HIRING_RE.search(text)) else 0.0
+
+    return features
+
+
+class ScoringEngine:
+    """Evaluates SCORING_CRITERIA rules for many companies at once
+
+    The criteria are compiled into flat arrays once, so scoring is a handful
+    of NumPy operations over an (n_companies, n_features) matrix. Build the
+    matrix once with feature_matrix() and score_matrix() can be rerun for
+    any criteria weights without touching the source data again.
+    """
+
+    def __init__(self, criteria):
+        self.criteria = criteria
+        self.category_keys = []
+        self.max_points = []
+        self.is_tier = []
+        self.feature_names = []
+        self.unscored = []
+
+        columns, minimums, points, starts = [], [], [], []
+        for key, category in criteria.items():
+            rules = [c for c in category.get('criteria', []) if c.get('feature')]
+            self.unscored.extend(f"{key}: {c.get('description')}" for c in category.get('criteria', []) if not c.get('feature'))
+            if not rules:
+                continue
+            self.category_keys.append(key)
+            self.max_points.append(float(category.get('max_points', 0)))
+            self.is_tier.append(category.get('mode') == 'tier')
+            starts.append(len(columns))
+            for rule in rules:
+                if rule['feature'] not in self.feature_names:
+                    self.feature_names.append(rule['feature'])
+                columns.append(self.feature_names.index(rule['feature']))
+                minimums.append(float(rule.get('min', 1)))
+                points.append(float(rule.get('points', 0)))
+
+        if self.unscored:
+            print(f"Scoring engine: no local rule for {len(self.unscored)} criteria, they score 0: {self.unscored}")
+
+        self._columns = np.array(columns, dtype=np.intp)
+        self._minimums = np.array(minimums, dtype=np.float64)
+        self._points = np.array(points, dtype=np.float64)
+        self._starts = np.array(starts, dtype=np.intp)
+        self._max_points = np.array(self.max_points, dtype=np.float64)
+        self._is_tier = np.array(self.is_tier, dtype=bool)
+        self.max_total_score = float(sum(float(c.get('max_points', 0)) for c in criteria.values()))
+
+    def feature_matrix(self, records):
+        """Build the (n, n_features) float matrix for a list of companies"""
+        matrix = np.zeros((len(records), len(self.feature_names)), dtype=np.float64)
+        for row, record in enumerate(records):
+            features = extract_features(record)
+            matrix[row] = [features.get(name, 0.0) for name in self.feature_names]
+        return matrix
+
+    def score_matrix(self, matrix):
+        """Score a feature matrix
+
+        Returns:
+            tuple: (category_scores (n, n_categories), total_scores (n,))
+        """
+        n = matrix.shape[0]
+        if n == 0 or self._columns.size == 0:
+            return np.zeros((n, len(self.category_keys))), np.zeros(n)
+
+        awarded = (matrix[:, self._columns] >= self._minimums) * self._points
+        tier_scores = np.maximum.reduceat(awarded, self._starts, axis=1)
+        additive_scores = np.add.reduceat(awarded, self._starts, axis=1)
+        category_scores = np.minimum(np.where(self._is_tier, tier_scores, additive_scores), self._max_points)
+        return category_scores, category_scores.sum(axis=1)
+
+    def scaled(self, total_scores):
+        """Convert totals to the 0-10 partnership_score scale used by the UI"""
+        if self.max_total_score <= 0:
+            return np.zeros_like(total_scores)
+        return np.round(total_scores / self.max_total_score * 10, 1)
+
+    def score(self, records):
+        """Score companies and return one result dict per record, in order"""
+        category_scores, totals = self.score_matrix(self.feature_matrix(records))
+        scaled = self.scaled(totals)
+        return [
+            {
+                "total_score": round(float(totals[i]), 2),
+                "partnership_score": float(scaled[i]),
+                "score_breakdown": {
+                    key: round(float(category_scores[i, j]), 2) for j, key in enumerate(self.category_keys)
+                }
+            }
+            for i in range(len(records))
+        ]
+
+
+def score_companies(records, criteria):
+    """Convenience wrapper: score a list of companies against a criteria dict"""
+    return ScoringEngine(criteria).score(records)
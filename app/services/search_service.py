@@ -3,16 +3,8 @@ import json
 import requests
 import traceback
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from openai import OpenAI
 from ..models.database import add_search_to_history
-
-# Initialize OpenAI client
-api_key = os.environ.get("OPENAI_API_KEY")
-try:
-    client = OpenAI(api_key=api_key) if api_key else None
-except Exception as e:
-    print(f"Error initializing OpenAI client: {e}")
-    client = None
+from .openai_provider import get_openai_client
 
 def generate_logo(company_name):
     """Generate a logo placeholder for a company"""
@@ -43,11 +35,8 @@ def search_companies_in_industry(industry, api_key):
         # Log the search
         add_search_to_history("industry", industry, 0)
         
-        # Check if we have a client
-        global client
-        if not client and api_key:
-            client = OpenAI(api_key=api_key)
-        
+        # Shared client; None when OPENAI_API_KEY is not set
+        client = get_openai_client()
         if not client:
             print("Error: OpenAI client not available")
             return []
@@ -0,0 +1,491 @@
+import os
+import json
+import time
+import asyncio
+import threading
+from contextlib import contextmanager, asynccontextmanager
+from email.utils import parsedate_to_datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows: limits stay per process
+    fcntl = None
+
+from app.services.chunk_planner import _parse_reset
+from app.services.deadline import DeadlineExceeded, timeout_for, note_degraded
+
+# Directory for limiter state shared by every worker on this host (e.g. all gunicorn workers).
+# Unset keeps each process's limits to itself.
+UPSTREAM_GOVERNOR_DIR = os.environ.get("UPSTREAM_GOVERNOR_DIR", "")
+
+# How long a call may wait for a slot before giving up with UpstreamBusy
+UPSTREAM_QUEUE_TIMEOUT = float(os.environ.get("UPSTREAM_QUEUE_TIMEOUT", 120))
+
+# After a decrease, further throttling within this window is treated as the same congestion event
+DECREASE_COOLDOWN_SECONDS = float(os.environ.get("UPSTREAM_DECREASE_COOLDOWN", 2))
+DECREASE_FACTOR = 0.5
+
+# Waiters re-check the shared file this often, since other processes can't wake them
+SHARED_POLL_SECONDS = 0.05
+
+# Coroutines waiting for a slot re-check this often; a release in another thread can't wake them
+ASYNC_POLL_SECONDS = 0.02
+
+# (initial, minimum, maximum) concurrent calls per upstream; override with UPSTREAM_<NAME>_LIMITS="4,1,32"
+DEFAULT_LIMITS = {
+    "openai": (8, 1, 64),
+    "perplexity": (4, 1, 16),
+    "exa": (4, 1, 16),
+    "rapidapi": (2, 1, 8),
+}
+
+# Consecutive failed calls (timeouts, connection errors, 5xx) that open an upstream's circuit
+BREAKER_FAILURE_THRESHOLD = int(os.environ.get("UPSTREAM_BREAKER_FAILURES", 5))
+
+# How long an open circuit fails calls straight away before letting one probe call through
+BREAKER_RESET_SECONDS = float(os.environ.get("UPSTREAM_BREAKER_RESET_SECONDS", 30))
+
+THROTTLE_STATUS_CODES = (429, 503)
+
+
+class UpstreamBusy(RuntimeError):
+    """No slot for an upstream freed up within the queue timeout"""
+
+
+class CircuitOpen(UpstreamBusy):
+    """The upstream has been failing, so the call was refused without trying it"""
+
+
+# Raised instead of calling an upstream; callers catch these to serve cached or degraded data
+UPSTREAM_UNAVAILABLE = (UpstreamBusy, DeadlineExceeded)
+
+
+def _header(headers, *names):
+    for name in names:
+        value = headers.get(name)
+        if value is not None:
+            return value
+    return None
+
+
+def _retry_after(value):
+    """Retry-After as seconds: a number, an HTTP date or an OpenAI-style '1m30s'"""
+    if not value:
+        return 0.0
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return _parse_reset(value)
+
+
+def read_rate_limit_headers(headers):
+    """Remaining requests and seconds until they reset, from OpenAI, RapidAPI or generic headers"""
+    headers = {k.lower(): v for k, v in (headers or {}).items()}
+    remaining = _header(headers, "x-ratelimit-remaining-requests", "x-ratelimit-requests-remaining", "x-ratelimit-remaining")
+    reset = _header(headers, "retry-after", "x-ratelimit-reset-requests", "x-ratelimit-requests-reset", "x-ratelimit-reset")
+    try:
+        remaining = int(float(remaining)) if remaining is not None else None
+    except ValueError:
+        remaining = None
+    return remaining, _retry_after(reset)
+
+
+def _adjust(state, status_code, headers, error, minimum, maximum, now):
+    """AIMD step on a state dict with limit, paused_until and last_decrease"""
+    remaining, reset_seconds = read_rate_limit_headers(headers)
+    throttled = status_code in THROTTLE_STATUS_CODES
+    if throttled or error:
+        # Multiplicative decrease, once per congestion event
+        if now - state["last_decrease"] >= DECREASE_COOLDOWN_SECONDS:
+            state["limit"] = max(minimum, state["limit"] * DECREASE_FACTOR)
+            state["last_decrease"] = now
+        if throttled:
+            state["paused_until"] = max(state["paused_until"], now + (reset_seconds or 1.0))
+    elif status_code is None or status_code < 400:
+        # Additive increase: about +1 per `limit` successful calls
+        state["limit"] = min(maximum, state["limit"] + 1.0 / state["limit"])
+
+    if remaining is not None:
+        if remaining <= 0 and reset_seconds:
+            state["paused_until"] = max(state["paused_until"], now + reset_seconds)
+        # No point running more calls at once than the window still allows
+        state["limit"] = max(minimum, min(state["limit"], remaining or minimum))
+    return throttled
+
+
+class CircuitBreaker:
+    """Closed until `threshold` calls fail in a row, then open for `reset_seconds`
+
+    After that one probe call is let through (half-open): its success closes
+    the circuit, its failure opens it again.
+    """
+
+    def __init__(self, name, threshold=BREAKER_FAILURE_THRESHOLD, reset_seconds=BREAKER_RESET_SECONDS):
+        self.name = name
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if self.probing or time.time() - self.opened_at >= self.reset_seconds:
+            return "half-open"
+        return "open"
+
+    def before_call(self):
+        with self._lock:
+            if self.opened_at is None:
+                return
+            retry_in = self.reset_seconds - (time.time() - self.opened_at)
+            if retry_in > 0 or self.probing:
+                raise CircuitOpen(f"{self.name} circuit open after {self.failures} failures, "
+                                  f"next probe in {max(0.0, retry_in):.0f}s")
+            self.probing = True
+
+    def cancel(self):
+        """The call never reached the upstream; let another caller probe"""
+        with self._lock:
+            self.probing = False
+
+    def record(self, failed):
+        with self._lock:
+            self.probing = False
+            if not failed:
+                self.failures = 0
+                self.opened_at = None
+                return
+            self.failures += 1
+            if self.failures >= self.threshold:
+                if self.opened_at is None:
+                    print(f"Opening {self.name} circuit after {self.failures} failed calls")
+                self.opened_at = time.time()
+
+
+class _SharedState:
+    """Limiter state in a JSON file, locked with flock, so every worker on the host sees one limit"""
+
+    def __init__(self, path, initial):
+        self.path = path
+        self.initial = initial
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    @contextmanager
+    def locked(self):
+        with open(self.path, "a+") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                handle.seek(0)
+                try:
+                    state = json.loads(handle.read() or "{}")
+                except ValueError:
+                    state = {}
+                state.setdefault("limit", float(self.initial))
+                state.setdefault("paused_until", 0.0)
+                state.setdefault("last_decrease", 0.0)
+                # Slots held by workers that died are released
+                in_flight = {}
+                for pid, count in state.get("in_flight", {}).items():
+                    try:
+                        os.kill(int(pid), 0)
+                        in_flight[pid] = count
+                    except (OSError, ValueError):
+                        pass
+                state["in_flight"] = in_flight
+                yield state
+                handle.seek(0)
+                handle.truncate()
+                handle.write(json.dumps(state))
+                handle.flush()
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit for one upstream
+
+    Every call takes a slot for as long as its request is open. Successful
+    responses raise the limit by about one per `limit` calls; a 429/503,
+    a timeout or a connection error halves it (at most once per cooldown).
+    Rate-limit headers cap the limit at the requests left in the window
+    and pause new calls until the window resets when none are left.
+    """
+
+    def __init__(self, name, initial, minimum, maximum, shared_dir=UPSTREAM_GOVERNOR_DIR):
+        self.name = name
+        self.minimum = minimum
+        self.maximum = maximum
+        self.state = {"limit": float(initial), "paused_until": 0.0, "last_decrease": 0.0}
+        self.in_flight = 0
+        self.waiting = 0
+        self.counters = {"calls": 0, "throttled": 0, "errors": 0, "timeouts": 0}
+        self.breaker = CircuitBreaker(name)
+        self._cond = threading.Condition()
+        self._shared = None
+        if shared_dir and fcntl is not None:
+            self._shared = _SharedState(os.path.join(shared_dir, f"{name}.json"), initial)
+
+    def _try_take(self, now):
+        if self._shared is None:
+            if now < self.state["paused_until"] or self.in_flight >= int(self.state["limit"]):
+                return False
+            return True
+        with self._shared.locked() as shared:
+            self.state.update({key: shared[key] for key in ("limit", "paused_until", "last_decrease")})
+            if now < shared["paused_until"] or sum(shared["in_flight"].values()) >= int(shared["limit"]):
+                return False
+            pid = str(os.getpid())
+            shared["in_flight"][pid] = shared["in_flight"].get(pid, 0) + 1
+            return True
+
+    def _take(self, now, deadline, timeout):
+        """Take a free slot, with self._cond held
+
+        Returns None once the slot is taken, else how long to wait before
+        trying again; raises UpstreamBusy past the deadline.
+        """
+        if self._try_take(now):
+            self.in_flight += 1
+            self.counters["calls"] += 1
+            return None
+        if now >= deadline:
+            self.counters["timeouts"] += 1
+            raise UpstreamBusy(f"No {self.name} slot free after {timeout:.0f}s "
+                               f"(limit {int(self.state['limit'])}, {self.waiting} waiting)")
+        wait = deadline - now
+        if self.state["paused_until"] > now:
+            wait = min(wait, self.state["paused_until"] - now)
+        if self._shared is not None:
+            wait = min(wait, SHARED_POLL_SECONDS)
+        return wait
+
+    def acquire(self, timeout=UPSTREAM_QUEUE_TIMEOUT):
+        deadline = time.time() + timeout
+        with self._cond:
+            self.waiting += 1
+            try:
+                while True:
+                    wait = self._take(time.time(), deadline, timeout)
+                    if wait is None:
+                        return
+                    self._cond.wait(wait)
+            finally:
+                self.waiting -= 1
+
+    async def acquire_async(self, timeout=UPSTREAM_QUEUE_TIMEOUT):
+        """acquire() for coroutines
+
+        Waits on the event loop instead of in a thread, so a task cancelled
+        while queued never ends up holding a slot and waiters don't tie up
+        the default executor.
+        """
+        deadline = time.time() + timeout
+        with self._cond:
+            self.waiting += 1
+        try:
+            while True:
+                with self._cond:
+                    wait = self._take(time.time(), deadline, timeout)
+                if wait is None:
+                    return
+                await asyncio.sleep(min(wait, ASYNC_POLL_SECONDS))
+        finally:
+            with self._cond:
+                self.waiting -= 1
+
+    def release(self, status_code=None, headers=None, error=False, adapt=True):
+        """Free a slot and adapt the limit (and circuit) to how the call went"""
+        now = time.time()
+        with self._cond:
+            self.in_flight -= 1
+            if not adapt:
+                self.breaker.cancel()
+                if self._shared is not None:
+                    with self._shared.locked() as shared:
+                        pid = str(os.getpid())
+                        shared["in_flight"][pid] = max(0, shared["in_flight"].get(pid, 0) - 1)
+                self._cond.notify_all()
+                return
+            self.breaker.record(error or (status_code or 0) >= 500)
+            if error:
+                self.counters["errors"] += 1
+            if self._shared is None:
+                throttled = _adjust(self.state, status_code, headers, error, self.minimum, self.maximum, now)
+            else:
+                with self._shared.locked() as shared:
+                    pid = str(os.getpid())
+                    shared["in_flight"][pid] = max(0, shared["in_flight"].get(pid, 0) - 1)
+                    throttled = _adjust(shared, status_code, headers, error, self.minimum, self.maximum, now)
+                    self.state.update({key: shared[key] for key in ("limit", "paused_until", "last_decrease")})
+            if throttled:
+                self.counters["throttled"] += 1
+            self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            now = time.time()
+            return {
+                "limit": int(self.state["limit"]),
+                "in_flight": self.in_flight,
+                "waiting": self.waiting,
+                "paused_for_seconds": round(max(0.0, self.state["paused_until"] - now), 2),
+                "shared": self._shared is not None,
+                "circuit": self.breaker.state,
+                "consecutive_failures": self.breaker.failures,
+                **self.counters
+            }
+
+
+class UpstreamCall:
+    """Handed out by UpstreamGovernor.slot(); pass it the response so the limiter can adapt"""
+
+    def __init__(self):
+        self.status_code = None
+        self.headers = None
+
+    def timeout(self, cap=None):
+        """Timeout for this call: `cap`, shortened to what is left of the request deadline"""
+        return timeout_for(cap)
+
+    def observe(self, response):
+        """Record a requests/httpx response, or an OpenAI raw response"""
+        http_response = getattr(response, "http_response", response)
+        self.status_code = getattr(http_response, "status_code", None)
+        self.headers = getattr(http_response, "headers", None)
+        return response
+
+
+def _failure(call, exc):
+    """(status, headers, error) for a call that raised
+
+    HTTP errors (openai.APIStatusError, requests.HTTPError...) carry their
+    response. Without one, an exception after observe() is the caller's own
+    failure; otherwise it is a timeout or connection error.
+    """
+    response = getattr(exc, "response", None)
+    status_code = getattr(response, "status_code", None)
+    if status_code is not None:
+        return status_code, getattr(response, "headers", None), status_code >= 500
+    if call.status_code is not None:
+        return call.status_code, call.headers, False
+    return None, None, True
+
+
+class UpstreamGovernor:
+    """One AdaptiveLimiter per upstream, shared by every caller in the process
+
+    Wrap each upstream request:
+
+        with upstream_governor.slot("perplexity") as call:
+            response = requests.post(...)
+            call.observe(response)
+
+    Exceptions raised inside the block count as errors (or as throttling
+    when they carry a 429 response) and are re-raised.
+
+    A call is refused with CircuitOpen while the upstream's circuit is open,
+    and with DeadlineExceeded once the request deadline has passed; the
+    wait for a slot never outlasts the deadline either. Pass
+    call.timeout(cap) as the request timeout so the call itself doesn't.
+    """
+
+    def __init__(self, limits=None, shared_dir=UPSTREAM_GOVERNOR_DIR):
+        self.shared_dir = shared_dir
+        self.limits = dict(DEFAULT_LIMITS, **(limits or {}))
+        self._limiters = {}
+        self._lock = threading.Lock()
+
+    def limiter(self, name):
+        with self._lock:
+            limiter = self._limiters.get(name)
+            if limiter is None:
+                initial, minimum, maximum = self.limits.get(name, (4, 1, 16))
+                override = os.environ.get(f"UPSTREAM_{name.upper()}_LIMITS")
+                if override:
+                    initial, minimum, maximum = (int(v) for v in override.split(","))
+                limiter = self._limiters[name] = AdaptiveLimiter(name, initial, minimum, maximum, self.shared_dir)
+            return limiter
+
+    def _admit(self, name, timeout):
+        """(limiter, queue wait) for a call about to queue; refusals are noted as degraded data"""
+        limiter = self.limiter(name)
+        try:
+            wait = timeout_for(timeout)
+            limiter.breaker.before_call()
+        except UPSTREAM_UNAVAILABLE as e:
+            note_degraded(name, e)
+            raise
+        return limiter, wait
+
+    @contextmanager
+    def slot(self, name, timeout=UPSTREAM_QUEUE_TIMEOUT):
+        limiter, wait = self._admit(name, timeout)
+        try:
+            limiter.acquire(wait)
+        except UpstreamBusy as e:
+            limiter.breaker.cancel()
+            note_degraded(name, e)
+            raise
+        call = UpstreamCall()
+        try:
+            yield call
+        except DeadlineExceeded as e:
+            # Out of time before the request went out: says nothing about the upstream
+            limiter.release(call.status_code, call.headers, adapt=call.status_code is not None)
+            note_degraded(name, e)
+            raise
+        except Exception as e:
+            limiter.release(*_failure(call, e))
+            raise
+        except BaseException:
+            # Interrupted mid-call: free the slot without judging the upstream
+            limiter.release(call.status_code, call.headers, adapt=False)
+            raise
+        limiter.release(call.status_code, call.headers)
+
+    @asynccontextmanager
+    async def async_slot(self, name, timeout=UPSTREAM_QUEUE_TIMEOUT):
+        """slot() for coroutines; the slot is freed however the task ends, cancellation included"""
+        limiter, wait = self._admit(name, timeout)
+        try:
+            await limiter.acquire_async(wait)
+        except asyncio.CancelledError:
+            limiter.breaker.cancel()
+            raise
+        except UpstreamBusy as e:
+            limiter.breaker.cancel()
+            note_degraded(name, e)
+            raise
+        call = UpstreamCall()
+        try:
+            yield call
+        except DeadlineExceeded as e:
+            # Out of time before the request went out: says nothing about the upstream
+            limiter.release(call.status_code, call.headers, adapt=call.status_code is not None)
+            note_degraded(name, e)
+            raise
+        except Exception as e:
+            limiter.release(*_failure(call, e))
+            raise
+        except BaseException:
+            # Cancelled mid-call: free the slot without judging the upstream
+            limiter.release(call.status_code, call.headers, adapt=False)
+            raise
+        limiter.release(call.status_code, call.headers)
+
+    def stats(self):
+        with self._lock:
+            limiters = list(self._limiters.values())
+        return {limiter.name: limiter.stats() for limiter in limiters}
+
+
+# Shared by every upstream call in the process
+upstream_governor = UpstreamGovernor()
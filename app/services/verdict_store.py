@@ -0,0 +1,230 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+from app.services.name_extractor import normalize_name
+from app.services.competition_prescreen import CLEAR_THRESHOLD
+
+# SQLite file holding one analysis verdict per company. Empty disables the store.
+VERDICT_STORE_PATH = os.environ.get(
+    "VERDICT_STORE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), ".cache", "verdicts.sqlite3")
+)
+
+# Verdicts older than this are re-analyzed even if the partners haven't changed
+VERDICT_TTL_DAYS = float(os.environ.get("VERDICT_TTL_DAYS", 30))
+
+# Analysis fields worth keeping; everything else is per-search
+VERDICT_FIELDS = (
+    "description", "products_services", "market_position", "competes_with_partners",
+    "competing_partners", "competition_reasons", "scores", "total_score", "triage_score", "analysis_tier"
+)
+
+
+def _digest(value):
+    return hashlib.sha256(json.dumps(value, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+def _category_key(partner):
+    return (partner.get('category') or "").strip().lower()
+
+
+def _partner_keys(name):
+    """Normalized keys for a partner name; "Amazon Web Services (AWS)" also gets the keys of each part"""
+    keys = {normalize_name(name), normalize_name(re.sub(r'\(.*?\)', ' ', name or ""))}
+    keys.update(normalize_name(alias) for alias in re.findall(r'\((.*?)\)', name or ""))
+    return {key for key in keys if key}
+
+
+def category_hashes(partners):
+    """One hash per partner category, so a change shows up only in its own category"""
+    categories = {}
+    for partner in partners:
+        categories.setdefault(_category_key(partner), []).append(partner)
+    return {
+        category: _digest(sorted(members, key=lambda p: p.get('name', '')))
+        for category, members in categories.items()
+    }
+
+
+class VerdictStore:
+    """Competition verdicts and scores per company, for the current partner set
+
+    Rows are keyed by normalized company name and remember the per-category
+    partner hashes they were computed against. When the partners change,
+    a verdict is only thrown away if one of the changed categories matters
+    to the company: it competed with a partner there, or the pre-screen
+    finds the company close to a partner in that category now.
+    """
+
+    def __init__(self, partners, criteria=None, path=VERDICT_STORE_PATH, ttl_days=VERDICT_TTL_DAYS, prescreen=None):
+        self.path = path
+        self.ttl_seconds = ttl_days * 24 * 60 * 60
+        self.prescreen = prescreen
+        self.partners = list(partners)
+        self.category_hashes = category_hashes(self.partners)
+        self.partners_hash = _digest(self.category_hashes)
+        self.criteria_hash = _digest(criteria or {})
+        # A partner can be listed under more than one category (Rogers is)
+        self.partner_categories = {}
+        for partner in self.partners:
+            for key in _partner_keys(partner['name']):
+                self.partner_categories.setdefault(key, set()).add(_category_key(partner))
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    @property
+    def enabled(self):
+        return bool(self.path)
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=10)
+        if not self._initialized:
+            with self._lock:
+                if not self._initialized:
+                    connection.execute("PRAGMA journal_mode=WAL")
+                    connection.execute("""
+                        CREATE TABLE IF NOT EXISTS verdicts (
+                            name_key TEXT PRIMARY KEY,
+                            name TEXT,
+                            partners_hash TEXT,
+                            category_hashes TEXT,
+                            criteria_hash TEXT,
+                            competing_categories TEXT,
+                            verdict TEXT,
+                            updated_at REAL
+                        )
+                    """)
+                    connection.commit()
+                    self._initialized = True
+        return connection
+
+    def _partner_categories(self, partner_name):
+        """Categories of a partner named the way the model wrote it ("Adidas AG" or "AWS"); empty if unknown"""
+        key = normalize_name(partner_name)
+        if not key:
+            return set()
+        if key in self.partner_categories:
+            return self.partner_categories[key]
+        # "Rogers Communications" for Rogers: the longest partner key inside the name, or the other way round
+        matches = [k for k in self.partner_categories if min(len(k), len(key)) >= 3 and (k in key or key in k)]
+        return self.partner_categories[max(matches, key=len)] if matches else set()
+
+    def _competing_categories(self, analysis):
+        """Categories a verdict depends on; every category when a competitor's partner can't be placed"""
+        partners = analysis.get('competing_partners') or []
+        placed = [self._partner_categories(partner) for partner in partners]
+        if analysis.get('competes_with_partners') is True and (not partners or not all(placed)):
+            return sorted(self.category_hashes)
+        return sorted(set().union(*placed))
+
+    def _changed_categories(self, stored_hashes):
+        categories = set(stored_hashes) | set(self.category_hashes)
+        return {c for c in categories if stored_hashes.get(c) != self.category_hashes.get(c)}
+
+    def _still_valid(self, name, verdict, stored_hashes, competing_categories):
+        """Whether a verdict computed against other partners still holds"""
+        changed = self._changed_categories(stored_hashes)
+        if set(competing_categories) & changed:
+            return False
+        current_changed = changed & set(self.category_hashes)
+        if not current_changed:
+            return True
+        if self.prescreen is None:
+            return False
+
+        excluded_by = self.prescreen.exclusion_hit(name)
+        if excluded_by and self._partner_categories(excluded_by) & current_changed:
+            return False
+        text = " ".join(str(verdict.get(field) or "") for field in ("description", "products_services", "market_position"))
+        similarities = self.prescreen.similarities(f"{name} {text}")
+        for index, similarity in enumerate(similarities):
+            if similarity >= CLEAR_THRESHOLD and _category_key(self.prescreen.partners[index]) in current_changed:
+                return False
+        return True
+
+    def get_many(self, names, include_triage=False):
+        """Return {name: analysis} for companies with a usable stored verdict
+
+        Verdicts the cheap triage model settled are only returned with
+        include_triage, i.e. when the caller would settle them that way too;
+        otherwise those companies get a full analysis.
+        """
+        if not self.enabled or not names:
+            return {}
+        keys = {normalize_name(name): name for name in names if normalize_name(name)}
+        if not keys:
+            return {}
+
+        try:
+            connection = self._connect()
+            try:
+                placeholders = ",".join("?" for _ in keys)
+                rows = connection.execute(
+                    f"SELECT name_key, partners_hash, category_hashes, criteria_hash, competing_categories, verdict, updated_at "
+                    f"FROM verdicts WHERE name_key IN ({placeholders})",
+                    list(keys)
+                ).fetchall()
+
+                found, refreshed = {}, []
+                now = time.time()
+                for name_key, partners_hash, stored_hashes, criteria_hash, competing, verdict_json, updated_at in rows:
+                    if criteria_hash != self.criteria_hash or now - (updated_at or 0) > self.ttl_seconds:
+                        continue
+                    verdict = json.loads(verdict_json)
+                    if verdict.get('analysis_tier', 'full') != 'full' and not include_triage:
+                        continue
+                    name = keys[name_key]
+                    if partners_hash != self.partners_hash:
+                        if not self._still_valid(name, verdict, json.loads(stored_hashes), json.loads(competing)):
+                            continue
+                        refreshed.append(name_key)
+                    found[name] = dict(verdict, name=name)
+
+                # Verdicts that survived a partner change now belong to the current partner set
+                if refreshed:
+                    connection.executemany(
+                        "UPDATE verdicts SET partners_hash = ?, category_hashes = ? WHERE name_key = ?",
+                        [(self.partners_hash, json.dumps(self.category_hashes), key) for key in refreshed]
+                    )
+                    connection.commit()
+                return found
+            finally:
+                connection.close()
+        except (OSError, sqlite3.Error, ValueError) as e:
+            print(f"Error reading verdict store: {str(e)}")
+            return {}
+
+    def put_many(self, analyses):
+        """Store analyses returned by the model, full or triage"""
+        if not self.enabled or not analyses:
+            return
+        rows = []
+        now = time.time()
+        for analysis in analyses:
+            name_key = normalize_name(analysis.get('name'))
+            if not name_key:
+                continue
+            verdict = {field: analysis.get(field) for field in VERDICT_FIELDS if field in analysis}
+            competing_categories = self._competing_categories(analysis)
+            rows.append((
+                name_key, analysis.get('name'), self.partners_hash, json.dumps(self.category_hashes),
+                self.criteria_hash, json.dumps(competing_categories), json.dumps(verdict), now
+            ))
+        if not rows:
+            return
+
+        try:
+            connection = self._connect()
+            try:
+                connection.executemany("INSERT OR REPLACE INTO verdicts VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                connection.commit()
+            finally:
+                connection.close()
+        except (OSError, sqlite3.Error) as e:
+            print(f"Error writing verdict store: {str(e)}")
@@ -0,0 +1,86 @@
+import os
+import gzip
+import json
+import time
+import decimal
+
+from flask import Response
+
+from static_assets import accepted_encodings
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Responses smaller than this go out uncompressed: the headers would eat the saving
+MIN_COMPRESS_BYTES = int(os.environ.get("JSON_MIN_COMPRESS_BYTES", 1024))
+
+# Dynamic responses are compressed per request, so favour speed over ratio
+BROTLI_QUALITY = int(os.environ.get("JSON_BROTLI_QUALITY", 5))
+GZIP_LEVEL = int(os.environ.get("JSON_GZIP_LEVEL", 6))
+
+
+def _default(obj):
+    """Types Flask's JSON provider accepts that orjson doesn't"""
+    if isinstance(obj, decimal.Decimal):
+        return str(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if hasattr(obj, "__html__"):
+        return str(obj.__html__())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(payload):
+    """Serialize to UTF-8 JSON bytes, with orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(payload, default=_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(payload, default=_default, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def compress(body, accept_encoding):
+    """(body, Content-Encoding) for the best coding the client accepts; encoding is None when sent as is"""
+    if len(body) < MIN_COMPRESS_BYTES:
+        return body, None
+    accepted = accepted_encodings(accept_encoding)
+    if brotli is not None and "br" in accepted:
+        return brotli.compress(body, quality=BROTLI_QUALITY), "br"
+    if "gzip" in accepted:
+        return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0), "gzip"
+    return body, None
+
+
+def json_response(payload, status=200, accept_encoding=None):
+    """A Flask JSON response encoded with orjson and compressed for the client
+
+    Encode and compress times go out in a Server-Timing header, and the sizes
+    before and after compression are kept on response.payload_stats.
+    """
+    started = time.perf_counter()
+    body = dumps(payload)
+    encoded = time.perf_counter()
+    sent, encoding = compress(body, accept_encoding)
+    compressed = time.perf_counter()
+
+    response = Response(sent, status=status, mimetype="application/json")
+    response.headers["Vary"] = "Accept-Encoding"
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    response.headers["Server-Timing"] = (
+        f"encode;dur={(encoded - started) * 1000:.2f}, compress;dur={(compressed - encoded) * 1000:.2f}"
+    )
+    response.payload_stats = {
+        "json_bytes": len(body),
+        "sent_bytes": len(sent),
+        "encoding": encoding or "identity",
+        "encode_ms": round((encoded - started) * 1000, 2),
+        "compress_ms": round((compressed - encoded) * 1000, 2),
+        "encoder": "orjson" if orjson is not None else "json",
+    }
+    return response
@@ -0,0 +1,70 @@
+import json
+
+
+class ArrayItemStream:
+    """Incremental parser that emits the objects of one top-level array as they close
+
+    Feed it pieces of a JSON document such as {"companies": [{...}, {...}]}
+    while a model is still writing it. Each element of the array under
+    `key` is parsed and handed to `on_item` as soon as its closing brace
+    arrives, so a truncated response still yields every complete element.
+    Everything else in the document is only scanned, never parsed.
+    """
+
+    def __init__(self, key, on_item):
+        self.key = key
+        self.on_item = on_item
+        self.items = []
+        self.errors = 0
+        self._buffer = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._string = []
+        self._last_string = None
+        self._array_depth = None
+        self._item = None
+
+    def feed(self, text):
+        for char in text or "":
+            if self._item is not None:
+                self._item.append(char)
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    self._last_string = "".join(self._string)
+                else:
+                    self._string.append(char)
+                continue
+
+            if char == '"':
+                self._in_string = True
+                self._string = []
+            elif char in "{[":
+                self._depth += 1
+                if char == "[" and self._array_depth is None and self._depth == 2 and self._last_string == self.key:
+                    self._array_depth = self._depth
+                elif char == "{" and self._array_depth is not None and self._depth == self._array_depth + 1:
+                    self._item = [char]
+            elif char in "}]":
+                if char == "}" and self._item is not None and self._depth == self._array_depth + 1:
+                    self._emit("".join(self._item))
+                    self._item = None
+                elif char == "]" and self._array_depth is not None and self._depth == self._array_depth:
+                    self._array_depth = -1  # done with the array, ignore any later ones
+                self._depth -= 1
+
+    def _emit(self, text):
+        try:
+            item = json.loads(text)
+        except ValueError:
+            self.errors += 1
+            return
+        self.items.append(item)
+        if self.on_item:
+            self.on_item(item)
@@ -0,0 +1,45 @@
+import threading
+
+
+class LazyClient:
+    """Stands in for a client that is only created on first use
+
+    `factory` builds the client (or returns None when it isn't configured)
+    the first time an attribute is read or the proxy is tested for truth,
+    so `if client:` and `client.table(...)` keep working at existing call
+    sites while importing the module stays cheap.
+    """
+
+    def __init__(self, factory, name="client"):
+        self._factory = factory
+        self._name = name
+        self._client = None
+        self._created = False
+        self._lock = threading.Lock()
+
+    def get(self):
+        """The real client, creating it on the first call; None when unavailable"""
+        if not self._created:
+            with self._lock:
+                if not self._created:
+                    self._client = self._factory()
+                    self._created = True
+        return self._client
+
+    @property
+    def initialized(self):
+        return self._created
+
+    def __bool__(self):
+        return self.get() is not None
+
+    def __getattr__(self, name):
+        client = self.get()
+        if client is None:
+            raise AttributeError(f"{self._name} is not available (not configured or failed to initialize)")
+        return getattr(client, name)
+
+    def __repr__(self):
+        if not self._created:
+            return f"<LazyClient {self._name} (not created yet)>"
+        return repr(self._client)
@@ -0,0 +1,62 @@
+import zipfile
+
+
+class _ChunkSink:
+    """Write-only file object that hands written bytes back to a generator
+
+    zipfile falls back to data descriptors when the target cannot seek, so
+    entries can be streamed out as soon as they are written instead of
+    building the whole archive in an io.BytesIO.
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        """Return everything written since the last drain"""
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_zip(entries, compression=zipfile.ZIP_DEFLATED):
+    """Yield a zip archive incrementally
+
+    Args:
+        entries (iterable): (filename, bytes) pairs, consumed lazily
+        compression (int): zipfile compression method
+
+    Yields:
+        bytes: Chunks of the archive, one or more per entry plus the
+        central directory at the end
+    """
+    sink = _ChunkSink()
+    used_names = set()
+
+    with zipfile.ZipFile(sink, mode='w', compression=compression) as archive:
+        for filename, data in entries:
+            # Keep duplicate names from silently shadowing each other
+            name = filename
+            counter = 2
+            while name in used_names:
+                stem, dot, ext = filename.rpartition('.')
+                name = f"{stem}_{counter}.{ext}" if dot else f"{filename}_{counter}"
+                counter += 1
+            used_names.add(name)
+
+            archive.writestr(name, data)
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+
+    # Closing the archive writes the central directory
+    chunk = sink.drain()
+    if chunk:
+        yield chunk
@@ -24,7 +24,7 @@ from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse, FileResponse
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
-from openai import OpenAI
+from app.services.openai_provider import get_openai_client
 from supabase import create_client, Client
 
 from reportlab.lib import colors
@@ -59,7 +59,7 @@ supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
 # --- OpenAI Setup ---
 openai_api_key = os.getenv("OPENAI_API_KEY")
-openai = OpenAI(api_key=openai_api_key)
+openai = get_openai_client(openai_api_key)
 
 # (Placeholder for endpoints, utilities, and PDF generation logic)
 
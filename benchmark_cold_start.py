@@ -0,0 +1,118 @@
+import os
+import sys
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# What a serverless cold start may spend importing the app, in milliseconds
+COLD_START_BUDGET_MS = float(os.environ.get("COLD_START_BUDGET_MS", 600))
+
+# Slow imports that are only loaded on first use; a cold start that pulls one in fails the check
+DEFERRED_MODULES = ("openai", "supabase", "reportlab")
+
+# Route-scoped serverless entrypoints (see app/serverless.py)
+SERVERLESS_FUNCTIONS = [
+    "api/partners.py",
+    "api/research.py",
+    "netlify/functions/partners.py",
+    "netlify/functions/research.py",
+]
+
+# Runs in a fresh interpreter: import the target file the way a handler would and report time and peak memory
+IMPORT_SNIPPET = """
+import sys, time, resource, importlib.util
+started = time.perf_counter()
+spec = importlib.util.spec_from_file_location("cold_start_target", {path!r})
+module = importlib.util.module_from_spec(spec)
+sys.modules[spec.name] = module
+spec.loader.exec_module(module)
+print("COLD_START_MS", (time.perf_counter() - started) * 1000)
+print("PEAK_RSS_KB", resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def parse_importtime(stderr):
+    """(module, self_us, cumulative_us) for every line of -X importtime output"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        rows.append((name[1:].rstrip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def cold_start(path):
+    """Import `path` once in a new interpreter; returns (ms, peak RSS in KB, importtime rows)"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", IMPORT_SNIPPET.format(path=path)],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {path} failed:\n{result.stderr[-2000:]}")
+    values = dict(line.split(" ", 1) for line in result.stdout.splitlines() if line.startswith(("COLD_START_MS", "PEAK_RSS_KB")))
+    return float(values["COLD_START_MS"]), int(values["PEAK_RSS_KB"]), parse_importtime(result.stderr)
+
+
+def measure(path, runs):
+    """Median import time and peak memory over `runs` cold starts, plus the last run's import profile"""
+    timings, memory = [], []
+    for _ in range(runs):
+        ms, rss_kb, rows = cold_start(path)
+        timings.append(ms)
+        memory.append(rss_kb)
+    imported = {name.strip() for name, _, _ in rows}
+    deferred = sorted(
+        module for module in DEFERRED_MODULES
+        if any(name == module or name.startswith(module + ".") for name in imported)
+    )
+    return {
+        "median_ms": round(statistics.median(timings), 1),
+        "min_ms": round(min(timings), 1),
+        "peak_rss_mb": round(statistics.median(memory) / 1024, 1),
+        "modules": len(rows),
+        "deferred_imported": deferred,
+        "rows": rows,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start import time of the app, checked against a budget")
+    parser.add_argument("--target", action="append",
+                        help="File to import, relative to the repo root (repeatable; default app.py)")
+    parser.add_argument("--functions", action="store_true",
+                        help="Measure app.py and every route-scoped serverless function")
+    parser.add_argument("--runs", type=int, default=5, help="Cold starts to take the median of")
+    parser.add_argument("--budget-ms", type=float, default=COLD_START_BUDGET_MS, help="Fail above this median import time")
+    parser.add_argument("--top", type=int, default=15, help="Slowest top-level imports to list")
+    args = parser.parse_args()
+
+    targets = args.target or (["app.py"] + SERVERLESS_FUNCTIONS if args.functions else ["app.py"])
+
+    failures = []
+    for target in targets:
+        result = measure(os.path.join(ROOT, target), args.runs)
+
+        print(f"{target}: median {result['median_ms']}ms (min {result['min_ms']}ms) over {args.runs} cold starts, "
+              f"{result['modules']} modules, peak RSS {result['peak_rss_mb']}MB")
+        if args.top:
+            print("Slowest top-level imports:")
+        top_level = [row for row in result["rows"] if not row[0].startswith(" ")]
+        for name, _, cumulative_us in sorted(top_level, key=lambda row: row[2], reverse=True)[:args.top]:
+            print(f"  {cumulative_us / 1000:8.1f}ms  {name}")
+
+        if result["median_ms"] > args.budget_ms:
+            failures.append(f"{target}: median {result['median_ms']}ms is over the {args.budget_ms:.0f}ms budget")
+        if result["deferred_imported"]:
+            failures.append(f"{target}: imported at startup: {', '.join(result['deferred_imported'])}")
+
+    if failures:
+        print("FAIL: " + "; ".join(failures))
+        sys.exit(1)
+    print(f"OK: within the {args.budget_ms:.0f}ms budget")
+
+
+if __name__ == "__main__":
+    main()
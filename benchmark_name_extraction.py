@@ -0,0 +1,178 @@
+import os
+import sys
+import json
+import glob
+import time
+import argparse
+import traceback
+
+from dotenv import load_dotenv
+
+from app.services.chunk_planner import estimate_tokens
+from app.services.context_budget import build_search_context, CONTEXT_TOKEN_BUDGET
+from app.services.name_extractor import extract_names_locally, normalize_name, VERIFY_CONTEXT_BUDGET
+
+# Load environment variables
+load_dotenv()
+
+# Roughly what the model writes back: a JSON array of 40 names
+COMPLETION_TOKENS_ESTIMATE = 400
+
+GPT_PROMPT = """
+Based on the search results about the {industry} industry, identify the top 40 companies in this industry.
+Return ONLY a JSON array of company names, nothing else.
+
+SEARCH RESULTS:
+{context}
+"""
+
+VERIFY_PROMPT = """
+Based on the search results about the {industry} industry, identify the top 40 companies in this industry.
+An automatic extractor proposed the candidates below. Some may not be companies in this industry and
+some companies from the search results may be missing. Remove the wrong ones and add the missing ones.
+Return ONLY a JSON array of company names, nothing else.
+
+CANDIDATES:
+{candidates}
+
+SEARCH RESULTS:
+{context}
+"""
+
+
+def load_recordings(directory):
+    """Load search results saved by record_search_results (SEARCH_RECORDINGS_DIR)"""
+    recordings = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.json"))):
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+            if data.get('results'):
+                recordings.append((os.path.basename(path), data.get('industry', ''), data['results']))
+        except (OSError, ValueError) as e:
+            print(f"Skipping {path}: {str(e)}")
+    return recordings
+
+
+def ask_gpt(client, prompt):
+    """Run the extraction prompt, returning (names, seconds, total tokens)"""
+    started = time.time()
+    response = client.chat.completions.create(
+        model="gpt-4o",
+        messages=[
+            {"role": "system", "content": "You are a business analyst. Return ONLY a JSON array of company names."},
+            {"role": "user", "content": prompt}
+        ],
+        temperature=0.1
+    )
+    elapsed = time.time() - started
+    content = response.choices[0].message.content.strip()
+    if content.startswith('```'):
+        content = content.strip('`').split('\n', 1)[-1]
+    try:
+        names = json.loads(content)
+    except ValueError:
+        names = []
+    return names, elapsed, response.usage.total_tokens if response.usage else 0
+
+
+def overlap(names, reference):
+    """Share of the reference names also found in names"""
+    reference_keys = {normalize_name(n) for n in reference if n}
+    if not reference_keys:
+        return 0.0
+    keys = {normalize_name(n) for n in names if n}
+    return len(keys & reference_keys) / len(reference_keys)
+
+
+def benchmark(recordings, gazetteer, with_gpt=False):
+    client = None
+    if with_gpt:
+        from app.services.openai_provider import get_openai_client
+        client = get_openai_client()
+
+    totals = {"baseline_tokens": 0, "new_tokens": 0, "local_ms": 0.0, "gpt_calls": 0,
+              "baseline_seconds": 0.0, "new_seconds": 0.0}
+    for name, industry, results in recordings:
+        started = time.time()
+        local = extract_names_locally(results, industry, gazetteer=gazetteer)
+        local_ms = (time.time() - started) * 1000
+        totals["local_ms"] += local_ms
+
+        baseline_context, _ = build_search_context(results, industry, CONTEXT_TOKEN_BUDGET)
+        baseline_prompt = GPT_PROMPT.format(industry=industry, context=baseline_context)
+        baseline_tokens = estimate_tokens(baseline_prompt) + COMPLETION_TOKENS_ESTIMATE
+
+        verify_prompt = None
+        if not local['needs_verification']:
+            new_tokens = 0
+        elif local['companies']:
+            verify_context, _ = build_search_context(results, industry, VERIFY_CONTEXT_BUDGET)
+            verify_prompt = VERIFY_PROMPT.format(
+                industry=industry, candidates=json.dumps(local['companies'][:60]), context=verify_context
+            )
+            new_tokens = estimate_tokens(verify_prompt) + COMPLETION_TOKENS_ESTIMATE
+        else:
+            verify_prompt = baseline_prompt
+            new_tokens = baseline_tokens
+        totals["baseline_tokens"] += baseline_tokens
+        totals["new_tokens"] += new_tokens
+        totals["gpt_calls"] += 1 if verify_prompt else 0
+
+        print(f"\n{name} ({industry}): {len(results)} results")
+        print(f"  local: {len(local['companies'])} companies, confidence {local['confidence']}, "
+              f"{local_ms:.1f}ms, verify={local['needs_verification']}")
+        print(f"  tokens (estimated): baseline {baseline_tokens}, new {new_tokens}")
+
+        if client:
+            try:
+                gpt_names, gpt_seconds, gpt_tokens = ask_gpt(client, baseline_prompt)
+                totals["baseline_seconds"] += gpt_seconds
+                new_names, new_seconds = local['companies'][:40], local_ms / 1000
+                if verify_prompt:
+                    new_names, verify_seconds, verify_tokens = ask_gpt(client, verify_prompt)
+                    new_seconds += verify_seconds
+                    print(f"  verify call: {verify_seconds:.2f}s, {verify_tokens} tokens")
+                totals["new_seconds"] += new_seconds
+                print(f"  baseline GPT: {gpt_seconds:.2f}s, {gpt_tokens} tokens, {len(gpt_names)} names")
+                print(f"  new path: {new_seconds:.2f}s, {len(new_names)} names, "
+                      f"{overlap(new_names, gpt_names):.0%} of baseline names found")
+            except Exception as e:
+                print(f"  GPT comparison failed: {str(e)}")
+                traceback.print_exc()
+
+    count = len(recordings)
+    saved = totals["baseline_tokens"] - totals["new_tokens"]
+    print(f"\n{count} recordings: {totals['gpt_calls']} still needed GPT")
+    print(f"Local extraction: {totals['local_ms'] / count:.1f}ms average")
+    print(f"Tokens: baseline {totals['baseline_tokens']}, new {totals['new_tokens']} "
+          f"(saved {saved}, {saved / max(1, totals['baseline_tokens']):.0%})")
+    if client:
+        print(f"Latency: baseline {totals['baseline_seconds'] / count:.2f}s, "
+              f"new {totals['new_seconds'] / count:.2f}s average")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare local company name extraction with the GPT-only path")
+    parser.add_argument("--recordings", default=os.environ.get("SEARCH_RECORDINGS_DIR", "search_recordings"),
+                        help="Directory of recorded search results (set SEARCH_RECORDINGS_DIR while searching)")
+    parser.add_argument("--gazetteer", help="Optional JSON file with a list of known company names")
+    parser.add_argument("--with-gpt", action="store_true", help="Also call OpenAI to measure real latency and overlap")
+    args = parser.parse_args()
+
+    recordings = load_recordings(args.recordings)
+    if not recordings:
+        print(f"No recordings found in {args.recordings}")
+        return 1
+
+    gazetteer = []
+    if args.gazetteer:
+        with open(args.gazetteer, 'r') as f:
+            gazetteer = json.load(f)
+
+    benchmark(recordings, gazetteer, with_gpt=args.with_gpt)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
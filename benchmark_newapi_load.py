@@ -0,0 +1,116 @@
+import os
+import sys
+import time
+import asyncio
+import argparse
+import statistics
+
+import httpx
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+from NEWAPI import config, db
+from NEWAPI.main import app
+
+DEFAULT_PATHS = [
+    "/api/top-partners/?limit=10",
+    "/api/potential-partners/?sort_by=score",
+    "/api/partner-research/1",
+    "/api/generate-research/company-research/Nike",
+]
+
+
+class FakeQuery:
+    """Stands in for a Supabase query builder; execute() sleeps like a PostgREST round-trip"""
+
+    def __init__(self, latency):
+        self.latency = latency
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        time.sleep(self.latency)
+        return ("data", [{"id": 1, "name": "Example", "partnership_score": 9}]), ("count", None)
+
+
+class FakeSupabase:
+    def __init__(self, latency):
+        self.latency = latency
+
+    def table(self, name):
+        return FakeQuery(self.latency)
+
+
+async def blocking_execute(query):
+    """The old behaviour: execute() straight on the event loop"""
+    return query.execute()
+
+
+async def run_load(paths, total, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadtest") as client:
+        async def one(index):
+            nonlocal errors
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.get(paths[index % len(paths)])
+                latencies.append(time.perf_counter() - started)
+                if response.status_code >= 500:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": total,
+        "seconds": round(elapsed, 3),
+        "requests_per_second": round(total / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 1),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 1),
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent-request throughput of the NEWAPI database endpoints")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per run")
+    parser.add_argument("--concurrency", type=int, default=50, help="Requests in flight at once")
+    parser.add_argument("--latency", type=float, default=0.05, help="Simulated PostgREST round-trip in seconds")
+    parser.add_argument("--live", action="store_true", help="Query the real Supabase project instead of a simulated one")
+    parser.add_argument("--path", action="append", help="Endpoint to request (repeatable); defaults to the four read endpoints")
+    args = parser.parse_args()
+
+    if args.live:
+        if not config.supabase:
+            print("Error: --live needs SUPABASE_URL and SUPABASE_ANON_KEY")
+            sys.exit(1)
+    else:
+        config.supabase = FakeSupabase(args.latency)
+
+    paths = args.path or DEFAULT_PATHS
+    print(f"{args.requests} requests, {args.concurrency} concurrent, "
+          f"{'live Supabase' if args.live else f'{args.latency * 1000:.0f}ms simulated round-trip'}, "
+          f"{db.DB_MAX_WORKERS} database threads")
+
+    pooled_execute = db.execute
+    results = {}
+    for mode, execute in (("blocking", blocking_execute), ("thread pool", pooled_execute)):
+        db.execute = execute
+        results[mode] = asyncio.run(run_load(paths, args.requests, args.concurrency))
+        print(f"{mode:>12}: {results[mode]}")
+    db.execute = pooled_execute
+
+    speedup = results["thread pool"]["requests_per_second"] / results["blocking"]["requests_per_second"]
+    print(f"Throughput: {speedup:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
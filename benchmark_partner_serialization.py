@@ -0,0 +1,95 @@
+import time
+import json
+import random
+import asyncio
+import argparse
+import statistics
+
+import httpx
+from fastapi import FastAPI
+
+from fastapi_swagger.app.models import PartnersResponse, PartnerResponse
+from fastapi_swagger.app.responses import TrustedJSONResponse, trusted, trusted_list, orjson
+
+INDUSTRIES = ["Sports Technology", "Fan Engagement", "Ticketing", "Sports Media", "Esports", "Analytics"]
+
+
+def make_partners(count):
+    """Rows shaped like potential_partners, including columns the response model doesn't declare"""
+    rng = random.Random(5)
+    return [
+        {
+            "id": index,
+            "name": f"Partner {index}",
+            "description": "Builds fan engagement and ticketing software for professional sports teams.",
+            "industry": rng.choice(INDUSTRIES),
+            "score": round(rng.uniform(0, 10), 1),
+            "leadership": ["Alex Morgan - CEO", "Sam Lee - CTO"],
+            "products": ["Ticketing platform", "Fan app"],
+            "opportunities": ["Co-branded fan experiences", "In-arena activations"],
+            "market_analysis": {"growth_trajectory": "Strong growth", "market_position": "Emerging player"},
+            "partnership_potential": {"strategic_alignment": rng.randint(5, 10), "overall_recommendation": "Recommended"},
+            "headquarters": "Toronto, Ontario, Canada",
+            "website": f"https://partner{index}.example.com",
+            "company_size": "51-200",
+            "logo_url": f"https://logo.clearbit.com/partner{index}.example.com",
+            "created_at": "2025-03-01T12:00:00",
+            "last_updated": "2025-03-02T12:00:00",
+            "search_query": "sports technology",
+        }
+        for index in range(count)
+    ]
+
+
+def build_app(partners):
+    app = FastAPI()
+
+    # Before: validate every row into a model, then FastAPI validates and encodes it again through response_model
+    @app.get("/before", response_model=PartnersResponse)
+    async def before():
+        return PartnersResponse(
+            partners=[PartnerResponse(**p) for p in partners],
+            metadata={'total_partners': len(partners)}
+        )
+
+    # After: the fast path used by fastapi_swagger/app/routes/potential_partners.py
+    @app.get("/after", response_model=PartnersResponse)
+    async def after():
+        return TrustedJSONResponse(trusted(PartnersResponse, dict(
+            partners=trusted_list(PartnerResponse, partners),
+            metadata={'total_partners': len(partners)}
+        )))
+
+    return app
+
+
+async def measure(app, path, runs):
+    """Median request time in ms and the last response body"""
+    timings = []
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark") as client:
+        for _ in range(runs):
+            started = time.perf_counter()
+            response = await client.get(path)
+            timings.append((time.perf_counter() - started) * 1000)
+            response.raise_for_status()
+    return round(statistics.median(timings), 1), response.content
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Partner list serialization: validated response_model path against the trusted fast path")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000], help="Partner counts to test")
+    parser.add_argument("--runs", type=int, default=5, help="Requests to take the median of")
+    args = parser.parse_args()
+
+    print(f"Encoder: {'orjson' if orjson else 'json'}")
+    for size in args.sizes:
+        app = build_app(make_partners(size))
+        before_ms, before_body = asyncio.run(measure(app, "/before", args.runs))
+        after_ms, after_body = asyncio.run(measure(app, "/after", args.runs))
+        same = json.loads(before_body) == json.loads(after_body)
+        print(f"{size:>7} partners: before {before_ms:>8.1f}ms, after {after_ms:>7.1f}ms "
+              f"({before_ms / after_ms:.1f}x), {len(after_body) / 1024:,.0f}KB, same JSON: {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+import os
+import sys
+import json
+import glob
+import time
+import random
+import string
+import argparse
+import statistics
+import contextlib
+import importlib.util
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+from app.utils import json_response as encoder
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# A browser's Accept-Encoding
+BROWSER_ENCODINGS = "gzip, deflate, br"
+
+
+def load_app():
+    spec = importlib.util.spec_from_file_location("app_main", os.path.join(ROOT, "app.py"))
+    app_main = importlib.util.module_from_spec(spec)
+    sys.modules["app_main"] = app_main
+    spec.loader.exec_module(app_main)
+    return app_main
+
+
+def load_search_results(directory):
+    """Search results from the newest recording (SEARCH_RECORDINGS_DIR), or 40 synthetic pages"""
+    paths = sorted(glob.glob(os.path.join(directory, "*.json")))
+    if paths:
+        with open(paths[-1], 'r') as f:
+            return os.path.basename(paths[-1]), json.load(f)['results']
+
+    rng = random.Random(11)
+    words = ["".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(2, 11))) for _ in range(3000)]
+    results = []
+    for index in range(40):
+        text = " ".join(rng.choice(words) for _ in range(1400))
+        results.append({"title": f"Top companies in sports technology, part {index + 1}",
+                        "url": f"https://example.com/articles/{index + 1}", "text": text})
+    return "synthetic (40 pages)", results
+
+
+def build_payload(app_main, search_results, company_count):
+    """A completed /api/search payload: companies carry mock Coresignal data"""
+    companies = []
+    with contextlib.redirect_stdout(open(os.devnull, 'w')):
+        for index in range(company_count):
+            name = f"Company {index + 1}"
+            companies.append({
+                "name": name,
+                "description": f"{name} builds fan engagement and ticketing software for professional teams.",
+                "total_score": 70 - index,
+                "partnership_score": round(7 - index / 10, 1),
+                "competes_with_partners": index % 5 == 0,
+                "has_competition": index % 5 == 0,
+                "scores": {key: criteria["max_points"] // 2 for key, criteria in app_main.SCORING_CRITERIA.items()},
+                "leadership": [{"name": "Alex Morgan", "title": "CEO"}],
+                "products": ["Ticketing", "Fan app"],
+                "logo": f"/api/logos/company-{index + 1}",
+                "enriched": True,
+                "coresignal_data": app_main.generate_mock_coresignal_data(name),
+            })
+    return {
+        "industry": "sports technology",
+        "analysis": {"companies": companies, "industry_overview": "The sports technology industry " * 20},
+        "search_results": search_results,
+        "scoring_criteria": app_main.SCORING_CRITERIA,
+        "max_total_score": app_main.MAX_TOTAL_SCORE,
+        "timings": {"search_results": 2.1, "company_names": 3.4, "analysis": 21.7, "enrichment": 4.2},
+        "search_id": "0123456789abcdef",
+        "resumed_stages": []
+    }
+
+
+def measure(encode, runs):
+    """Median milliseconds of encode() and the bytes it returned"""
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        body = encode()
+        timings.append((time.perf_counter() - started) * 1000)
+    return round(statistics.median(timings), 2), len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bytes and encode time of one /api/search response per profile and encoder")
+    parser.add_argument("--recordings", default=os.environ.get("SEARCH_RECORDINGS_DIR", "search_recordings"),
+                        help="Directory of recorded search results; synthetic pages are used when empty")
+    parser.add_argument("--companies", type=int, default=20, help="Companies in the analysis")
+    parser.add_argument("--runs", type=int, default=20, help="Encodes to take the median of")
+    args = parser.parse_args()
+
+    app_main = load_app()
+    source, search_results = load_search_results(args.recordings)
+    full = build_payload(app_main, search_results, args.companies)
+    compact = app_main.compact_search_response(full, full["search_id"])
+
+    # Before: what jsonify() sent, uncompressed
+    rows = [("full", "jsonify (before)", "identity", lambda: app_main.app.json.dumps(full).encode("utf-8"))]
+
+    name = "orjson" if encoder.orjson else "json"
+    accepts = {"gzip": "gzip", "br": BROWSER_ENCODINGS} if encoder.brotli else {"gzip": "gzip"}
+    for profile, payload in (("full", full), ("compact", compact)):
+        rows.append((profile, name, "identity", lambda payload=payload: encoder.dumps(payload)))
+        for encoding, accept in accepts.items():
+            rows.append((profile, name, encoding,
+                         lambda payload=payload, accept=accept: encoder.compress(encoder.dumps(payload), accept)[0]))
+
+    print(f"Search results: {source}, {args.companies} companies, median of {args.runs} encodes")
+    print(f"  {'profile':<8} {'encoder':<17} {'encoding':<9} {'bytes':>10} {'encode+compress':>16}")
+    baseline_bytes = None
+    for profile, name, encoding, encode in rows:
+        ms, size = measure(encode, args.runs)
+        baseline_bytes = baseline_bytes or size
+        print(f"  {profile:<8} {name:<17} {encoding:<9} {size:>10,} {ms:>14.2f}ms  ({size / baseline_bytes:.1%} of before)")
+
+
+if __name__ == "__main__":
+    main()
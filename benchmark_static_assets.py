@@ -0,0 +1,195 @@
+import os
+import sys
+import time
+import random
+import string
+import asyncio
+import argparse
+import tempfile
+import statistics
+import importlib.util
+
+import httpx
+from dotenv import load_dotenv
+from flask import Flask, send_from_directory
+from fastapi import FastAPI
+from fastapi.responses import HTMLResponse
+
+# Load environment variables
+load_dotenv()
+
+from static_assets import StaticAssets, precompress
+
+BROWSER_HEADERS = {"Accept-Encoding": "gzip, deflate, br"}
+
+# A page load: the SPA shell for a client-side route plus its hashed bundles
+PAGE_PATHS = ["/", "/partners/42", "/assets/index-BfZ3kL_x.js", "/assets/vendor-C8dQ1aZk.js", "/assets/index-D4pe9Wq2.css"]
+
+
+def build_dist(directory):
+    """A Vite-shaped dist: index.html plus JS/CSS bundles of realistic size and redundancy"""
+    rng = random.Random(7)
+    words = ["".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 10))) for _ in range(400)]
+
+    def code(size):
+        lines = []
+        while sum(len(line) for line in lines) < size:
+            lines.append(f"function {rng.choice(words)}({rng.choice(words)}){{return {rng.choice(words)}.{rng.choice(words)}({rng.randint(0, 999)})}}\n")
+        return "".join(lines)
+
+    os.makedirs(os.path.join(directory, "assets"), exist_ok=True)
+    files = {
+        "index.html": "<!doctype html><html><head><meta charset=\"utf-8\"><title>MLSE Partner Research</title>"
+                      "<script type=\"module\" src=\"/assets/index-BfZ3kL_x.js\"></script>"
+                      "<link rel=\"stylesheet\" href=\"/assets/index-D4pe9Wq2.css\"></head>"
+                      "<body><div id=\"root\"></div></body></html>" + "<!-- " + code(1500) + " -->",
+        "assets/index-BfZ3kL_x.js": code(250_000),
+        "assets/vendor-C8dQ1aZk.js": code(600_000),
+        "assets/index-D4pe9Wq2.css": code(40_000),
+    }
+    for name, content in files.items():
+        with open(os.path.join(directory, name), "w") as f:
+            f.write(content)
+
+
+def flask_before(dist):
+    """The old catch-all: send_from_directory for files, index.html otherwise"""
+    app = Flask("before", static_folder=None)
+
+    @app.route('/', defaults={'path': ''})
+    @app.route('/<path:path>')
+    def serve(path):
+        if path and os.path.exists(os.path.join(dist, path)):
+            return send_from_directory(dist, path)
+        return send_from_directory(dist, 'index.html')
+
+    return app
+
+
+def flask_after(dist):
+    """app.py's serve() view, pointed at the benchmark dist"""
+    spec = importlib.util.spec_from_file_location("app_main", os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py"))
+    app_main = sys.modules.get("app_main")
+    if app_main is None:
+        app_main = importlib.util.module_from_spec(spec)
+        sys.modules["app_main"] = app_main
+        spec.loader.exec_module(app_main)
+    app_main.static_assets = StaticAssets(dist)
+
+    app = Flask("after", static_folder=None)
+    app.add_url_rule('/', 'serve', app_main.serve, defaults={'path': ''})
+    app.add_url_rule('/<path:path>', 'serve', app_main.serve)
+    return app
+
+
+def newapi_before(dist):
+    """The old NEWAPI catch-all: index.html re-read from disk on every request"""
+    app = FastAPI()
+
+    @app.get("/{full_path:path}")
+    async def serve_react_app(full_path: str):
+        index_path = os.path.join(dist, 'index.html')
+        if os.path.exists(index_path):
+            return HTMLResponse(content=open(index_path).read())
+        return HTMLResponse(content="Error: index.html not found", status_code=404)
+
+    return app
+
+
+def newapi_after(dist):
+    from NEWAPI import main
+    main.static_assets = StaticAssets(dist)
+    app = FastAPI()
+    app.get("/{full_path:path}")(main.serve_react_app)
+    return app
+
+
+def run_flask(app, paths, total, revisit):
+    """Sequential requests through the WSGI app; returns (requests per second, bytes sent, statuses)"""
+    client = app.test_client()
+    etags = {}
+    sent = 0
+    statuses = {}
+    started = time.perf_counter()
+    for index in range(total):
+        path = paths[index % len(paths)]
+        headers = dict(BROWSER_HEADERS)
+        if revisit and path in etags:
+            headers["If-None-Match"] = etags[path]
+        response = client.get(path, headers=headers)
+        body = response.get_data()
+        sent += len(body)
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        if response.headers.get("ETag"):
+            etags[path] = response.headers["ETag"]
+        response.close()
+    elapsed = time.perf_counter() - started
+    return round(total / elapsed, 1), sent, statuses
+
+
+async def run_asgi(app, paths, total, concurrency, revisit):
+    semaphore = asyncio.Semaphore(concurrency)
+    etags = {}
+    sent = 0
+    statuses = {}
+    latencies = []
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadtest") as client:
+        # Read the raw bytes on the wire, not what httpx decompresses them to
+        async def one(index):
+            nonlocal sent
+            path = paths[index % len(paths)]
+            headers = dict(BROWSER_HEADERS)
+            if revisit and path in etags:
+                headers["If-None-Match"] = etags[path]
+            async with semaphore:
+                started = time.perf_counter()
+                async with client.stream("GET", path, headers=headers) as response:
+                    async for chunk in response.aiter_raw():
+                        sent += len(chunk)
+                latencies.append(time.perf_counter() - started)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            if response.headers.get("etag"):
+                etags[path] = response.headers["etag"]
+
+        if revisit:
+            for index in range(len(paths)):
+                await one(index)
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        elapsed = time.perf_counter() - started
+
+    return round(total / elapsed, 1), sent, statuses, round(statistics.median(latencies) * 1000, 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Static frontend serving before and after the static asset layer")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per run")
+    parser.add_argument("--concurrency", type=int, default=20, help="NEWAPI requests in flight at once")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as dist:
+        build_dist(dist)
+        print(f"Precompressed {precompress(dist)} files")
+
+        print("\nFlask catch-all (first visit: shell + bundles; repeat visit: conditional requests)")
+        for label, factory in (("before", flask_before), ("after", flask_after)):
+            for revisit in (False, True):
+                app = factory(dist)
+                if revisit:
+                    run_flask(app, PAGE_PATHS, len(PAGE_PATHS), False)
+                rps, sent, statuses = run_flask(app, PAGE_PATHS, args.requests, revisit)
+                print(f"  {label:>6} {'repeat' if revisit else 'first':>6}: {rps:>8} req/s, "
+                      f"{sent / args.requests / 1024:8.1f} KB/request, statuses {statuses}")
+
+        print("\nNEWAPI catch-all (SPA routes only, index.html)")
+        shell_paths = ["/", "/partners/42", "/research/nike"]
+        for label, factory in (("before", newapi_before), ("after", newapi_after)):
+            for revisit in (False, True):
+                rps, sent, statuses, p50 = asyncio.run(run_asgi(factory(dist), shell_paths, args.requests, args.concurrency, revisit))
+                print(f"  {label:>6} {'repeat' if revisit else 'first':>6}: {rps:>8} req/s, p50 {p50}ms, "
+                      f"{sent / args.requests / 1024:8.2f} KB/request, statuses {statuses}")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,9 @@ cd dura-react
 npm run build
 cd ..
 
+# Precompress the build (.br/.gz next to each asset) for the static asset server
+python3 -m static_assets dura-react/dist
+
 # 2. Set up environment for production
 echo "Setting up production environment..."
 cp .env.production .env
@@ -298,7 +298,8 @@ const HomePage = ({ isHistoryModalOpen, setIsHistoryModalOpen }) => {
       // Try using our Replit-specific API service first
       try {
         const data = await replitApi.searchCompanies(query.trim(), {
-          api_key: openaiApiKey // Pass the API key to the backend
+          api_key: openaiApiKey, // Pass the API key to the backend
+          profile: 'compact' // Only the fields the results page renders
         });
         console.log('Search response from Replit API:', data);
         setSearchResults(data);
@@ -313,7 +314,8 @@ const HomePage = ({ isHistoryModalOpen, setIsHistoryModalOpen }) => {
       console.log('Falling back to direct axios call to /search');
       const response = await axios.post('/search', {
         query: query.trim(),
-        api_key: openaiApiKey // Pass the API key to the backend
+        api_key: openaiApiKey, // Pass the API key to the backend
+        profile: 'compact' // Only the fields the results page renders
       });
       console.log('Search response from direct axios:', response.data);
       setSearchResults(response.data);
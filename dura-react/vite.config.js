@@ -56,6 +56,11 @@ export default defineConfig({
         changeOrigin: true,
         secure: false
       },
+      '/api/logos': {
+        target: 'http://localhost:5020',
+        changeOrigin: true,
+        secure: false
+      },
       '/top-partners': {
         target: 'http://localhost:5020',
         changeOrigin: true,
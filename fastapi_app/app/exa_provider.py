@@ -0,0 +1,121 @@
+# Fork of app/services/exa_provider.py, which is the canonical Exa client; port fixes from there.
+# fastapi_app is built and deployed from its own directory (see Dockerfile), so it can't import
+# the root package. Deliberately left out: the upstream governor (per-upstream concurrency limit
+# and circuit breaker), request deadlines, stale-result fallback, the page cache and the async client.
+
+import os
+import threading
+import requests
+from typing import List, Dict, Optional
+
+try:
+    from exa_py import Exa
+except ImportError:
+    Exa = None
+
+EXA_SEARCH_URL = "https://api.exa.ai/search"
+
+# Number of search results per query
+EXA_NUM_RESULTS = int(os.environ.get("EXA_NUM_RESULTS", 40))
+
+# Page text is cut server-side so we never download (or prompt with) whole pages
+EXA_TEXT_MAX_CHARACTERS = int(os.environ.get("EXA_TEXT_MAX_CHARACTERS", 3000))
+
+# Highlights become the result snippet
+EXA_HIGHLIGHT_SENTENCES = int(os.environ.get("EXA_HIGHLIGHT_SENTENCES", 3))
+EXA_HIGHLIGHTS_PER_URL = int(os.environ.get("EXA_HIGHLIGHTS_PER_URL", 2))
+
+EXA_TIMEOUT = int(os.environ.get("EXA_TIMEOUT", 30))
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def _get_client(api_key: str):
+    """One exa-py client per API key, reused across searches"""
+    with _clients_lock:
+        client = _clients.get(api_key)
+        if client is None:
+            client = _clients[api_key] = Exa(api_key)
+        return client
+
+
+def _format_result(title: Optional[str], url: Optional[str], text: Optional[str], highlights: Optional[List[str]]) -> Dict[str, str]:
+    """Shape a result the way the rest of the app expects: {title, url, text, snippet}"""
+    snippet = " ... ".join(h.strip() for h in (highlights or []) if h and h.strip())
+    return {
+        "title": title or "",
+        "url": url or "",
+        "text": text or snippet,
+        "snippet": snippet
+    }
+
+
+def _search_with_sdk(query: str, api_key: str, num_results: int, max_characters: int, use_autoprompt: bool) -> List[Dict[str, str]]:
+    response = _get_client(api_key).search_and_contents(
+        query,
+        num_results=num_results,
+        use_autoprompt=use_autoprompt,
+        text={"max_characters": max_characters},
+        highlights={"num_sentences": EXA_HIGHLIGHT_SENTENCES, "highlights_per_url": EXA_HIGHLIGHTS_PER_URL}
+    )
+    return [
+        _format_result(
+            getattr(result, 'title', ''),
+            getattr(result, 'url', ''),
+            getattr(result, 'text', ''),
+            getattr(result, 'highlights', None)
+        )
+        for result in (response.results or [])
+    ]
+
+
+def _search_with_rest(query: str, api_key: str, num_results: int, max_characters: int, use_autoprompt: bool) -> List[Dict[str, str]]:
+    response = requests.post(
+        EXA_SEARCH_URL,
+        headers={"x-api-key": api_key, "Content-Type": "application/json"},
+        json={
+            "query": query,
+            "numResults": num_results,
+            "useAutoprompt": use_autoprompt,
+            "contents": {
+                "text": {"maxCharacters": max_characters},
+                "highlights": {"numSentences": EXA_HIGHLIGHT_SENTENCES, "highlightsPerUrl": EXA_HIGHLIGHTS_PER_URL}
+            }
+        },
+        timeout=EXA_TIMEOUT
+    )
+    if response.status_code != 200:
+        raise RuntimeError(f"Exa API returned {response.status_code}: {response.text[:500]}")
+    return [
+        _format_result(result.get('title'), result.get('url'), result.get('text'), result.get('highlights'))
+        for result in response.json().get('results', [])
+    ]
+
+
+def search_with_contents(
+    query: str,
+    api_key: str,
+    num_results: int = EXA_NUM_RESULTS,
+    max_characters: int = EXA_TEXT_MAX_CHARACTERS,
+    use_autoprompt: bool = True
+) -> List[Dict[str, str]]:
+    """
+    Run an Exa search and get capped page text plus highlights in the same request.
+    Uses exa-py's search_and_contents when installed, the REST /search "contents" option otherwise.
+    """
+    if Exa is not None:
+        try:
+            return _search_with_sdk(query, api_key, num_results, max_characters, use_autoprompt)
+        except (AttributeError, TypeError, ValueError) as e:
+            if not _sdk_unsupported(e):
+                raise
+            print(f"exa-py can't run this search, falling back to REST: {str(e)}")
+    return _search_with_rest(query, api_key, num_results, max_characters, use_autoprompt)
+
+
+def _sdk_unsupported(error: Exception) -> bool:
+    """Whether exa-py failed for lack of support (missing method, rejected option) rather than a failed request"""
+    if isinstance(error, (AttributeError, TypeError)):
+        return True
+    return isinstance(error, ValueError) and str(error).startswith(("Invalid option", "Invalid type for option"))
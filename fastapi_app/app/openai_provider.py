@@ -0,0 +1,78 @@
+# Fork of app/services/openai_provider.py, which is the canonical OpenAI client setup; port fixes
+# from there. fastapi_app is built and deployed from its own directory (see Dockerfile), so it can't
+# import the root package. Deliberately left out: the governed transport, which routes every call
+# through the upstream governor and clamp timeouts to the request deadline.
+
+import os
+import atexit
+import threading
+from typing import Dict, Optional
+
+import httpx
+from openai import OpenAI
+
+try:
+    import h2  # noqa: F401  (httpx needs it for HTTP/2)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+OPENAI_TIMEOUT = float(os.environ.get("OPENAI_TIMEOUT", 60))
+OPENAI_CONNECT_TIMEOUT = float(os.environ.get("OPENAI_CONNECT_TIMEOUT", 10))
+
+# Connection pool shared by every request in the process. Idle connections are kept
+# long enough to span the gaps between the calls of one search.
+OPENAI_MAX_CONNECTIONS = int(os.environ.get("OPENAI_MAX_CONNECTIONS", 100))
+OPENAI_MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get("OPENAI_MAX_KEEPALIVE_CONNECTIONS", 20))
+OPENAI_KEEPALIVE_EXPIRY = float(os.environ.get("OPENAI_KEEPALIVE_EXPIRY", 120))
+
+# HTTP/2 multiplexes concurrent calls over one connection; only used when h2 is installed
+OPENAI_HTTP2 = os.environ.get("OPENAI_HTTP2", "true").lower() != "false" and HTTP2_AVAILABLE
+
+# Retries for connection errors, 408, 409, 429 and 5xx, with the SDK's exponential backoff
+# (honouring Retry-After).
+OPENAI_MAX_RETRIES = int(os.environ.get("OPENAI_MAX_RETRIES", 3))
+
+_clients: Dict[str, OpenAI] = {}
+_lock = threading.Lock()
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=OPENAI_MAX_CONNECTIONS,
+        max_keepalive_connections=OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=OPENAI_KEEPALIVE_EXPIRY
+    )
+
+
+def _timeout() -> httpx.Timeout:
+    return httpx.Timeout(OPENAI_TIMEOUT, connect=OPENAI_CONNECT_TIMEOUT)
+
+
+def get_openai_client(api_key: Optional[str] = None) -> Optional[OpenAI]:
+    """The process-wide OpenAI client for an API key (OPENAI_API_KEY by default)
+
+    Returns None when no key is configured, so callers keep their existing
+    "client not available" handling.
+    """
+    api_key = api_key or os.environ.get("OPENAI_API_KEY")
+    if not api_key:
+        return None
+    with _lock:
+        client = _clients.get(api_key)
+        if client is None:
+            client = _clients[api_key] = OpenAI(
+                api_key=api_key,
+                max_retries=OPENAI_MAX_RETRIES,
+                timeout=_timeout(),
+                http_client=httpx.Client(timeout=_timeout(), limits=_limits(), http2=OPENAI_HTTP2)
+            )
+        return client
+
+
+@atexit.register
+def close_clients() -> None:
+    with _lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
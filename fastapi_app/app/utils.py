@@ -3,10 +3,12 @@ import json
 import requests
 from typing import List, Dict, Any
 import re
-from openai import OpenAI
 from datetime import datetime
 import traceback
 
+from .exa_provider import search_with_contents
+from .openai_provider import get_openai_client
+
 # Constants
 CURRENT_PARTNERS = [
     {"name": "Example Partner 1", "industry": "Technology"},
@@ -44,26 +46,11 @@ def search_companies_in_industry(industry: str, api_key: str) -> List[Dict[str,
     try:
         # Prepare the query for company search
         query = f"top companies in {industry} industry"
-        
-        # Make the request to Exa API
-        url = "https://api.exa.ai/search"
-        headers = {
-            "x-api-key": api_key,
-            "Content-Type": "application/json"
-        }
-        data = {
-            "query": query,
-            "num_results": 30,  # Increased from 20 to get more potential companies
-            "use_autoprompt": True
-        }
-        
-        response = requests.post(url, headers=headers, json=data)
-        response.raise_for_status()
-        
-        # Parse the response
-        results = response.json().get("results", [])
+
+        # Results come back with capped page text and highlights in a single request
+        results = search_with_contents(query, api_key, num_results=30)
         print(f"Found {len(results)} results from Exa for industry: {industry}")
-        
+
         return results
     except Exception as e:
         print(f"Error searching companies in industry: {str(e)}")
@@ -76,7 +63,7 @@ def extract_company_names(search_results: List[Dict[str, Any]], industry: str) -
     """
     try:
         # Use OpenAI to extract company names from search results
-        client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        client = get_openai_client()
         
         # Format search results for LLM
         formatted_results = []
@@ -155,7 +142,7 @@ def generate_company_analysis(company_names: List[str], industry: str) -> Dict[s
     """
     try:
         # Use OpenAI to analyze companies
-        client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        client = get_openai_client()
         
         # Convert current partner list to a formatted string
         current_partners_str = "\n".join([f"- {p['name']} ({p['industry']})" for p in CURRENT_PARTNERS])
@@ -230,7 +217,7 @@ def process_company(company: Dict[str, Any]) -> Dict[str, Any]:
         name = company.get('name', '')
         
         # Get OpenAI client
-        client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        client = get_openai_client()
         
         # Generate additional insights
         prompt = f"""
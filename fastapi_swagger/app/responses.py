@@ -0,0 +1,56 @@
+import json
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Tuple, Type
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+@lru_cache(maxsize=None)
+def _fields(model: Type[BaseModel]) -> Tuple[Tuple[str, Any], ...]:
+    """(name, default) for every field of `model`; required fields default to None"""
+    return tuple(
+        (name, None if field.is_required() else field.get_default(call_default_factory=True))
+        for name, field in model.model_fields.items()
+    )
+
+
+def trusted(model: Type[BaseModel], row: Dict[str, Any]) -> Dict[str, Any]:
+    """`row` shaped as `model` serializes it, for rows that were validated when they were written
+
+    Keys the model doesn't declare are dropped and missing fields get their
+    defaults, as with model(**row), but nothing is validated or converted.
+    Plain dicts rather than model_construct(): in pydantic 2 constructing a
+    model without validation costs more than validating it.
+    """
+    return {name: row.get(name, default) for name, default in _fields(model)}
+
+
+def trusted_list(model: Type[BaseModel], rows: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    fields = _fields(model)
+    return [{name: row.get(name, default) for name, default in fields} for row in rows]
+
+
+def _default(obj):
+    if isinstance(obj, BaseModel):
+        return obj.__dict__
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class TrustedJSONResponse(JSONResponse):
+    """Serializes trusted() content straight to bytes, with orjson when installed
+
+    Return it from a read endpoint instead of the model: FastAPI then skips
+    re-validating and re-encoding through response_model, which still
+    documents the endpoint in Swagger. Write endpoints keep full validation.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(content, default=_default, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, HTTPException, Depends, Query
 from typing import Dict, Any, List, Optional
 from ..models import PartnersResponse, PartnerResponse, BaseResponse
+from ..responses import TrustedJSONResponse, trusted, trusted_list
 from ..services.partner_service import get_potential_partners, clear_potential_partners
 from ..database import get_supabase
 
@@ -74,9 +75,9 @@ async def get_partners(
         # Get unique industries for filters
         industries = sorted(list(set([p.get('industry', '') for p in all_partners if p.get('industry')])))
         
-        # Format response with metadata
-        return PartnersResponse(
-            partners=[PartnerResponse(**p) for p in filtered_partners],
+        # Rows were validated when saved: build the response without re-validating the whole table
+        return TrustedJSONResponse(trusted(PartnersResponse, dict(
+            partners=trusted_list(PartnerResponse, filtered_partners),
             metadata={
                 'total_count': total_count,
                 'filtered_count': filtered_count,
@@ -86,7 +87,7 @@ async def get_partners(
                 'sort_by': sort,
                 'sort_order': order
             }
-        )
+        )))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving partners: {str(e)}")
 
@@ -106,13 +107,13 @@ async def get_top_partners(
         top_partners = all_partners[:limit]
         
         # Format the response with additional metadata
-        return PartnersResponse(
-            partners=[PartnerResponse(**p) for p in top_partners],
+        return TrustedJSONResponse(trusted(PartnersResponse, dict(
+            partners=trusted_list(PartnerResponse, top_partners),
             metadata={
                 'total_partners': len(all_partners),
                 'limit': limit
             }
-        )
+        )))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving top partners: {str(e)}")
 
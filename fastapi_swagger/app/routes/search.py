@@ -13,6 +13,7 @@ from ..services.search_service import (
     save_potential_partner,
     add_search_to_history
 )
+from ..services.pipeline import AsyncPipeline, StopPipeline
 from ..database import get_supabase
 
 router = APIRouter(
@@ -95,17 +96,140 @@ async def ai_search(background_tasks: BackgroundTasks):
     
     return {"message": f"AI search started for {selected_industry}", "industry": selected_industry}
 
+def _stage_search_results(query: str, api_key: str) -> List[Dict[str, Any]]:
+    update_search_status(
+        status="searching",
+        message=f"Searching for companies related to: {query}",
+        progress=10
+    )
+    return search_companies_in_industry(query, api_key)
+
+def _stage_company_names(search_results: List[Dict[str, Any]], query: str) -> List[str]:
+    update_search_status(
+        status="extracting",
+        message="Extracting company names from search results",
+        progress=30
+    )
+    return extract_company_names(search_results, query)
+
+def _stage_candidates(company_names: List[str]) -> List[str]:
+    """Drop current partners and previously considered companies, then mark the rest as considered"""
+    from ..services.partner_service import get_current_partners
+    from ..services.search_service import get_previously_considered_companies
+
+    # Filter out companies that are already partners
+    current_partner_names = [p['name'] for p in get_current_partners()]
+
+    # Check for exact matches with current partners
+    exact_matches = [name for name in company_names if name in current_partner_names]
+    if exact_matches:
+        print(f"Warning: Found {len(exact_matches)} companies that are already partners: {', '.join(exact_matches)}")
+
+    filtered_companies = [name for name in company_names if name not in current_partner_names]
+
+    update_search_status(
+        message=f"Found {len(filtered_companies)} potential companies after filtering out existing partners",
+        progress=32
+    )
+
+    # Filter out previously considered companies
+    previously_considered = get_previously_considered_companies()
+    not_previously_considered = [name for name in filtered_companies if name not in previously_considered]
+
+    update_search_status(
+        message=f"Filtered out {len(filtered_companies) - len(not_previously_considered)} previously considered companies",
+        progress=35
+    )
+
+    # Add newly considered companies to our tracking set
+    for name in not_previously_considered:
+        add_company_to_considered(name)
+
+    # Limit to 40 companies for analysis
+    companies_to_analyze = not_previously_considered[:40]
+
+    update_search_status(
+        message=f"Selected {len(companies_to_analyze)} new companies for analysis",
+        progress=40
+    )
+
+    if not companies_to_analyze:
+        raise StopPipeline("No new companies found in this industry. Try a different industry.")
+    return companies_to_analyze
+
+def _stage_analysis(candidates: List[str], query: str) -> Dict[str, Any]:
+    update_search_status(
+        status="analyzing",
+        message="Analyzing companies and checking for competition with current partners",
+        progress=50
+    )
+    analysis = generate_company_analysis(candidates, query)
+    update_search_status(
+        status="enriching",
+        message=f"Enriching data for all {len(analysis['companies'])} companies",
+        progress=80
+    )
+    return analysis
+
+def _stage_analyzed_companies(analysis: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return analysis['companies']
+
+def _enrich_company(company: Dict[str, Any]) -> Any:
+    """process_company for one company; a failure drops that company from the results"""
+    try:
+        return process_company(company)
+    except Exception as e:
+        print(f"Error processing company: {str(e)}")
+        return None
+
+def _report_enrichment_progress(completed: int, total: int, company: Dict[str, Any], result: Any) -> None:
+    update_search_status(
+        message=f"Processed {completed}/{total} companies",
+        progress=85 + (completed / total * 10)  # Scale from 85 to 95
+    )
+
+def _stage_processed_companies(enrichment: List[Any]) -> List[Dict[str, Any]]:
+    return [company for company in enrichment if company]
+
+def _stage_save(processed_companies: List[Dict[str, Any]], query: str) -> int:
+    """Save non-conflicting companies to potential partners database and record the search"""
+    saved_count = 0
+    for company in processed_companies:
+        if not company.get('competes_with_partners', False) and not company.get('has_competition', False):
+            if save_potential_partner(company, query):
+                saved_count += 1
+
+    # Record the search in history
+    add_search_to_history("Search", query, len(processed_companies))
+    return saved_count
+
+def build_search_pipeline(query: str) -> AsyncPipeline:
+    """Stages of run_search_task; enrichment runs up to 20 companies at a time as before
+
+    The search service calls are synchronous, so AsyncPipeline runs them on its
+    thread pool and the event loop stays free for /search/status.
+    """
+    return (
+        AsyncPipeline(f"search {query}")
+        .add("search_results", _stage_search_results, inputs=("query", "api_key"))
+        .add("company_names", _stage_company_names, inputs=("search_results", "query"))
+        .add("candidates", _stage_candidates, inputs=("company_names",))
+        .add("analysis", _stage_analysis, inputs=("candidates", "query"))
+        .add("analyzed_companies", _stage_analyzed_companies, inputs=("analysis",))
+        .add("enrichment", _enrich_company, each="analyzed_companies", concurrency=20,
+             on_item=_report_enrichment_progress)
+        .add("processed_companies", _stage_processed_companies, inputs=("enrichment",))
+        .add("saved_count", _stage_save, inputs=("processed_companies", "query"))
+    )
+
 async def run_search_task(query: str):
     """
     Run the search task in the background
     """
     import os
     import traceback
-    from ..database import get_supabase
-    
+
     try:
-        supabase = get_supabase()
-        
         # Get Exa API key from environment
         exa_api_key = os.getenv('EXA_API_KEY')
         if not exa_api_key:
@@ -116,154 +240,39 @@ async def run_search_task(query: str):
                 completed=True
             )
             return
-        
-        # Update status - starting search
-        update_search_status(
-            status="searching",
-            message=f"Searching for companies related to: {query}",
-            progress=10
-        )
-        
-        # Search for companies in the industry
-        search_results = search_companies_in_industry(query, exa_api_key)
-        
-        # Update status - extracting companies
-        update_search_status(
-            status="extracting",
-            message="Extracting company names from search results",
-            progress=30
-        )
-        
-        # Extract company names from search results
-        company_names = extract_company_names(search_results, query)
-        
-        # Filter out companies that are already partners
-        from ..services.partner_service import get_current_partners
-        current_partner_names = [p['name'] for p in get_current_partners()]
-        
-        # Check for exact matches with current partners
-        exact_matches = [name for name in company_names if name in current_partner_names]
-        if exact_matches:
-            print(f"Warning: Found {len(exact_matches)} companies that are already partners: {', '.join(exact_matches)}")
-        
-        filtered_companies = [name for name in company_names if name not in current_partner_names]
-        
-        update_search_status(
-            message=f"Found {len(filtered_companies)} potential companies after filtering out existing partners",
-            progress=32
-        )
-        
-        # Filter out previously considered companies
-        from ..services.search_service import get_previously_considered_companies
-        previously_considered = get_previously_considered_companies()
-        not_previously_considered = [name for name in filtered_companies if name not in previously_considered]
-        
-        update_search_status(
-            message=f"Filtered out {len(filtered_companies) - len(not_previously_considered)} previously considered companies",
-            progress=35
-        )
-        
-        # Add newly considered companies to our tracking set
-        for name in not_previously_considered:
-            add_company_to_considered(name)
-        
-        # Limit to 40 companies for analysis
-        companies_to_analyze = not_previously_considered[:40]
-        
-        update_search_status(
-            message=f"Selected {len(companies_to_analyze)} new companies for analysis",
-            progress=40
-        )
-        
-        # If no companies found, return error
-        if not companies_to_analyze:
+
+        pipeline = build_search_pipeline(query)
+        try:
+            outputs = await pipeline.run(query=query, api_key=exa_api_key)
+        except StopPipeline as stop:
             update_search_status(
                 status="error",
-                message="No new companies found in this industry. Try a different industry.",
+                message=str(stop),
                 progress=100,
                 completed=True
             )
             return
-        
-        # Update status - analyzing companies
-        update_search_status(
-            status="analyzing",
-            message="Analyzing companies and checking for competition with current partners",
-            progress=50
-        )
-        
-        # Generate analysis for the companies
-        analysis = generate_company_analysis(companies_to_analyze, query)
-        
-        # Update status - enriching data
-        update_search_status(
-            status="enriching",
-            message=f"Enriching data for all {len(analysis['companies'])} companies",
-            progress=80
-        )
-        
-        # Process all companies in parallel
-        all_company_names = [company['name'] for company in analysis['companies']]
-        update_search_status(
-            message=f"Processing all companies in parallel",
-            progress=85
-        )
-        
-        # Process companies
-        from concurrent.futures import ThreadPoolExecutor, as_completed
-        
-        # Use more workers for better parallelization
-        max_workers = min(20, len(analysis['companies']))
-        processed_companies = []
-        
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # Create futures for each company
-            future_to_company = {executor.submit(process_company, company): company for company in analysis['companies']}
-            
-            # Process results as they complete
-            completed = 0
-            total = len(future_to_company)
-            for future in as_completed(future_to_company):
-                completed += 1
-                progress = 85 + (completed / total * 10)  # Scale from 85 to 95
-                update_search_status(
-                    message=f"Processed {completed}/{total} companies",
-                    progress=progress
-                )
-                
-                try:
-                    processed_company = future.result()
-                    if processed_company:
-                        processed_companies.append(processed_company)
-                except Exception as e:
-                    print(f"Error processing company: {str(e)}")
-        
+
+        processed_companies = outputs['processed_companies']
+
         # Update the companies in the analysis
+        analysis = outputs['analysis']
         analysis['companies'] = processed_companies
-        
-        # Save non-conflicting companies to potential partners database
-        saved_count = 0
-        for company in processed_companies:
-            if not company.get('competes_with_partners', False) and not company.get('has_competition', False):
-                if save_potential_partner(company, query):
-                    saved_count += 1
-        
-        # Record the search in history
-        add_search_to_history("Search", query, len(processed_companies))
-        
+        analysis['timings'] = pipeline.timings
+
         # Update status - completed
         update_search_status(
             status="completed",
-            message=f"Search completed: Found {len(processed_companies)} companies, saved {saved_count} non-conflicting companies to database",
+            message=f"Search completed: Found {len(processed_companies)} companies, saved {outputs['saved_count']} non-conflicting companies to database",
             progress=100,
             completed=True,
             results=analysis
         )
-        
+
     except Exception as e:
         print(f"Error in search task: {str(e)}")
         traceback.print_exc()
-        
+
         # Update status - error
         update_search_status(
             status="error",
@@ -0,0 +1,289 @@
+# Copy of app/services/pipeline.py, which is canonical; port fixes from there. fastapi_swagger runs
+# as its own `app` package (uvicorn app.main:app from fastapi_swagger/), which shadows the root one,
+# so it can't import it. Left out: copying the caller's context into stage threads, which only
+# matters for the request deadline this app doesn't have.
+
+import os
+import time
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Threads shared by every AsyncPipeline for stage functions that block (requests, OpenAI, Supabase)
+BLOCKING_WORKERS = int(os.environ.get("PIPELINE_BLOCKING_WORKERS", 32))
+
+_blocking_pool: Optional[ThreadPoolExecutor] = None
+_blocking_pool_lock = threading.Lock()
+
+
+def _get_blocking_pool() -> ThreadPoolExecutor:
+    global _blocking_pool
+    with _blocking_pool_lock:
+        if _blocking_pool is None:
+            _blocking_pool = ThreadPoolExecutor(max_workers=BLOCKING_WORKERS, thread_name_prefix="pipeline-blocking")
+        return _blocking_pool
+
+
+async def run_blocking(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Await a blocking call on the shared thread pool instead of running it on the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_blocking_pool(), functools.partial(func, *args, **kwargs))
+
+
+class StopPipeline(Exception):
+    """Raised by a stage to end a run early, e.g. when nothing is left to analyze
+
+    The outputs of the stages that finished are attached as .outputs.
+    """
+
+    def __init__(self, message: str = "", result: Any = None):
+        super().__init__(message)
+        self.result = result
+        self.outputs: Dict[str, Any] = {}
+
+
+class PipelineError(Exception):
+    """A stage raised; the original exception is kept as .error"""
+
+    def __init__(self, stage: str, error: Exception):
+        super().__init__(f"Stage '{stage}' failed: {error}")
+        self.stage = stage
+        self.error = error
+
+
+class Stage:
+    def __init__(self, name: str, func: Callable[..., Any], inputs: Iterable[str] = (),
+                 each: Optional[str] = None, concurrency: int = 1,
+                 on_item: Optional[Callable[[int, int, Any, Any], None]] = None):
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.each = each
+        self.concurrency = max(1, int(concurrency))
+        self.on_item = on_item
+
+
+class Pipeline:
+    """Small DAG runner for the search flow
+
+    Stages declare the names of the outputs they read and start as soon as
+    all of them exist, so independent stages run at the same time. A stage
+    with each="<input>" runs func(item, **other_inputs) for every element of
+    that input, at most `concurrency` at a time, and outputs the results in
+    input order.
+
+    With a checkpoint (anything with load() -> {stage: output} and
+    save(stage, output)), finished stages and map items are saved as they
+    complete and skipped by the next run.
+    """
+
+    def __init__(self, name: str, max_workers: int = 4, checkpoint: Any = None):
+        self.name = name
+        self.max_workers = max_workers
+        self.checkpoint = checkpoint
+        self.stages: Dict[str, Stage] = {}
+        self.timings: Dict[str, float] = {}
+        self.resumed: List[str] = []
+
+    def add(self, name: str, func: Callable[..., Any], inputs: Iterable[str] = (),
+            each: Optional[str] = None, concurrency: int = 1,
+            on_item: Optional[Callable[[int, int, Any, Any], None]] = None) -> "Pipeline":
+        """Declare a stage; returns the pipeline so declarations can be chained"""
+        if name in self.stages:
+            raise ValueError(f"Duplicate pipeline stage: {name}")
+        inputs = tuple(inputs)
+        if each is not None and each not in inputs:
+            inputs = inputs + (each,)
+        self.stages[name] = Stage(name, func, inputs, each, concurrency, on_item)
+        return self
+
+    def _save(self, name: str, value: Any) -> None:
+        if self.checkpoint is not None:
+            self.checkpoint.save(name, value)
+
+    def _prepare(self, seeds: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Stage], Dict[str, Any]]:
+        """Check the declared inputs and load checkpoints; returns (outputs, pending stages, saved)"""
+        outputs = dict(seeds)
+        known = set(outputs) | set(self.stages)
+        for stage in self.stages.values():
+            missing = [name for name in stage.inputs if name not in known]
+            if missing:
+                raise ValueError(f"Stage '{stage.name}' reads unknown inputs: {', '.join(missing)}")
+
+        pending = dict(self.stages)
+        saved = self.checkpoint.load() if self.checkpoint is not None else {}
+        for name in list(pending):
+            if name in saved:
+                outputs[name] = saved[name]
+                del pending[name]
+                self.resumed.append(name)
+        if self.resumed:
+            print(f"Pipeline {self.name}: resuming after {', '.join(self.resumed)}")
+        return outputs, pending, saved
+
+    @staticmethod
+    def _saved_items(stage: Stage, saved: Dict[str, Any]) -> Dict[int, Any]:
+        if stage.each is None:
+            return {}
+        prefix = f"{stage.name}["
+        return {int(key[len(prefix):-1]): value for key, value in saved.items()
+                if key.startswith(prefix) and key.endswith("]")}
+
+    @staticmethod
+    def _pending_items(items: List[Any], saved_items: Dict[int, Any]) -> Tuple[List[Any], List[int]]:
+        """Results list pre-filled from checkpoints, and the indexes still to run"""
+        results: List[Any] = [None] * len(items)
+        todo = []
+        for index in range(len(items)):
+            if index in saved_items:
+                results[index] = saved_items[index]
+            else:
+                todo.append(index)
+        return results, todo
+
+    def _run_stage(self, stage: Stage, inputs: Dict[str, Any], saved_items: Dict[int, Any]) -> Any:
+        started = time.time()
+        try:
+            if stage.each is None:
+                return stage.func(**inputs)
+
+            items = list(inputs.pop(stage.each) or [])
+            results, todo = self._pending_items(items, saved_items)
+            if not todo:
+                return results
+            with ThreadPoolExecutor(max_workers=min(stage.concurrency, len(todo))) as executor:
+                futures = {executor.submit(stage.func, items[index], **inputs): index for index in todo}
+                done_count = len(items) - len(todo)
+                for future in futures:
+                    index = futures[future]
+                    results[index] = future.result()
+                    self._save(f"{stage.name}[{index}]", results[index])
+                    done_count += 1
+                    if stage.on_item:
+                        stage.on_item(done_count, len(items), items[index], results[index])
+            return results
+        finally:
+            self.timings[stage.name] = round(time.time() - started, 3)
+
+    def _finish(self, outputs: Dict[str, Any], failure: Optional[Exception], started: float) -> Dict[str, Any]:
+        total = round(time.time() - started, 3)
+        print(f"Pipeline {self.name}: " + ", ".join(f"{name} {seconds}s" for name, seconds in self.timings.items())
+              + f" (total {total}s)")
+        self.timings["total"] = total
+
+        if failure is not None:
+            if isinstance(failure, StopPipeline):
+                failure.outputs = outputs
+            raise failure
+        return outputs
+
+    def run(self, **seeds: Any) -> Dict[str, Any]:
+        """Run every stage and return all outputs (seeds included) by name"""
+        outputs, pending, saved = self._prepare(seeds)
+        running = {}
+        failure: Optional[Exception] = None
+        started = time.time()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or running:
+                if failure is None:
+                    ready = [s for s in pending.values() if all(name in outputs for name in s.inputs)]
+                    for stage in ready:
+                        del pending[stage.name]
+                        inputs = {name: outputs[name] for name in stage.inputs}
+                        running[executor.submit(self._run_stage, stage, inputs, self._saved_items(stage, saved))] = stage
+                if not running:
+                    if failure is None and pending:
+                        raise ValueError(f"Pipeline {self.name} has a dependency cycle: {', '.join(pending)}")
+                    break
+
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage = running.pop(future)
+                    try:
+                        outputs[stage.name] = future.result()
+                        self._save(stage.name, outputs[stage.name])
+                    except StopPipeline as stop:
+                        failure = failure or stop
+                    except Exception as e:
+                        failure = failure or PipelineError(stage.name, e)
+
+        return self._finish(outputs, failure, started)
+
+
+class AsyncPipeline(Pipeline):
+    """Pipeline for an event loop
+
+    Coroutine stages are awaited on the loop; plain functions run on the
+    shared blocking pool so the loop stays free for status requests. Map
+    stages fan out under an asyncio.Semaphore of `concurrency`.
+    """
+
+    async def _call(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        if asyncio.iscoroutinefunction(func):
+            return await func(*args, **kwargs)
+        return await run_blocking(func, *args, **kwargs)
+
+    async def _save_async(self, name: str, value: Any) -> None:
+        if self.checkpoint is not None:
+            await run_blocking(self.checkpoint.save, name, value)
+
+    async def _run_stage_async(self, stage: Stage, inputs: Dict[str, Any], saved_items: Dict[int, Any]) -> Any:
+        started = time.time()
+        try:
+            if stage.each is None:
+                return await self._call(stage.func, **inputs)
+
+            items = list(inputs.pop(stage.each) or [])
+            results, todo = self._pending_items(items, saved_items)
+            semaphore = asyncio.Semaphore(stage.concurrency)
+            done_count = len(items) - len(todo)
+
+            async def run_item(index: int) -> None:
+                nonlocal done_count
+                async with semaphore:
+                    results[index] = await self._call(stage.func, items[index], **inputs)
+                await self._save_async(f"{stage.name}[{index}]", results[index])
+                done_count += 1
+                if stage.on_item:
+                    stage.on_item(done_count, len(items), items[index], results[index])
+
+            await asyncio.gather(*(run_item(index) for index in todo))
+            return results
+        finally:
+            self.timings[stage.name] = round(time.time() - started, 3)
+
+    async def run(self, **seeds: Any) -> Dict[str, Any]:  # type: ignore[override]
+        """Run every stage and return all outputs (seeds included) by name"""
+        outputs, pending, saved = await run_blocking(self._prepare, seeds)
+        running: Dict[asyncio.Future, Stage] = {}
+        failure: Optional[Exception] = None
+        started = time.time()
+
+        while pending or running:
+            if failure is None:
+                ready = [s for s in pending.values() if all(name in outputs for name in s.inputs)]
+                for stage in ready:
+                    del pending[stage.name]
+                    inputs = {name: outputs[name] for name in stage.inputs}
+                    task = asyncio.ensure_future(self._run_stage_async(stage, inputs, self._saved_items(stage, saved)))
+                    running[task] = stage
+            if not running:
+                if failure is None and pending:
+                    raise ValueError(f"Pipeline {self.name} has a dependency cycle: {', '.join(pending)}")
+                break
+
+            done, _ = await asyncio.wait(list(running), return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                stage = running.pop(task)
+                try:
+                    outputs[stage.name] = task.result()
+                    await self._save_async(stage.name, outputs[stage.name])
+                except StopPipeline as stop:
+                    failure = failure or stop
+                except Exception as e:
+                    failure = failure or PipelineError(stage.name, e)
+
+        return self._finish(outputs, failure, started)
@@ -18,6 +18,7 @@ class ErrorResponse(BaseResponse):
 class SearchRequest(BaseModel):
     """Search request model"""
     query: str = Field(..., description="The search query for finding companies")
+    search_id: Optional[str] = Field(None, description="search_id of a failed search to resume")
 
 class SearchStatusResponse(BaseModel):
     """Search status response model"""
@@ -0,0 +1,11 @@
+import os
+import sys
+
+# Add the repo root to sys.path so we can import the app package
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+# Only the partner blueprints are imported, not app.py. The app (and its lazy
+# Supabase client) lives at module level, so warm invocations reuse it.
+from app.serverless import create_partners_app, netlify_handler
+
+handler = netlify_handler(create_partners_app())
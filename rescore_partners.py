@@ -0,0 +1,252 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from dotenv import load_dotenv
+
+from scoring_criteria import SCORING_CRITERIA
+from app.services.scoring_engine import ScoringEngine
+
+# Load environment variables
+load_dotenv()
+
+# Supabase Setup. Prefer the service key when available so RLS doesn't hide rows.
+SUPABASE_URL = os.environ.get("SUPABASE_URL")
+SUPABASE_KEY = os.environ.get("SUPABASE_SERVICE_KEY") or os.environ.get("SUPABASE_ANON_KEY")
+
+# Columns the scoring engine reads, plus what we need to write back. The enrichment values
+# without a column of their own are in market_analysis.scoring_inputs (see save_potential_partner).
+SELECT_COLUMNS = "id,name,score,industry,description,hq_location,size_range,website,products,market_analysis"
+
+DEFAULT_CHECKPOINT = ".rescore_checkpoint.json"
+
+
+def criteria_fingerprint(criteria):
+    """Hash the criteria so a checkpoint from different weights isn't resumed by accident"""
+    return hashlib.sha256(json.dumps(criteria, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+def create_session():
+    """Session with connection pooling and retries for transient Supabase errors"""
+    session = requests.Session()
+    retry = Retry(
+        total=5,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=None  # retry POST upserts too, they are idempotent
+    )
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=4, pool_maxsize=4)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({
+        "apikey": SUPABASE_KEY,
+        "Authorization": f"Bearer {SUPABASE_KEY}",
+        "Content-Type": "application/json"
+    })
+    return session
+
+
+def fetch_page(session, after_id, page_size):
+    """Fetch the next page of partners ordered by id (keyset pagination, no OFFSET scans)"""
+    params = {
+        "select": SELECT_COLUMNS,
+        "order": "id.asc",
+        "limit": str(page_size)
+    }
+    if after_id is not None:
+        params["id"] = f"gt.{after_id}"
+
+    response = session.get(f"{SUPABASE_URL}/rest/v1/potential_partners", params=params, timeout=30)
+    if response.status_code != 200:
+        raise RuntimeError(f"Error fetching partners: {response.status_code} - {response.text[:500]}")
+    return response.json()
+
+
+def upsert_scores(session, rows):
+    """Write new scores back in a single bulk upsert keyed on id
+
+    Only score changes. Postgres checks NOT NULL on the row it would insert
+    before it resolves the conflict, so each row also carries the NOT NULL
+    columns (name, industry) with the values just read; the merge writes
+    them back unchanged and leaves every other column alone.
+    """
+    if not rows:
+        return
+    response = session.post(
+        f"{SUPABASE_URL}/rest/v1/potential_partners",
+        params={"on_conflict": "id"},
+        headers={"Prefer": "resolution=merge-duplicates,return=minimal"},
+        data=json.dumps(rows),
+        timeout=60
+    )
+    if response.status_code not in (200, 201, 204):
+        raise RuntimeError(f"Error upserting {len(rows)} scores: {response.status_code} - {response.text[:500]}")
+
+
+def has_enrichment(row):
+    """Only rows saved with their scoring inputs can be rescored like a search would score them
+
+    Older rows lack follower counts, funding and employee counts; scoring them
+    from the remaining columns would replace good scores with lower ones.
+    """
+    market_analysis = row.get('market_analysis')
+    return isinstance(market_analysis, dict) and bool(market_analysis.get('scoring_inputs'))
+
+
+def score_page(engine, rows, include_unenriched=False):
+    """Score a page of rows and return the updates whose score actually changed"""
+    candidates = [row for row in rows if include_unenriched or has_enrichment(row)]
+    if not candidates:
+        return [], 0
+
+    _, totals = engine.score_matrix(engine.feature_matrix(candidates))
+    new_scores = engine.scaled(totals)
+
+    updates = []
+    for row, new_score in zip(candidates, new_scores):
+        new_score = float(new_score)
+        try:
+            old_score = float(row.get('score'))
+        except (TypeError, ValueError):
+            old_score = None
+        if old_score is None or old_score != old_score or abs(old_score - new_score) > 1e-9:
+            updates.append({"id": row["id"], "name": row["name"], "industry": row["industry"], "score": new_score})
+    return updates, len(candidates)
+
+
+def load_checkpoint(path, fingerprint, resume):
+    if not resume or not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r') as f:
+            checkpoint = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Could not read checkpoint {path}: {e}")
+        return None
+    if checkpoint.get('criteria') != fingerprint:
+        print(f"Checkpoint {path} was written for different scoring criteria, starting over")
+        return None
+    return checkpoint
+
+
+def save_checkpoint(path, checkpoint):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, path)
+
+
+def rescore(page_size=1000, checkpoint_path=DEFAULT_CHECKPOINT, resume=True, dry_run=False, include_unenriched=False):
+    """Stream potential_partners, rescore each page and bulk upsert the changes
+
+Overwrites only the score column of rows whose score changed.
+"""
+    if not SUPABASE_URL or not SUPABASE_KEY:
+        print("Error: Supabase URL or key not set.")
+        return False
+
+    engine = ScoringEngine(SCORING_CRITERIA)
+    fingerprint = criteria_fingerprint(SCORING_CRITERIA)
+    session = create_session()
+
+    checkpoint = load_checkpoint(checkpoint_path, fingerprint, resume) or {
+        "criteria": fingerprint,
+        "last_id": None,
+        "read": 0,
+        "scored": 0,
+        "updated": 0
+    }
+    if checkpoint["last_id"] is not None:
+        print(f"Resuming after id {checkpoint['last_id']} ({checkpoint['read']} rows already done)")
+
+    started = time.time()
+    rows_this_run = 0
+
+    # Fetch the next page while the current one is being scored and written
+    with ThreadPoolExecutor(max_workers=1) as prefetcher:
+        next_page = prefetcher.submit(fetch_page, session, checkpoint["last_id"], page_size)
+        while True:
+            rows = next_page.result()
+            if not rows:
+                break
+            if len(rows) == page_size:
+                next_page = prefetcher.submit(fetch_page, session, rows[-1]["id"], page_size)
+
+            page_started = time.time()
+            updates, scored = score_page(engine, rows, include_unenriched)
+            if not dry_run:
+                upsert_scores(session, updates)
+
+            checkpoint["last_id"] = rows[-1]["id"]
+            checkpoint["read"] += len(rows)
+            checkpoint["scored"] += scored
+            checkpoint["updated"] += len(updates)
+            if not dry_run:
+                save_checkpoint(checkpoint_path, checkpoint)
+
+            rows_this_run += len(rows)
+            elapsed = time.time() - started
+            print(f"Page of {len(rows)} rows: {scored} scored, {len(updates)} changed "
+                  f"in {time.time() - page_started:.2f}s | total {checkpoint['read']} rows, "
+                  f"{rows_this_run / elapsed if elapsed > 0 else 0:.0f} rows/s")
+
+            if len(rows) < page_size:
+                break
+
+    elapsed = time.time() - started
+    print(f"\nRescore summary{' (dry run, nothing written)' if dry_run else ''}:")
+    print(f"- Read {checkpoint['read']} partners ({rows_this_run} this run) in {elapsed:.1f}s")
+    print(f"- Scored {checkpoint['scored']} partners with stored scoring inputs "
+          f"({checkpoint['read'] - checkpoint['scored']} without were left as they are)")
+    print(f"- Updated {checkpoint['updated']} scores")
+    print(f"- Throughput: {rows_this_run / elapsed if elapsed > 0 else 0:.0f} rows/s")
+
+    # A finished run doesn't need its checkpoint any more
+    if not dry_run and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Recompute potential_partners scores from SCORING_CRITERIA')
+    parser.add_argument('--page-size', type=int, default=1000, help='Rows fetched and upserted per request')
+    parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT, help='Checkpoint file used to resume')
+    parser.add_argument('--restart', action='store_true', help='Ignore any existing checkpoint')
+    parser.add_argument('--dry-run', action='store_true', help='Score everything but write nothing')
+    parser.add_argument('--include-unenriched', action='store_true',
+                        help='Also rescore rows saved without scoring inputs (their scores will mostly drop)')
+    args = parser.parse_args()
+
+    print("Starting partner rescore...")
+    print(f"Supabase URL: {SUPABASE_URL}")
+
+    try:
+        success = rescore(
+            page_size=max(1, args.page_size),
+            checkpoint_path=args.checkpoint,
+            resume=not args.restart,
+            dry_run=args.dry_run,
+            include_unenriched=args.include_unenriched
+        )
+    except Exception as e:
+        print(f"\n❌ Rescore stopped: {e}")
+        traceback.print_exc()
+        print(f"Run again to resume from {args.checkpoint}")
+        sys.exit(1)
+
+    if success:
+        print("\n✅ Rescore completed successfully!")
+    else:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,14 +5,17 @@ import os
 import traceback
 from datetime import datetime
 import json
+import httpx
 
 from models import SearchRequest, SearchStatusResponse, BaseResponse, ErrorResponse
 import database as db
+from app.services.pipeline import AsyncPipeline, StopPipeline, run_blocking
+from app.services.exa_provider import async_search_with_contents, EXA_TIMEOUT
+from app.services.checkpoint_store import CheckpointStore, new_search_id
 
 # Import search-related functions from your existing code
 # These would need to be adapted from your Flask app
 from search_utils import (
-    search_companies_in_industry,
     extract_company_names,
     generate_company_analysis,
     process_company
@@ -75,15 +78,20 @@ async def search(search_data: SearchRequest, background_tasks: BackgroundTasks):
             })
             raise HTTPException(status_code=400, detail="Please provide a valid search query")
 
+        # Every search gets its own id; sending back the search_id of a failed search resumes it
+        search_id = search_data.search_id or new_search_id()
+
         # Run the search in a background task
         background_tasks.add_task(
             run_search_task,
-            query=query
+            query=query,
+            search_id=search_id
         )
 
         return {
             "message": f"Search started for: {query}",
-            "query": query
+            "query": query,
+            "search_id": search_id
         }
     except Exception as e:
         # Update status - error
@@ -171,8 +179,165 @@ async def ai_search(background_tasks: BackgroundTasks):
 
         raise HTTPException(status_code=500, detail=error_message)
 
-# Background task functions
-async def run_search_task(query: str):
+# Stage outputs of unfinished searches, so a failed search resumes where it stopped
+checkpoint_store = CheckpointStore()
+
+# Background task functions. The pipeline awaits the async stages on the event loop
+# and runs the blocking ones (OpenAI, Supabase) on its thread pool.
+async def search_companies_in_industry(http: httpx.AsyncClient, industry: str, api_key: str) -> List[Dict[str, Any]]:
+    """Exa search with page contents, without blocking the event loop"""
+    try:
+        return await async_search_with_contents(http, f"top companies in {industry} industry", api_key)
+    except Exception as e:
+        print(f"Error from Exa API: {str(e)}")
+        return []
+
+async def _stage_search_results(http: httpx.AsyncClient, query: str, api_key: str) -> List[Dict[str, Any]]:
+    search_status.update({
+        "status": "searching",
+        "message": f"Searching for companies related to: {query}",
+        "progress": 10
+    })
+    return await search_companies_in_industry(http, query, api_key)
+
+def _stage_company_names(search_results: List[Dict[str, Any]], query: str) -> List[str]:
+    search_status.update({
+        "status": "extracting",
+        "message": "Extracting company names from search results",
+        "progress": 30
+    })
+    return extract_company_names(search_results, query)
+
+def _stage_candidates(company_names: List[str]) -> List[str]:
+    """Drop current partners and previously considered companies, then mark the rest as considered"""
+    from current_partners import CURRENT_PARTNERS
+    current_partner_names = [p['name'] for p in CURRENT_PARTNERS]
+
+    # Log checking against current partners
+    print(f"Checking {len(company_names)} potential companies against {len(current_partner_names)} current partners")
+
+    # Check for exact matches with current partners
+    exact_matches = [name for name in company_names if name in current_partner_names]
+    if exact_matches:
+        print(f"Warning: Found {len(exact_matches)} companies that are already partners: {', '.join(exact_matches)}")
+
+    filtered_companies = [name for name in company_names if name not in current_partner_names]
+
+    search_status.update({
+        "message": f"Found {len(filtered_companies)} potential companies after filtering out existing partners",
+        "progress": 32
+    })
+
+    # Get previously considered companies
+    previously_considered_companies = set(db.get_previously_considered())
+
+    # Filter out previously considered companies
+    not_previously_considered = [name for name in filtered_companies if name not in previously_considered_companies]
+
+    search_status.update({
+        "message": f"Filtered out {len(filtered_companies) - len(not_previously_considered)} previously considered companies",
+        "progress": 35
+    })
+
+    # Add newly considered companies to our tracking set
+    for name in not_previously_considered:
+        db.add_company_to_considered(name)
+
+    print(f"Previously considered companies (total: {len(previously_considered_companies)}): {previously_considered_companies}")
+
+    # Limit to 40 companies for analysis (changed from 20)
+    companies_to_analyze = not_previously_considered[:40]
+
+    search_status.update({
+        "message": f"Selected {len(companies_to_analyze)} new companies for analysis",
+        "progress": 40
+    })
+
+    if not companies_to_analyze:
+        raise StopPipeline("No new companies found in this industry. Try a different industry.")
+    return companies_to_analyze
+
+def _stage_analysis(candidates: List[str], query: str) -> Dict[str, Any]:
+    search_status.update({
+        "status": "analyzing",
+        "message": "Analyzing companies and checking for competition with current partners",
+        "progress": 50
+    })
+    analysis = generate_company_analysis(candidates, query)
+    search_status.update({
+        "status": "enriching",
+        "message": f"Enriching data for all {len(analysis['companies'])} companies",
+        "progress": 80
+    })
+    return analysis
+
+def _stage_analyzed_companies(analysis: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return analysis['companies']
+
+def _enrich_company(company: Dict[str, Any]) -> Any:
+    """process_company for one company; a failure leaves that company unenriched"""
+    try:
+        return process_company(company)
+    except Exception as e:
+        print(f"Error processing company {company.get('name')}: {str(e)}")
+        return None
+
+def _report_enrichment_progress(completed: int, total: int, company: Dict[str, Any], result: Any) -> None:
+    search_status.update({
+        "message": f"Processed {completed}/{total} companies",
+        "progress": 85 + (completed / total * 10)  # Scale from 85 to 95
+    })
+
+def _stage_save(analysis: Dict[str, Any], enrichment: List[Any], query: str) -> int:
+    """Save non-conflicting companies to the potential partners database"""
+    # A resumed search loads the analysis and the enriched companies from separate checkpoints
+    enriched = {company.get('name'): company for company in enrichment if isinstance(company, dict)}
+    analysis['companies'] = [enriched.get(company.get('name'), company) for company in analysis['companies']]
+
+    saved_count = 0
+    print(f"\n[SEARCH] Saving companies to Supabase database...")
+    print(f"[SEARCH] Total companies to process: {len(analysis['companies'])}")
+
+    for i, company in enumerate(analysis['companies']):
+        company_name = company.get('name', 'Unknown')
+        print(f"\n[SEARCH] Processing company {i+1}/{len(analysis['companies'])}: {company_name}")
+
+        if company.get('competes_with_partners', False):
+            print(f"[SEARCH] Skipping {company_name} - competes with partners")
+            continue
+
+        if company.get('has_competition', False):
+            print(f"[SEARCH] Skipping {company_name} - has competition")
+            continue
+
+        print(f"[SEARCH] Attempting to save {company_name} to database")
+        if db.save_potential_partner(company, query):
+            saved_count += 1
+            print(f"[SEARCH] Successfully saved/skipped {company_name}")
+        else:
+            print(f"[SEARCH] Failed to save {company_name}")
+
+    print(f"\n[SEARCH] Save operation complete: {saved_count} companies saved/skipped")
+
+    # Add to search history
+    db.add_search_to_history("Industry Search", query, len(analysis['companies']))
+    return saved_count
+
+def build_search_pipeline(query: str, checkpoint=None) -> AsyncPipeline:
+    """Stages of run_search_task; enrichment runs up to 20 companies at a time as before"""
+    return (
+        AsyncPipeline(f"search {query}", checkpoint=checkpoint)
+        .add("search_results", _stage_search_results, inputs=("http", "query", "api_key"))
+        .add("company_names", _stage_company_names, inputs=("search_results", "query"))
+        .add("candidates", _stage_candidates, inputs=("company_names",))
+        .add("analysis", _stage_analysis, inputs=("candidates", "query"))
+        .add("analyzed_companies", _stage_analyzed_companies, inputs=("analysis",))
+        .add("enrichment", _enrich_company, each="analyzed_companies", concurrency=20,
+             on_item=_report_enrichment_progress)
+        .add("saved_count", _stage_save, inputs=("analysis", "enrichment", "query"))
+    )
+
+async def run_search_task(query: str, search_id: str):
     """Run the search task in the background"""
     global search_status
 
@@ -188,160 +353,30 @@ async def run_search_task(query: str):
             })
             return
 
-        # Update status - starting search
-        search_status.update({
-            "status": "searching",
-            "message": f"Searching for companies related to: {query}",
-            "progress": 10
-        })
-
-        # Search for companies in the industry
-        search_results = search_companies_in_industry(query, exa_api_key)
-
-        # Update status - extracting companies
-        search_status.update({
-            "status": "extracting",
-            "message": "Extracting company names from search results",
-            "progress": 30
-        })
-
-        # Extract company names from search results
-        company_names = extract_company_names(search_results, query)
-
-        # Filter out companies that are already partners
-        from current_partners import CURRENT_PARTNERS
-        current_partner_names = [p['name'] for p in CURRENT_PARTNERS]
-
-        # Log checking against current partners
-        print(f"Checking {len(company_names)} potential companies against {len(current_partner_names)} current partners")
-
-        # Check for exact matches with current partners
-        exact_matches = [name for name in company_names if name in current_partner_names]
-        if exact_matches:
-            print(f"Warning: Found {len(exact_matches)} companies that are already partners: {', '.join(exact_matches)}")
-
-        filtered_companies = [name for name in company_names if name not in current_partner_names]
-
-        search_status.update({
-            "message": f"Found {len(filtered_companies)} potential companies after filtering out existing partners",
-            "progress": 32
-        })
-
-        # Get previously considered companies
-        previously_considered_companies = set(db.get_previously_considered())
-
-        # Filter out previously considered companies
-        not_previously_considered = [name for name in filtered_companies if name not in previously_considered_companies]
-
-        search_status.update({
-            "message": f"Filtered out {len(filtered_companies) - len(not_previously_considered)} previously considered companies",
-            "progress": 35
-        })
-
-        # Add newly considered companies to our tracking set
-        for name in not_previously_considered:
-            db.add_company_to_considered(name)
-
-        print(f"Previously considered companies (total: {len(previously_considered_companies)}): {previously_considered_companies}")
-
-        # Limit to 40 companies for analysis (changed from 20)
-        companies_to_analyze = not_previously_considered[:40]
-
-        search_status.update({
-            "message": f"Selected {len(companies_to_analyze)} new companies for analysis",
-            "progress": 40
-        })
-
-        # If no companies found, return error
-        if not companies_to_analyze:
+        # Completed stages are kept until the search finishes, so a retry with this search_id resumes it
+        checkpoint = checkpoint_store.bind(search_id)
+        pipeline = build_search_pipeline(query, checkpoint)
+        try:
+            async with httpx.AsyncClient(timeout=EXA_TIMEOUT) as http:
+                outputs = await pipeline.run(http=http, query=query, api_key=exa_api_key)
+        except StopPipeline as stop:
+            await run_blocking(checkpoint.clear)
             search_status.update({
                 "status": "error",
-                "message": "No new companies found in this industry. Try a different industry.",
+                "message": str(stop),
                 "progress": 100,
                 "completed": True
             })
             return
 
-        # Update status - analyzing companies
-        search_status.update({
-            "status": "analyzing",
-            "message": "Analyzing companies and checking for competition with current partners",
-            "progress": 50
-        })
-
-        # Generate analysis for the companies
-        analysis = generate_company_analysis(companies_to_analyze, query)
+        await run_blocking(checkpoint.clear)
+        analysis = outputs['analysis']
+        saved_count = outputs['saved_count']
 
         # Calculate max total score
         from scoring_criteria import SCORING_CRITERIA
         max_total_score = sum(criteria['max_points'] for criteria in SCORING_CRITERIA.values())
 
-        # Update status - enriching data
-        search_status.update({
-            "status": "enriching",
-            "message": f"Enriching data for all {len(analysis['companies'])} companies",
-            "progress": 80
-        })
-
-        # Process all companies in parallel
-        all_company_names = [company['name'] for company in analysis['companies']]
-        search_status.update({
-            "message": f"Processing all companies in parallel: {', '.join(all_company_names)}",
-            "progress": 85
-        })
-
-        # Process companies in parallel using ThreadPoolExecutor
-        from concurrent.futures import ThreadPoolExecutor, as_completed
-        max_workers = min(20, len(analysis['companies']))
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # Create futures for each company
-            future_to_company = {executor.submit(process_company, company): company for company in analysis['companies']}
-
-            # Process results as they complete
-            completed = 0
-            total = len(future_to_company)
-            for future in as_completed(future_to_company):
-                completed += 1
-                progress = 85 + (completed / total * 10)  # Scale from 85 to 95
-                search_status.update({
-                    "message": f"Processed {completed}/{total} companies",
-                    "progress": progress
-                })
-
-        # Calculate summary metrics
-        final_competing_count = sum(1 for company in analysis['companies'] if company.get('competes_with_partners', False))
-        final_enriched_count = sum(1 for company in analysis['companies'] if company.get('enriched', False))
-
-        # Save non-conflicting companies to potential partners database
-        saved_count = 0
-        skipped_count = 0
-        print(f"\n[SEARCH] Saving companies to Supabase database...")
-        print(f"[SEARCH] Total companies to process: {len(analysis['companies'])}")
-
-        for i, company in enumerate(analysis['companies']):
-            company_name = company.get('name', 'Unknown')
-            print(f"\n[SEARCH] Processing company {i+1}/{len(analysis['companies'])}: {company_name}")
-
-            if company.get('competes_with_partners', False):
-                print(f"[SEARCH] Skipping {company_name} - competes with partners")
-                continue
-
-            if company.get('has_competition', False):
-                print(f"[SEARCH] Skipping {company_name} - has competition")
-                continue
-
-            print(f"[SEARCH] Attempting to save {company_name} to database")
-            if db.save_potential_partner(company, query):
-                saved_count += 1
-                print(f"[SEARCH] Successfully saved/skipped {company_name}")
-            else:
-                print(f"[SEARCH] Failed to save {company_name}")
-
-        print(f"\n[SEARCH] Save operation complete: {saved_count} companies saved/skipped")
-
-        # Add to search history
-        db.add_search_to_history("Industry Search", query, len(analysis['companies']))
-
         # Update status - completed
         search_status.update({
             "status": "completed",
@@ -351,9 +386,10 @@ async def run_search_task(query: str):
             "results": {
                 'industry': query,
                 'analysis': analysis,
-                'search_results': search_results,
+                'search_results': outputs['search_results'],
                 'scoring_criteria': SCORING_CRITERIA,
-                'max_total_score': max_total_score
+                'max_total_score': max_total_score,
+                'timings': pipeline.timings
             }
         })
     except Exception as e:
@@ -367,145 +403,142 @@ async def run_search_task(query: str):
         print(f"Error in search: {e}")
         traceback.print_exc()
 
+async def _stage_ai_search_results(http: httpx.AsyncClient, query: str, api_key: str) -> List[Dict[str, Any]]:
+    search_status.update({
+        "status": "searching",
+        "message": f"Finding companies in {query}...",
+        "progress": 20
+    })
+    search_results = await search_companies_in_industry(http, query, api_key)
+    if not search_results or not isinstance(search_results, list):
+        raise StopPipeline(f"Failed to get search results for {query}")
+    print(f"Found {len(search_results)} search results")
+    return search_results
+
+def _stage_ai_company_names(search_results: List[Dict[str, Any]], query: str) -> List[str]:
+    search_status.update({
+        "status": "processing",
+        "message": "Extracting company names...",
+        "progress": 50
+    })
+    companies = extract_company_names(search_results, query)
+    if not companies or not isinstance(companies, list) or len(companies) == 0:
+        raise StopPipeline(f"Failed to extract company names from search results for {query}")
+    print(f"Extracted {len(companies)} company names")
+
+    # Limit to 40 companies for analysis
+    return companies[:40]
+
+def _stage_ai_analysis(company_names: List[str], query: str) -> Dict[str, Any]:
+    search_status.update({
+        "status": "analyzing",
+        "message": f"Analyzing {len(company_names)} companies...",
+        "progress": 70
+    })
+    analysis = generate_company_analysis(company_names, query)
+    if not analysis or not isinstance(analysis, dict):
+        raise StopPipeline(f"Failed to generate analysis for companies in {query}")
+    print(f"Generated analysis for {len(analysis.get('companies', []))} companies")
+    return analysis
+
+def _stage_ai_analyzed_companies(analysis: Dict[str, Any]) -> List[Dict[str, Any]]:
+    companies = analysis.get('companies')
+    return companies if isinstance(companies, list) else []
+
+def _enrich_considered_company(company: Dict[str, Any]) -> Any:
+    """process_company, then add the company to the previously considered list"""
+    try:
+        processed_company = process_company(company)
+        if processed_company and processed_company.get('name'):
+            db.add_company_to_considered(processed_company['name'])
+        return processed_company
+    except Exception as e:
+        print(f"Error processing company: {str(e)}")
+        return None
+
+def _stage_ai_save(enrichment: List[Any], query: str) -> Dict[str, Any]:
+    """Save non-conflicting companies to the potential partners database and record the search"""
+    processed_companies = [company for company in enrichment if company]
+
+    saved_count = 0
+    print(f"\n[AI_SEARCH] Saving companies to Supabase database...")
+    print(f"[AI_SEARCH] Total companies to process: {len(processed_companies)}")
+
+    for i, company in enumerate(processed_companies):
+        company_name = company.get('name', 'Unknown')
+        print(f"\n[AI_SEARCH] Processing company {i+1}/{len(processed_companies)}: {company_name}")
+
+        if company.get('competes_with_partners', False):
+            print(f"[AI_SEARCH] Skipping {company_name} - competes with partners")
+            continue
+
+        if company.get('has_competition', False):
+            print(f"[AI_SEARCH] Skipping {company_name} - has competition")
+            continue
+
+        print(f"[AI_SEARCH] Attempting to save {company_name} to database")
+        if db.save_potential_partner(company, query):
+            saved_count += 1
+            print(f"[AI_SEARCH] Successfully saved/skipped {company_name}")
+        else:
+            print(f"[AI_SEARCH] Failed to save {company_name}")
+
+    print(f"\n[AI_SEARCH] Save operation complete: {saved_count} companies saved/skipped")
+
+    # Record the search in history
+    db.add_search_to_history("AI Search", query, len(processed_companies))
+    return {"processed_companies": processed_companies, "saved_count": saved_count}
+
+def build_ai_search_pipeline(industry: str, checkpoint=None) -> AsyncPipeline:
+    """Stages of run_ai_search_task; enrichment runs up to 10 companies at a time as before"""
+    return (
+        AsyncPipeline(f"ai-search {industry}", checkpoint=checkpoint)
+        .add("search_results", _stage_ai_search_results, inputs=("http", "query", "api_key"))
+        .add("company_names", _stage_ai_company_names, inputs=("search_results", "query"))
+        .add("analysis", _stage_ai_analysis, inputs=("company_names", "query"))
+        .add("analyzed_companies", _stage_ai_analyzed_companies, inputs=("analysis",))
+        .add("enrichment", _enrich_considered_company, each="analyzed_companies", concurrency=10)
+        .add("saved", _stage_ai_save, inputs=("enrichment", "query"))
+    )
+
 async def run_ai_search_task(industry: str, api_key: str):
     """Run the AI search task in the background"""
     global search_status
 
+    # The AI search picks a random industry each time, so there is no earlier run to resume
+    checkpoint = checkpoint_store.bind(new_search_id())
     try:
         print(f"Background task: Searching for companies in {industry}")
 
-        # Perform the search
-        search_status.update({
-            "status": "searching",
-            "message": f"Finding companies in {industry}...",
-            "progress": 20
-        })
-
-        # Search for companies in the industry
-        search_results = search_companies_in_industry(industry, api_key)
-        if not search_results or not isinstance(search_results, list):
-            error_message = f"Failed to get search results for {industry}"
-            print(f"Error: {error_message}")
-            search_status.update({
-                "status": "error",
-                "message": error_message,
-                "progress": 0,
-                "error": error_message
-            })
-            return
-
-        print(f"Found {len(search_results)} search results")
-
-        # Update status
-        search_status.update({
-            "status": "processing",
-            "message": "Extracting company names...",
-            "progress": 50
-        })
-
-        # Extract company names
-        companies = extract_company_names(search_results, industry)
-        if not companies or not isinstance(companies, list) or len(companies) == 0:
-            error_message = f"Failed to extract company names from search results for {industry}"
-            print(f"Error: {error_message}")
-            search_status.update({
-                "status": "error",
-                "message": error_message,
-                "progress": 0,
-                "error": error_message
-            })
-            return
-
-        print(f"Extracted {len(companies)} company names")
-
-        # Limit to 40 companies for analysis
-        companies = companies[:40]
-
-        # Update status
-        search_status.update({
-            "status": "analyzing",
-            "message": f"Analyzing {len(companies)} companies...",
-            "progress": 70
-        })
-
-        # Generate company analysis
-        analysis = generate_company_analysis(companies, industry)
-        if not analysis or not isinstance(analysis, dict):
-            error_message = f"Failed to generate analysis for companies in {industry}"
-            print(f"Error: {error_message}")
-            search_status.update({
-                "status": "error",
-                "message": error_message,
-                "progress": 0,
-                "error": error_message
-            })
-            return
-
-        print(f"Generated analysis for {len(analysis.get('companies', []))} companies")
-
-        # Process each company in parallel
-        processed_companies = []
-        if analysis.get('companies') and isinstance(analysis['companies'], list):
-            from concurrent.futures import ThreadPoolExecutor, as_completed
-            with ThreadPoolExecutor(max_workers=min(10, len(analysis['companies']))) as executor:
-                # Process all companies in parallel
-                future_to_company = {executor.submit(process_company, company): company for company in analysis['companies']}
-
-                # Collect results as they complete
-                for future in as_completed(future_to_company):
-                    try:
-                        processed_company = future.result()
-                        if processed_company:
-                            processed_companies.append(processed_company)
-                            # Add to previously considered companies
-                            if processed_company.get('name'):
-                                db.add_company_to_considered(processed_company['name'])
-                    except Exception as e:
-                        print(f"Error processing company: {str(e)}")
+        pipeline = build_ai_search_pipeline(industry, checkpoint)
+        async with httpx.AsyncClient(timeout=EXA_TIMEOUT) as http:
+            outputs = await pipeline.run(http=http, query=industry, api_key=api_key)
+        await run_blocking(checkpoint.clear)
 
         # Update analysis with processed companies
-        analysis['companies'] = processed_companies
-
-        # Save non-conflicting companies to potential partners database
-        saved_count = 0
-        skipped_count = 0
-        print(f"\n[AI_SEARCH] Saving companies to Supabase database...")
-        print(f"[AI_SEARCH] Total companies to process: {len(processed_companies)}")
-
-        for i, company in enumerate(processed_companies):
-            company_name = company.get('name', 'Unknown')
-            print(f"\n[AI_SEARCH] Processing company {i+1}/{len(processed_companies)}: {company_name}")
-
-            if company.get('competes_with_partners', False):
-                print(f"[AI_SEARCH] Skipping {company_name} - competes with partners")
-                continue
-
-            if company.get('has_competition', False):
-                print(f"[AI_SEARCH] Skipping {company_name} - has competition")
-                continue
-
-            print(f"[AI_SEARCH] Attempting to save {company_name} to database")
-            if db.save_potential_partner(company, industry):
-                saved_count += 1
-                print(f"[AI_SEARCH] Successfully saved/skipped {company_name}")
-            else:
-                print(f"[AI_SEARCH] Failed to save {company_name}")
-
-        print(f"\n[AI_SEARCH] Save operation complete: {saved_count} companies saved/skipped")
-
-        # Record the search in history
-        db.add_search_to_history("AI Search", industry, len(processed_companies))
+        analysis = outputs['analysis']
+        analysis['companies'] = outputs['saved']['processed_companies']
 
         # Update status to complete
         search_status.update({
             "status": "completed",
-            "message": f"Search complete: Saved {saved_count} non-conflicting companies to database (skipped existing companies)",
+            "message": f"Search complete: Saved {outputs['saved']['saved_count']} non-conflicting companies to database (skipped existing companies)",
             "progress": 100,
             "results": analysis,
             "error": None
         })
 
         print("AI search completed successfully")
+    except StopPipeline as stop:
+        await run_blocking(checkpoint.clear)
+        error_message = str(stop)
+        print(f"Error: {error_message}")
+        search_status.update({
+            "status": "error",
+            "message": error_message,
+            "progress": 0,
+            "error": error_message
+        })
     except Exception as e:
         error_message = f"Error in AI search background process: {str(e)}"
         print(f"ERROR: {error_message}")
@@ -31,6 +31,9 @@ pip install reportlab==4.3.1
 echo "Installing LinkedIn API..."
 pip install linkedin-api==2.0.2
 
+echo "Installing scoring and response encoding dependencies..."
+pip install "numpy>=1.24" h2==4.1.0 brotli==1.1.0 orjson==3.10.7
+
 # Create a static directory if it doesn't exist
 if [ ! -d "dura-react/dist" ]; then
   echo "Creating static directory..."
@@ -54,6 +57,7 @@ cd ..
 # Check if the build directory exists
 if [ -d "dura-react/dist" ]; then
   echo "React build successful!"
+  python3 -m static_assets dura-react/dist
 else
   echo "Error: React build failed. The dist directory was not created."
   exit 1
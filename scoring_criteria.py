@@ -0,0 +1,109 @@
+"""Scoring criteria for partnership evaluation
+
+Shared by the Flask app, the FastAPI routers and the offline scoring jobs.
+
+Each criterion has the human readable ``description`` used in the GPT
+prompts plus a machine readable rule (``feature`` and ``min``) evaluated by
+app/services/scoring_engine.py against enrichment data. Categories marked
+``"mode": "tier"`` award the best matching criterion only; the rest add up
+their matching criteria, capped at ``max_points``.
+"""
+
+SCORING_CRITERIA = {
+    "location": {
+        "name": "Location-Based Presence",
+        "max_points": 2,
+        "mode": "tier",
+        "criteria": [
+            {"points": 2, "description": "Headquartered in Toronto", "feature": "location_tier", "min": 5},
+            {"points": 1.5, "description": "Based in Ontario (outside Toronto)", "feature": "location_tier", "min": 4},
+            {"points": 1, "description": "Based in Canada (outside Ontario)", "feature": "location_tier", "min": 3},
+            {"points": 0.5, "description": "Based in North America (outside Canada)", "feature": "location_tier", "min": 2},
+            {"points": 0.2, "description": "International location", "feature": "location_tier", "min": 1}
+        ]
+    },
+    "employee_size": {
+        "name": "Employee Size & Organizational Scale",
+        "max_points": 1,
+        "mode": "tier",
+        "criteria": [
+            {"points": 0.2, "description": "100+ employees", "feature": "employee_count", "min": 100},
+            {"points": 0.5, "description": "500+ employees", "feature": "employee_count", "min": 500},
+            {"points": 1, "description": "1,000+ employees", "feature": "employee_count", "min": 1000}
+        ]
+    },
+    "revenue": {
+        "name": "Annual Revenue",
+        "max_points": 1,
+        "mode": "tier",
+        "criteria": [
+            {"points": 0.3, "description": "Revenue > $1M/year", "feature": "revenue_usd", "min": 1000000},
+            {"points": 0.6, "description": "Revenue > $10M/year", "feature": "revenue_usd", "min": 10000000},
+            {"points": 1, "description": "Revenue > $50M/year", "feature": "revenue_usd", "min": 50000000}
+        ]
+    },
+    "funding": {
+        "name": "Funding & Capital Activity",
+        "max_points": 1,
+        "mode": "tier",
+        "criteria": [
+            {"points": 0.3, "description": "Multiple funding rounds (2+)", "feature": "funding_rounds", "min": 2},
+            {"points": 0.6, "description": "5+ funding rounds", "feature": "funding_rounds", "min": 5},
+            {"points": 1, "description": "Total funding exceeds $50M+", "feature": "funding_total_usd", "min": 50000000}
+        ]
+    },
+    "talent": {
+        "name": "Talent Acquisition & Hiring Trends",
+        "max_points": 1,
+        "criteria": [
+            {"points": 0.4, "description": "Actively hiring for Marketing/Brand roles", "feature": "marketing_hiring", "min": 1},
+            {"points": 0.3, "description": "3 or more active job listings", "feature": "job_listings", "min": 3},
+            {"points": 0.3, "description": "10+ total open positions", "feature": "job_listings", "min": 10}
+        ]
+    },
+    "industry": {
+        "name": "Industry Relevance & Vertical Fit",
+        "max_points": 1.2,
+        "criteria": [
+            {"points": 0.4, "description": "Operates in Sports, Entertainment, or Events", "feature": "industry_sports_entertainment", "min": 1},
+            {"points": 0.4, "description": "Operates in Hospitality, Food & Beverage", "feature": "industry_hospitality", "min": 1},
+            {"points": 0.4, "description": "Operates in Technology, Fintech, or AI", "feature": "industry_technology", "min": 1}
+        ]
+    },
+    "brand": {
+        "name": "Brand Visibility & Market Influence",
+        "max_points": 1.2,
+        "criteria": [
+            {"points": 0.4, "description": "10,000+ LinkedIn followers", "feature": "linkedin_followers", "min": 10000},
+            {"points": 0.4, "description": "50,000+ total social media followers", "feature": "social_followers", "min": 50000},
+            {"points": 0.4, "description": "Featured in prominent media outlets (e.g., Forbes, Bloomberg, TechCrunch)", "feature": "media_mentions", "min": 1}
+        ]
+    },
+    "sponsorship": {
+        "name": "Sponsorship & Activation History",
+        "max_points": 0.8,
+        "criteria": [
+            {"points": 0.4, "description": "Proven history of sponsorships with sports, venues, or events", "feature": "sponsorship_history", "min": 1},
+            {"points": 0.4, "description": "Has an active sponsorship/partnership program", "feature": "partnership_program", "min": 1}
+        ]
+    },
+    "b2b": {
+        "name": "B2B Synergy & Relationship Fit",
+        "max_points": 0.7,
+        "criteria": [
+            {"points": 0.3, "description": "Existing relationship with Scotiabank Arena tenants (Raptors, Maple Leafs, etc.)", "feature": "arena_tenant_relationship", "min": 1},
+            {"points": 0.4, "description": "Past or current collaborations with Scotiabank or affiliated brands", "feature": "scotiabank_collaboration", "min": 1}
+        ]
+    },
+    "csr": {
+        "name": "Corporate Social Responsibility & Impact",
+        "max_points": 0.7,
+        "criteria": [
+            {"points": 0.3, "description": "Active in community programs or philanthropic initiatives", "feature": "community_programs", "min": 1},
+            {"points": 0.4, "description": "Dedicated CSR program or foundation", "feature": "csr_program", "min": 1}
+        ]
+    }
+}
+
+# Calculate max total score
+MAX_TOTAL_SCORE = sum(category["max_points"] for category in SCORING_CRITERIA.values())
@@ -0,0 +1,220 @@
+import os
+import re
+import sys
+import gzip
+import time
+import hashlib
+import mimetypes
+import threading
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Vite emits content-hashed bundles (assets/index-BfZ3kL_x.js): their URL changes with their
+# content, so browsers may keep them for a year without asking again
+HASHED_ASSET = re.compile(r"^assets/.+[-.][A-Za-z0-9_-]{8,}\.[A-Za-z0-9]+$")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# index.html and unhashed files are revalidated (ETag / 304) on every use
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+# Precompressed variants, in order of preference: (Content-Encoding, file suffix)
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+# index.html is checked for changes at most this often, so a redeploy is picked up without a restart
+INDEX_RECHECK_SECONDS = float(os.environ.get("STATIC_INDEX_RECHECK_SECONDS", 2))
+
+# Files smaller than this aren't worth compressing
+MIN_COMPRESS_BYTES = 1024
+
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "image/svg+xml", "application/wasm")
+
+
+def accepted_encodings(header):
+    """Content codings the client accepts, ignoring ones it turned off with q=0"""
+    accepted = set()
+    for part in (header or "").lower().split(","):
+        name, _, params = part.strip().partition(";")
+        if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        if name:
+            accepted.add(name)
+    return accepted
+
+
+def _etag_matches(if_none_match, etag):
+    """If-None-Match uses the weak comparison, so W/ prefixes are ignored"""
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in (tag[2:] if tag.startswith("W/") else tag for tag in tags)
+
+
+def _content_type(path):
+    content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    if content_type.startswith("text/") or content_type == "application/javascript":
+        content_type += "; charset=utf-8"
+    return content_type
+
+
+def _is_compressible(path):
+    content_type = mimetypes.guess_type(path)[0] or ""
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+class StaticResponse:
+    """What to send for a static request: a status, headers and either in-memory bytes or a file path"""
+
+    def __init__(self, status, headers, body=b"", path=None):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.path = path
+
+
+class StaticAssets:
+    """Serves a built single-page app (dura-react/dist) with caching done right
+
+    - index.html is held in memory (raw, gzip and, with brotli installed,
+      br) and is the fallback for every path that isn't a file.
+    - Files are served from their precompressed .br/.gz variant when the
+      client accepts it (see precompress()).
+    - Hashed assets get Cache-Control: immutable; everything else no-cache.
+    - Every response has an ETag, and a matching If-None-Match gets a 304.
+
+    Framework-agnostic: respond() returns a StaticResponse for the Flask or
+    FastAPI view to turn into its own response type.
+    """
+
+    def __init__(self, root, index="index.html"):
+        self.root = os.path.realpath(root)
+        self.index_name = index
+        self._index = None
+        self._index_checked = 0
+        self._lock = threading.Lock()
+
+    def _load_index(self):
+        path = os.path.join(self.root, self.index_name)
+        now = time.time()
+        if self._index is not None and now - self._index_checked < INDEX_RECHECK_SECONDS:
+            return self._index
+        with self._lock:
+            self._index_checked = now
+            try:
+                stat = os.stat(path)
+            except OSError:
+                self._index = None
+                return None
+            if self._index is not None and self._index["mtime_ns"] == stat.st_mtime_ns:
+                return self._index
+            with open(path, "rb") as f:
+                raw = f.read()
+            digest = hashlib.sha1(raw).hexdigest()[:16]
+            variants = {None: raw, "gzip": gzip.compress(raw, compresslevel=9, mtime=0)}
+            if brotli is not None:
+                variants["br"] = brotli.compress(raw)
+            self._index = {"mtime_ns": stat.st_mtime_ns, "digest": digest, "variants": variants}
+            return self._index
+
+    def _resolve(self, path):
+        """Absolute path of a file under root, or None (missing, a directory, or outside root)"""
+        if not path:
+            return None
+        full = os.path.realpath(os.path.join(self.root, path.lstrip("/")))
+        if not full.startswith(self.root + os.sep) or not os.path.isfile(full):
+            return None
+        return full
+
+    def index(self, headers):
+        index = self._load_index()
+        if index is None:
+            return StaticResponse(404, {"Content-Type": "text/plain; charset=utf-8"}, b"Error: index.html not found")
+        accepted = accepted_encodings(headers.get("Accept-Encoding"))
+        encoding = next((name for name, _ in ENCODINGS if name in accepted and name in index["variants"]), None)
+        etag = f'"{index["digest"]}{"-" + encoding if encoding else ""}"'
+        response_headers = {
+            "Content-Type": "text/html; charset=utf-8",
+            "Cache-Control": REVALIDATE_CACHE_CONTROL,
+            "ETag": etag,
+            "Vary": "Accept-Encoding",
+        }
+        if _etag_matches(headers.get("If-None-Match"), etag):
+            return StaticResponse(304, response_headers)
+        if encoding:
+            response_headers["Content-Encoding"] = encoding
+        body = index["variants"][encoding]
+        response_headers["Content-Length"] = str(len(body))
+        return StaticResponse(200, response_headers, body)
+
+    def respond(self, path, headers):
+        """Response for a GET of `path` (relative to root) given the request headers"""
+        full = self._resolve(path)
+        if full is None or os.path.basename(full) == self.index_name:
+            return self.index(headers)
+
+        accepted = accepted_encodings(headers.get("Accept-Encoding"))
+        served, encoding, has_variants = full, None, False
+        for name, suffix in ENCODINGS:
+            if os.path.isfile(full + suffix):
+                has_variants = True
+                if encoding is None and name in accepted:
+                    served, encoding = full + suffix, name
+
+        stat = os.stat(served)
+        etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+        relative = os.path.relpath(full, self.root).replace(os.sep, "/")
+        response_headers = {
+            "Content-Type": _content_type(full),
+            "Cache-Control": IMMUTABLE_CACHE_CONTROL if HASHED_ASSET.match(relative) else REVALIDATE_CACHE_CONTROL,
+            "ETag": etag,
+        }
+        if has_variants:
+            response_headers["Vary"] = "Accept-Encoding"
+        if _etag_matches(headers.get("If-None-Match"), etag):
+            return StaticResponse(304, response_headers)
+        if encoding:
+            response_headers["Content-Encoding"] = encoding
+        response_headers["Content-Length"] = str(stat.st_size)
+        return StaticResponse(200, response_headers, path=served)
+
+
+def precompress(root, min_bytes=MIN_COMPRESS_BYTES):
+    """Write .gz (and .br, with brotli installed) next to every compressible file under root
+
+    Run after each frontend build. Variants already newer than their source are kept.
+    Returns the number of files written.
+    """
+    written = 0
+    for directory, _, files in os.walk(root):
+        for name in files:
+            path = os.path.join(directory, name)
+            if name.endswith((".gz", ".br")) or not _is_compressible(path) or os.path.getsize(path) < min_bytes:
+                continue
+            compressors = [(".gz", lambda data: gzip.compress(data, compresslevel=9, mtime=0))]
+            if brotli is not None:
+                compressors.append((".br", lambda data: brotli.compress(data, quality=11)))
+            with open(path, "rb") as f:
+                data = f.read()
+            for suffix, compress in compressors:
+                target = path + suffix
+                if os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(path):
+                    continue
+                compressed = compress(data)
+                # A variant that saves nothing only costs a lookup
+                if len(compressed) >= len(data):
+                    continue
+                with open(target, "wb") as f:
+                    f.write(compressed)
+                written += 1
+    return written
+
+
+if __name__ == "__main__":
+    # python -m static_assets [dist dir]
+    dist = sys.argv[1] if len(sys.argv) > 1 else os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "dura-react", "dist"
+    )
+    count = precompress(dist)
+    print(f"Wrote {count} precompressed files under {dist}" + ("" if brotli else " (gzip only: brotli is not installed)"))
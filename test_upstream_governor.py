@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Tests for app/services/upstream_governor.py
+Slots, AIMD throttling, the circuit breaker and cancellation of async waiters.
+Runs offline: python test_upstream_governor.py (or under pytest)
+"""
+
+import sys
+import time
+import asyncio
+
+from app.services.upstream_governor import (
+    AdaptiveLimiter, CircuitBreaker, CircuitOpen, UpstreamBusy, UpstreamGovernor, DECREASE_COOLDOWN_SECONDS
+)
+
+
+def make_governor(initial=1, minimum=1, maximum=8):
+    # No shared directory: limits stay in this process
+    return UpstreamGovernor(limits={"test": (initial, minimum, maximum)}, shared_dir="")
+
+
+def test_acquire_release():
+    """A full limiter refuses a call until a slot is released"""
+    limiter = AdaptiveLimiter("test", 2, 1, 8, shared_dir="")
+    limiter.acquire(timeout=0.1)
+    limiter.acquire(timeout=0.1)
+    try:
+        limiter.acquire(timeout=0.05)
+        raise AssertionError("third acquire should have timed out")
+    except UpstreamBusy:
+        pass
+    assert limiter.stats()["in_flight"] == 2
+    assert limiter.stats()["timeouts"] == 1
+
+    limiter.release(status_code=200)
+    limiter.acquire(timeout=0.1)
+    limiter.release(status_code=200)
+    limiter.release(status_code=200)
+    assert limiter.stats()["in_flight"] == 0
+
+
+def test_throttling_halves_limit_once_per_cooldown():
+    """A 429 halves the limit and pauses calls; a second 429 in the same cooldown doesn't halve again"""
+    limiter = AdaptiveLimiter("test", 8, 1, 16, shared_dir="")
+    for _ in range(2):
+        limiter.acquire(timeout=0.1)
+    limiter.release(status_code=429, headers={"retry-after": "0.2"})
+    assert limiter.stats()["limit"] == 4
+    assert limiter.stats()["paused_for_seconds"] > 0
+    limiter.release(status_code=429, headers={"retry-after": "0.2"})
+    assert limiter.stats()["limit"] == 4
+    assert limiter.stats()["throttled"] == 2
+
+    # Past the cooldown the next congestion event halves it again
+    limiter.state["last_decrease"] -= DECREASE_COOLDOWN_SECONDS
+    limiter.state["paused_until"] = 0.0
+    limiter.acquire(timeout=0.1)
+    limiter.release(status_code=503)
+    assert limiter.stats()["limit"] == 2
+
+
+def test_success_raises_limit_additively():
+    limiter = AdaptiveLimiter("test", 2, 1, 16, shared_dir="")
+    for _ in range(4):
+        limiter.acquire(timeout=0.1)
+        limiter.release(status_code=200)
+    assert 3 <= limiter.state["limit"] < 4
+
+
+def test_breaker_opens_and_half_opens():
+    """Failures in a row open the circuit; after the reset time one probe decides"""
+    breaker = CircuitBreaker("test", threshold=2, reset_seconds=0.1)
+    breaker.before_call()
+    breaker.record(failed=True)
+    breaker.before_call()
+    breaker.record(failed=True)
+    assert breaker.state == "open"
+    try:
+        breaker.before_call()
+        raise AssertionError("open circuit should refuse calls")
+    except CircuitOpen:
+        pass
+
+    time.sleep(0.12)
+    assert breaker.state == "half-open"
+    breaker.before_call()
+    # Only one probe at a time
+    try:
+        breaker.before_call()
+        raise AssertionError("second probe should be refused")
+    except CircuitOpen:
+        pass
+    breaker.record(failed=True)
+    assert breaker.state == "open"
+
+    time.sleep(0.12)
+    breaker.before_call()
+    breaker.record(failed=False)
+    assert breaker.state == "closed"
+    breaker.before_call()
+
+
+def test_slot_counts_server_errors_toward_breaker():
+    governor = make_governor(initial=2)
+    governor.limiter("test").breaker.threshold = 2
+
+    class Response:
+        status_code = 500
+        headers = {}
+
+    for _ in range(2):
+        with governor.slot("test") as call:
+            call.observe(Response())
+    assert governor.stats()["test"]["circuit"] == "open"
+    try:
+        with governor.slot("test"):
+            pass
+        raise AssertionError("slot should refuse calls while the circuit is open")
+    except CircuitOpen:
+        pass
+    assert governor.stats()["test"]["in_flight"] == 0
+
+
+def test_async_waiter_cancelled_while_queued():
+    """Cancelling a task queued for a slot leaves no slot taken"""
+    governor = make_governor(initial=1)
+
+    async def scenario():
+        holding = asyncio.Event()
+        done = asyncio.Event()
+
+        async def holder():
+            async with governor.async_slot("test"):
+                holding.set()
+                await done.wait()
+
+        async def waiter():
+            async with governor.async_slot("test"):
+                raise AssertionError("waiter should never get the slot")
+
+        first = asyncio.create_task(holder())
+        await holding.wait()
+        second = asyncio.create_task(waiter())
+        await asyncio.sleep(0.05)
+        assert governor.stats()["test"]["waiting"] == 1
+        second.cancel()
+        try:
+            await second
+        except asyncio.CancelledError:
+            pass
+        done.set()
+        await first
+
+    asyncio.run(scenario())
+    stats = governor.stats()["test"]
+    assert stats["in_flight"] == 0, stats
+    assert stats["waiting"] == 0, stats
+    assert stats["calls"] == 1, stats
+
+
+def test_async_call_cancelled_mid_request():
+    """Cancelling a task inside its slot frees the slot and leaves the limit and circuit alone"""
+    governor = make_governor(initial=1)
+
+    async def scenario():
+        started = asyncio.Event()
+
+        async def call():
+            async with governor.async_slot("test"):
+                started.set()
+                await asyncio.sleep(10)
+
+        task = asyncio.create_task(call())
+        await started.wait()
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+        # The freed slot is available straight away
+        async with governor.async_slot("test", timeout=0.1):
+            pass
+
+    asyncio.run(scenario())
+    stats = governor.stats()["test"]
+    assert stats["in_flight"] == 0, stats
+    assert stats["errors"] == 0, stats
+    assert stats["circuit"] == "closed", stats
+
+
+def test_async_waiter_times_out():
+    governor = make_governor(initial=1)
+
+    async def scenario():
+        async with governor.async_slot("test"):
+            try:
+                async with governor.async_slot("test", timeout=0.05):
+                    pass
+                raise AssertionError("second slot should have timed out")
+            except UpstreamBusy:
+                pass
+
+    asyncio.run(scenario())
+    stats = governor.stats()["test"]
+    assert stats["in_flight"] == 0, stats
+    assert stats["timeouts"] == 1, stats
+
+
+def main():
+    tests = [
+        test_acquire_release,
+        test_throttling_halves_limit_once_per_cooldown,
+        test_success_raises_limit_additively,
+        test_breaker_opens_and_half_opens,
+        test_slot_counts_server_errors_toward_breaker,
+        test_async_waiter_cancelled_while_queued,
+        test_async_call_cancelled_mid_request,
+        test_async_waiter_times_out,
+    ]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {type(e).__name__}: {e}")
+    print(f"\n{len(tests) - failed}/{len(tests)} passed")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)